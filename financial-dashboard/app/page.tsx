@@ -1,6 +1,6 @@
 "use client";
 
-import { summaryData, metricsData } from "./data";
+import { summaryData, metricsData, winLossChartData, period } from "./data";
 import SummaryTable from "@/components/SummaryTable";
 import MetricsTable from "@/components/MetricsTable";
 import KeyMetricCard from "@/components/KeyMetricCard";
@@ -33,6 +33,22 @@ function MiniSparkline() {
   );
 }
 
+function formatDate(iso: string | null, fallback: string) {
+  if (!iso) return fallback;
+  return new Date(iso).toLocaleDateString("en-GB", {
+    day: "numeric",
+    month: "long",
+    year: "numeric",
+    timeZone: "UTC",
+  });
+}
+
+function sharePct(name: string) {
+  const total = winLossChartData.reduce((s, d) => s + d.value, 0);
+  const entry = winLossChartData.find((d) => d.name === name);
+  return total > 0 && entry ? `${((entry.value / total) * 100).toFixed(1)}%` : "—";
+}
+
 export default function DashboardPage() {
   const winRate = metricsData.find((m) => m.metric === "Win Rate %");
   const sharpe = metricsData.find((m) => m.metric === "Sharpe Ratio");
@@ -47,7 +63,8 @@ export default function DashboardPage() {
       <div className="card ghost px-6 py-6 lg:col-span-2 sm:px-8 sm:py-8">
         <h1 className="mb-2 text-[2rem] font-medium tracking-tight">financial overview</h1>
         <p className="max-w-[400px] text-muted">
-          Financial overview of Stocky AI&apos;s performance from 1st June 2025 to today.
+          Financial overview of Stocky AI&apos;s performance from {formatDate(period.start, "the first trade")} to{" "}
+          {formatDate(period.end, "today")}.
         </p>
       </div>
 
@@ -72,11 +89,11 @@ export default function DashboardPage() {
         <ul className="transaction-list mt-6 space-y-3 border-t border-border-default/20 pt-6">
           <li className="flex justify-between text-sm">
             <span className="t-meta">wins</span>
-            <span className="t-amount positive">72.9%</span>
+            <span className="t-amount positive">{sharePct("Wins")}</span>
           </li>
           <li className="flex justify-between text-sm">
             <span className="t-meta">losses</span>
-            <span className="t-amount negative">27.1%</span>
+            <span className="t-amount negative">{sharePct("Losses")}</span>
           </li>
         </ul>
       </div>
@@ -99,8 +99,11 @@ export function CumulativePnlChart() {
             </linearGradient>
           </defs>
           <CartesianGrid strokeDasharray="3 3" stroke="rgba(255,255,255,0.15)" />
+          {/* Numeric axis: downsampled points are not evenly spaced in trade number */}
           <XAxis
             dataKey="trade"
+            type="number"
+            domain={["dataMin", "dataMax"]}
             stroke="rgba(255,255,255,0.5)"
             tick={{ fill: "rgba(255,255,255,0.7)", fontSize: 12 }}
             label={{ value: "Trade #", position: "insideBottom", offset: -5, fill: "rgba(255,255,255,0.6)" }}
@@ -0,0 +1,262 @@
+import glob
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from statement_cache import ParsedStatement, StatementCache
+from trade_analyzer import Metrics, compute_metrics, load_data, load_data_cached, render_report
+
+
+STATEMENT_EXTENSIONS = (".xlsx", ".xls", ".csv")
+
+# Zerodha client IDs look like "PQ4709"; exports are usually named pnl-<ID>.xlsx
+_CLIENT_ID_RE = re.compile(r"(?<![A-Z])([A-Z]{2,3}\d{3,5})(?!\d)")
+
+
+@dataclass
+class StatementResult:
+    path: str
+    account: str
+    parsed: ParsedStatement
+    metrics: Metrics
+
+
+def find_statements(source: str) -> List[str]:
+    """Expand a directory or glob pattern into a sorted list of statement files."""
+    if os.path.isdir(source):
+        candidates = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        candidates = glob.glob(source, recursive=True)
+    return sorted(
+        p
+        for p in candidates
+        if os.path.isfile(p)
+        and p.lower().endswith(STATEMENT_EXTENSIONS)
+        and not os.path.basename(p).startswith("~$")  # Excel lock files
+    )
+
+
+def account_id(path: str) -> str:
+    """Client ID from the file name, falling back to the file stem."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = _CLIENT_ID_RE.search(stem.upper())
+    return match.group(1) if match else stem
+
+
+def _metrics_for(parsed: ParsedStatement, initial_capital: float, risk_free_rate: float) -> Metrics:
+    df, total_charges, other_credits_debits, start_date, end_date = parsed
+    setattr(df, "_total_charges", total_charges)
+    setattr(df, "_other_credits_debits", other_credits_debits)
+    return compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+
+
+def _process_statement(
+    path: str,
+    initial_capital: float,
+    risk_free_rate: float,
+    cache: Optional[StatementCache],
+) -> StatementResult:
+    """Worker: parse one statement and compute its metrics."""
+    parsed = load_data_cached(path, cache) if cache is not None else load_data(path)
+    metrics = _metrics_for(parsed, initial_capital, risk_free_rate)
+    return StatementResult(path=path, account=account_id(path), parsed=parsed, metrics=metrics)
+
+
+def _latest_per_account(parsed: List[ParsedStatement], accounts: List[str]) -> Set[int]:
+    """Index of each account's latest statement (by period end, then position in the list)."""
+    latest: Dict[str, int] = {}
+    for i, (p, account) in enumerate(zip(parsed, accounts)):
+        current = latest.get(account)
+        if current is None or p[4] is None or parsed[current][4] is None or p[4] >= parsed[current][4]:
+            latest[account] = i
+    return set(latest.values())
+
+
+def combine_statements(parsed: List[ParsedStatement], accounts: Optional[List[str]] = None) -> ParsedStatement:
+    """
+    Merge several parsed statements into one (trades concatenated, summary values summed).
+
+    Unrealized P&L is a snapshot of the positions open at a statement's end,
+    so only each account's latest statement keeps its open positions;
+    `accounts` names the account of each statement (default: all one account).
+    """
+    if len(parsed) == 1:
+        return parsed[0]
+    if accounts is None:
+        accounts = [""] * len(parsed)
+    latest = _latest_per_account(parsed, accounts)
+    frames = []
+    for i, p in enumerate(parsed):
+        frame = p[0]
+        if i not in latest:
+            # Superseded marks: the positions are counted in the account's later statement
+            frame = frame.assign(**{c: 0 for c in ("Open Quantity", "Unrealized P&L") if c in frame.columns})
+        frames.append(frame)
+    df = pd.concat(frames, ignore_index=True)
+    starts = [p[3] for p in parsed if p[3] is not None]
+    ends = [p[4] for p in parsed if p[4] is not None]
+    return (
+        df,
+        float(sum(p[1] for p in parsed)),
+        float(sum(p[2] for p in parsed)),
+        min(starts) if starts else None,
+        max(ends) if ends else None,
+    )
+
+
+def _accounts_section(accounts: Dict[str, Metrics], statements: Dict[str, List[str]]) -> str:
+    lines = ["## Accounts", ""]
+    lines.append("| Account | Statements | Trades | Win Rate % | Net P&L | Total Return % | Max Drawdown % |")
+    lines.append("| --- | --- | --- | --- | --- | --- | --- |")
+    for account, m in accounts.items():
+        dd = f"{m.max_drawdown_pct:.2f}" if m.max_drawdown_pct is not None else "N/A"
+        lines.append(
+            f"| {account} | {len(statements[account])} | {m.total_trades} | {m.win_rate:.2f}% "
+            f"| {m.net_pnl:,.2f} | {m.total_return_pct:.2f}% | {dd} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _write_text(path: str, text: str) -> None:
+    # Replace atomically so readers (or a watcher's consumers) never see a partial report
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def process_statements(
+    paths: List[str],
+    initial_capital: float,
+    risk_free_rate: float,
+    workers: Optional[int] = None,
+    cache: Optional[StatementCache] = None,
+) -> Tuple[List[StatementResult], Dict[str, str]]:
+    """
+    Parse and analyze statements, in a process pool when there are several.
+
+    Returns the results (in path order) and path -> error for the failures.
+    """
+    results: List[StatementResult] = []
+    failures: Dict[str, str] = {}
+    if len(paths) == 1 or workers == 1:
+        for path in paths:
+            try:
+                results.append(_process_statement(path, initial_capital, risk_free_rate, cache))
+            except Exception as exc:
+                failures[path] = str(exc)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_process_statement, p, initial_capital, risk_free_rate, cache): p for p in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as exc:
+                    failures[futures[future]] = str(exc)
+    return sorted(results, key=lambda r: r.path), failures
+
+
+def write_account_report(
+    account_results: List[StatementResult],
+    output_dir: str,
+    initial_capital: float,
+    risk_free_rate: float,
+) -> Tuple[str, Metrics]:
+    """Write <account>.md for one account's statements; returns (path, metrics)."""
+    account = account_results[0].account
+    if len(account_results) == 1:
+        metrics = account_results[0].metrics
+        parsed = account_results[0].parsed
+    else:
+        parsed = combine_statements([r.parsed for r in account_results])
+        metrics = _metrics_for(parsed, initial_capital, risk_free_rate)
+    report_path = os.path.join(output_dir, f"{account}.md")
+    _write_text(report_path, render_report(metrics, parsed[0], {}, report_dir=output_dir))
+    return report_path, metrics
+
+
+def write_consolidated_report(
+    results: List[StatementResult],
+    account_metrics: Dict[str, Metrics],
+    output_dir: str,
+    initial_capital: float,
+    risk_free_rate: float,
+) -> Tuple[str, ParsedStatement, Metrics]:
+    """
+    Write consolidated.md over all statements, with initial_capital per
+    account; returns (path, combined statement, combined metrics).
+    """
+    statements: Dict[str, List[str]] = {}
+    for result in results:
+        statements.setdefault(result.account, []).append(result.path)
+    ordered = sorted(results, key=lambda r: r.path)
+    combined = combine_statements([r.parsed for r in ordered], accounts=[r.account for r in ordered])
+    combined_metrics = _metrics_for(combined, initial_capital * len(statements), risk_free_rate)
+    consolidated_path = os.path.join(output_dir, "consolidated.md")
+    report = render_report(combined_metrics, combined[0], {}, report_dir=output_dir)
+    _write_text(consolidated_path, report + "\n" + _accounts_section(account_metrics, statements))
+    return consolidated_path, combined, combined_metrics
+
+
+def group_by_account(results: List[StatementResult]) -> Dict[str, List[StatementResult]]:
+    by_account: Dict[str, List[StatementResult]] = {}
+    for result in sorted(results, key=lambda r: r.path):
+        by_account.setdefault(result.account, []).append(result)
+    return by_account
+
+
+def run_batch(
+    source: str,
+    output_dir: str,
+    initial_capital: float,
+    risk_free_rate: float,
+    workers: Optional[int] = None,
+    cache: Optional[StatementCache] = None,
+) -> Dict[str, str]:
+    """
+    Analyze every statement matched by `source` (directory or glob) in a process pool.
+
+    Writes one Markdown report per account to output_dir plus consolidated.md.
+    `initial_capital` is per account; the consolidated report uses
+    initial_capital * number of accounts. Returns account -> report path.
+    """
+    paths = find_statements(source)
+    if not paths:
+        raise FileNotFoundError(f"No statements found for: {source}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    results, failures = process_statements(paths, initial_capital, risk_free_rate, workers=workers, cache=cache)
+    parse_elapsed = time.perf_counter() - started
+
+    by_account = group_by_account(results)
+    reports: Dict[str, str] = {}
+    account_metrics: Dict[str, Metrics] = {}
+    for account, account_results in by_account.items():
+        reports[account], account_metrics[account] = write_account_report(
+            account_results, output_dir, initial_capital, risk_free_rate
+        )
+
+    if results:
+        reports["consolidated"], _, _ = write_consolidated_report(
+            results, account_metrics, output_dir, initial_capital, risk_free_rate
+        )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Processed {len(results)} statement(s) for {len(by_account)} account(s) "
+        f"in {elapsed:.2f}s (parse + metrics: {parse_elapsed:.2f}s)"
+    )
+    for path, error in failures.items():
+        print(f"  ! Failed to process {path}: {error}")
+    return reports
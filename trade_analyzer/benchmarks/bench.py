@@ -0,0 +1,190 @@
+"""
+Benchmark load_data, compute_metrics, generate_plots and generate_report on
+synthetic statements of increasing size, and compare against a baseline.
+
+    python benchmarks/bench.py                          # 1e2 .. 1e5 trades
+    python benchmarks/bench.py --sizes 100,1000000      # include 1e6
+    python benchmarks/bench.py --save-baseline          # record new baselines
+
+Each stage is timed best-of --repeat, each run starting without the
+intermediates an earlier run cached on the frame. A stage regresses when it is more than
+--threshold (default 25%) slower than its baseline; the script then exits
+with status 1. Stages faster than MIN_COMPARABLE_SECONDS are reported but
+never flagged, since their timings are dominated by noise. Baselines are
+per machine: record them on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from synthetic import generate_statement  # noqa: E402
+from trade_analyzer import compute_metrics, generate_plots, generate_report, load_data  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "trade_analyzer_bench")
+DEFAULT_THRESHOLD = 0.25
+MIN_COMPARABLE_SECONDS = 0.05
+
+# Bump when synthetic statements change so cached inputs are regenerated
+DATA_VERSION = 2
+
+STAGES = ["load_data", "compute_metrics", "generate_plots", "generate_report"]
+
+
+def _best_of(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """Best wall time of func over `repeat` runs; `setup` runs untimed before each."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _drop_trade_data(df) -> None:
+    # compute_metrics caches its intermediates on the frame; without this
+    # every run after the first would only time cache lookups
+    if "_trade_data" in df.__dict__:
+        delattr(df, "_trade_data")
+
+
+def statement_path(data_dir: str, n_trades: int, seed: int) -> str:
+    """Synthetic statement for n_trades, generated on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic-v{DATA_VERSION}-{n_trades}-s{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"Generating {n_trades} trades -> {path}", file=sys.stderr)
+        tmp_path = path + ".tmp.xlsx"
+        generate_statement(tmp_path, n_trades, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def bench_size(path: str, repeat: int, output_dir: str) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    parsed = {}
+
+    def load():
+        parsed["value"] = load_data(path)
+
+    timings["load_data"] = _best_of(load, repeat)
+    df, total_charges, other_credits_debits, start_date, end_date = parsed["value"]
+    setattr(df, "_total_charges", total_charges)
+    setattr(df, "_other_credits_debits", other_credits_debits)
+
+    def metrics():
+        return compute_metrics(df, 100000.0, 0.03, start_date=start_date, end_date=end_date)
+
+    timings["compute_metrics"] = _best_of(metrics, repeat, setup=lambda: _drop_trade_data(df))
+    result = None
+
+    def metrics_cold():
+        # Plots follow compute_metrics in a run, so they start from the state it leaves
+        nonlocal result
+        _drop_trade_data(df)
+        result = metrics()
+
+    plots_dir = os.path.join(output_dir, "plots")
+    os.makedirs(plots_dir, exist_ok=True)
+    plots: Dict[str, str] = {}
+
+    def plot():
+        plots.update(generate_plots(df, result, plots_dir, force=True))
+
+    timings["generate_plots"] = _best_of(plot, repeat, setup=metrics_cold)
+    report_path = os.path.join(output_dir, "report.md")
+    timings["generate_report"] = _best_of(lambda: generate_report(result, df, plots, report_path), repeat)
+    return timings
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Print a results table against the baseline; returns the regressions."""
+    regressions = []
+    print(f"{'trades':>9}  {'stage':<16} {'seconds':>10} {'baseline':>10} {'change':>8}")
+    for size, timings in results.items():
+        for stage in STAGES:
+            seconds = timings[stage]
+            base = baseline.get(size, {}).get(stage)
+            change = ""
+            if base:
+                ratio = seconds / base - 1.0
+                change = f"{ratio:+.0%}"
+                if ratio > threshold and max(seconds, base) >= MIN_COMPARABLE_SECONDS:
+                    change += " !"
+                    regressions.append(f"{stage} @ {size} trades: {seconds:.4f}s vs {base:.4f}s ({ratio:+.0%})")
+            base_text = f"{base:.4f}" if base else "-"
+            print(f"{size:>9}  {stage:<16} {seconds:10.4f} {base_text:>10} {change:>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analyzer stages on synthetic statements.")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(n) for n in DEFAULT_SIZES),
+        help="Comma-separated trade counts (default: %(default)s).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is kept (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic statements (default: %(default)s).")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where generated statements are kept (default: %(default)s).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: benchmarks/baseline.json).")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown vs the baseline before failing, as a fraction (default: %(default)s).",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--output", help="Optional JSON path for the raw results.")
+    args = parser.parse_args()
+
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s.strip()]
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for n in sizes:
+            path = statement_path(args.data_dir, n, args.seed)
+            results[str(n)] = bench_size(path, args.repeat, output_dir)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+    regressions = compare(results, baseline, args.threshold)
+
+    record = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    if args.save_baseline:
+        # Keep baselines for sizes that were not re-run
+        record["results"] = dict(baseline, **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
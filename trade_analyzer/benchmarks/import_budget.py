@@ -0,0 +1,102 @@
+"""
+Import-time budget check for trade_analyzer.
+
+Imports the module in fresh interpreters and fails (exit status 1) when:
+
+- a plotting or Excel library is loaded at import time (they must stay lazy), or
+- the median import time exceeds the budget, either in absolute terms or
+  as the time left once its unavoidable dependencies (numpy, pandas) are loaded.
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget 1.5 --overhead-budget 0.2 --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported by `import trade_analyzer` (nor by a --metrics-only run)
+LAZY_MODULES = ["matplotlib", "seaborn", "openpyxl"]
+
+DEFAULT_BUDGET_SECONDS = 1.0
+DEFAULT_OVERHEAD_BUDGET_SECONDS = 0.1
+
+
+def _time_import(statement: str, runs: int) -> float:
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=PACKAGE_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _time_overhead(runs: int) -> float:
+    # Measured inside one interpreter after numpy / pandas are loaded, which
+    # is far less noisy than the difference of two process timings
+    probe = (
+        "import time, numpy, pandas; start = time.perf_counter(); "
+        "import trade_analyzer; print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], cwd=PACKAGE_DIR, check=True, capture_output=True, text=True)
+        timings.append(float(out.stdout))
+    return statistics.median(timings)
+
+
+def _loaded_lazy_modules() -> List[str]:
+    probe = (
+        "import json, sys, trade_analyzer; "
+        f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({LAZY_MODULES!r}))))"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], cwd=PACKAGE_DIR, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget of trade_analyzer.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (default: %(default)s).")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help="Maximum median wall time of `import trade_analyzer`, in seconds (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--overhead-budget",
+        type=float,
+        default=DEFAULT_OVERHEAD_BUDGET_SECONDS,
+        help="Maximum import time once numpy and pandas are loaded, in seconds (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    loaded = _loaded_lazy_modules()
+    if loaded:
+        failures.append(f"imported at module load: {', '.join(loaded)}")
+
+    total = _time_import("import trade_analyzer", args.runs)
+    overhead = _time_overhead(args.runs)
+    print(f"import trade_analyzer:  {total * 1000:7.1f} ms (median of {args.runs}, budget {args.budget * 1000:.0f} ms)")
+    print(f"  after numpy, pandas:  {overhead * 1000:7.1f} ms (budget {args.overhead_budget * 1000:.0f} ms)")
+    if total > args.budget:
+        failures.append(f"import took {total:.3f}s > {args.budget:.3f}s")
+    if overhead > args.overhead_budget:
+        failures.append(f"overhead {overhead:.3f}s > {args.overhead_budget:.3f}s")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test for service.py: POSTs a statement concurrently and reports throughput.
+
+    python service.py --workers 4 &
+    python benchmarks/service_loadtest.py --file zerodha_pnl.xlsx --requests 200 --concurrency 16
+
+By default every request carries the same statement and parameters, which
+exercises the result cache and in-flight deduplication. `--distinct N`
+cycles through N different capital values to force real analyses.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run(url: str, body: bytes, n_requests: int, concurrency: int, distinct: int, capital: float) -> None:
+    parts = urlsplit(url)
+    local = threading.local()
+
+    def request(i: int) -> Tuple[float, int]:
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+        path = f"/analyze?capital={capital + (i % distinct)}"
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/octet-stream"})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.conn = None
+            status = 0
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(request, range(n_requests)))
+        wall = time.perf_counter() - started
+
+    latencies = [lat for lat, status in results if status == 200]
+    failures = len(results) - len(latencies)
+    print(f"requests:     {n_requests} ({failures} failed), concurrency {concurrency}, {distinct} distinct")
+    print(f"wall time:    {wall:.2f} s")
+    print(f"throughput:   {n_requests / wall:.1f} req/s")
+    if latencies:
+        print(f"latency p50:  {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"latency p95:  {_percentile(latencies, 95) * 1000:.1f} ms")
+        print(f"latency max:  {max(latencies) * 1000:.1f} ms")
+
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    conn.request("GET", "/health")
+    print(f"server stats: {json.loads(conn.getresponse().read())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the statement analysis service.")
+    parser.add_argument("--file", "-f", required=True, help="Statement to upload.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="Service URL (default: %(default)s).")
+    parser.add_argument("--requests", "-n", type=int, default=100, help="Total requests (default: %(default)s).")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Concurrent clients (default: %(default)s).")
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=1,
+        help="Number of distinct parameter sets to cycle through (default: 1, all identical).",
+    )
+    parser.add_argument("--capital", type=float, default=100000.0, help="Base capital (default: %(default)s).")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        body = f.read()
+    run(args.url, body, args.requests, args.concurrency, max(1, args.distinct), args.capital)
+
+
+if __name__ == "__main__":
+    main()
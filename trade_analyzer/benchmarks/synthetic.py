@@ -0,0 +1,237 @@
+"""
+Synthetic Zerodha F&O P&L statements in the layout load_data expects.
+
+The workbook has the client / summary block (Charges, Other Credit & Debit,
+Realized and Unrealized P&L), the "P&L Statement for F&O from ... to ..."
+period line and a trade table starting in column B. Trades are monthly
+options (e.g. NIFTY25OCT18300CE), weekly index options (e.g.
+NIFTY25O1618300CE, expiring 2025-10-16) and futures (e.g.
+BANKNIFTY25OCTFUT), with Zerodha's symbol layouts. Monthly contracts
+expire on the last Thursday of their month and weekly ones on a Thursday
+inside the period. A fraction of the numbers are written as formatted
+strings ("12,345.50"), as in real exports. A .csv output path writes the
+same sheet as CSV, and a .xls path as a legacy workbook (needs xlwt).
+
+    python benchmarks/synthetic.py statement.xlsx --trades 100000 --seed 1
+    python benchmarks/synthetic.py statement.csv --trades 100000 --seed 1
+"""
+import argparse
+import csv
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+UNDERLYINGS = np.array(["NIFTY", "BANKNIFTY", "FINNIFTY", "RELIANCE", "TCS", "HDFCBANK", "INFY"])
+# Only index options have weekly expiries
+INDEX_UNDERLYINGS = ["NIFTY", "BANKNIFTY", "FINNIFTY"]
+MONTHS = np.array(["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"])
+# Month of a weekly contract: 1-9 for Jan-Sep, O / N / D for Oct-Dec
+WEEKLY_MONTHS = np.array(["1", "2", "3", "4", "5", "6", "7", "8", "9", "O", "N", "D"])
+
+HEADER = [
+    "Symbol",
+    "ISIN",
+    "Quantity",
+    "Buy Value",
+    "Sell Value",
+    "Realized P&L",
+    "Realized P&L Pct.",
+    "Previous Closing Price",
+    "Open Quantity",
+    "Open Quantity Type",
+    "Open Value",
+    "Unrealized P&L",
+    "Unrealized P&L Pct.",
+]
+
+# Share of trades of each kind / with each property
+FUTURES_SHARE = 0.1
+WEEKLY_SHARE = 0.6  # of index options
+BREAKEVEN_SHARE = 0.03
+OPEN_SHARE = 0.05
+STRING_NUMBER_SHARE = 0.15
+
+
+def synthetic_trades(
+    n_trades: int,
+    seed: Optional[int] = 0,
+    start: str = "2025-06-01",
+    end: str = "2026-02-05",
+) -> pd.DataFrame:
+    """Random trade rows (columns as HEADER) with expiries between start and end."""
+    rng = np.random.default_rng(seed)
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+
+    # A Thursday inside the period for weekly contracts, the last Thursday of its month for the others
+    days = (start_ts + pd.to_timedelta(rng.integers(0, (end_ts - start_ts).days + 1, n_trades), unit="D")).to_numpy()
+    days = days.astype("datetime64[D]")
+    thursday = np.busday_offset(days, 0, roll="forward", weekmask="Thu")
+    thursday = np.where(thursday > np.datetime64(end_ts.date()), np.busday_offset(days, 0, roll="backward", weekmask="Thu"), thursday)
+    month_end = (days.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    last_thursday = np.busday_offset(month_end, 0, roll="backward", weekmask="Thu")
+
+    underlying = UNDERLYINGS[rng.integers(0, len(UNDERLYINGS), n_trades)]
+    is_future = rng.random(n_trades) < FUTURES_SHARE
+    is_weekly = ~is_future & np.isin(underlying, INDEX_UNDERLYINGS) & (rng.random(n_trades) < WEEKLY_SHARE)
+    expiry = pd.DatetimeIndex(np.where(is_weekly, thursday, last_thursday))
+
+    year = np.char.zfill((expiry.year.to_numpy() % 100).astype("U2"), 2)
+    monthly_date = np.char.add(year, MONTHS[expiry.month.to_numpy() - 1])
+    weekly_date = np.char.add(
+        np.char.add(year, WEEKLY_MONTHS[expiry.month.to_numpy() - 1]), np.char.zfill(expiry.day.to_numpy().astype("U2"), 2)
+    )
+    strike = (rng.integers(100, 600, n_trades) * 50).astype(str)
+    option_type = np.where(rng.random(n_trades) < 0.5, "CE", "PE")
+    options = np.char.add(np.char.add(np.char.add(underlying, np.where(is_weekly, weekly_date, monthly_date)), strike), option_type)
+    futures = np.char.add(np.char.add(underlying, monthly_date), "FUT")
+    symbol = np.where(is_future, futures, options)
+
+    quantity = rng.integers(1, 40, n_trades) * 25
+    buy_value = np.round(rng.uniform(1e3, 2e5, n_trades), 2)
+    pnl = np.round(rng.normal(1500.0, 9000.0, n_trades), 2)
+    pnl[rng.random(n_trades) < BREAKEVEN_SHARE] = 0.0
+    is_open = rng.random(n_trades) < OPEN_SHARE
+    open_quantity = np.where(is_open, quantity, 0)
+    unrealized = np.where(is_open, np.round(rng.normal(0.0, 800.0, n_trades), 2), 0.0)
+
+    return pd.DataFrame(
+        {
+            "Symbol": symbol,
+            "ISIN": None,
+            "Quantity": quantity,
+            "Buy Value": buy_value,
+            "Sell Value": np.round(buy_value + pnl, 2),
+            "Realized P&L": pnl,
+            "Realized P&L Pct.": np.round(pnl / buy_value * 100.0, 2),
+            "Previous Closing Price": np.round(rng.uniform(5.0, 800.0, n_trades), 2),
+            "Open Quantity": open_quantity,
+            "Open Quantity Type": np.where(is_open, "Long", None),
+            "Open Value": np.round(open_quantity * rng.uniform(5.0, 800.0, n_trades), 2),
+            "Unrealized P&L": unrealized,
+            "Unrealized P&L Pct.": np.where(is_open, np.round(unrealized / buy_value * 100.0, 2), 0.0),
+        },
+        columns=HEADER,
+    )
+
+
+def _statement_rows(
+    trades: pd.DataFrame,
+    start: str,
+    end: str,
+    charges: Optional[float],
+    other_credits_debits: float,
+    seed: Optional[int],
+) -> Iterator[list]:
+    """Rows of the statement sheet: summary block, period line, header and trades."""
+    rng = np.random.default_rng(seed)
+    if charges is None:
+        charges = round(float(len(trades)) * 21.5, 2)
+    # Some cells hold formatted strings instead of numbers
+    as_text = rng.random(len(trades)) < STRING_NUMBER_SHARE
+
+    yield from [
+        [],
+        [None, "Client ID", "PQ4709"],
+        [],
+        [None, "Summary"],
+        [None, "Charges", charges],
+        [None, "Other Credit & Debit", other_credits_debits],
+        [None, "Realized P&L", round(float(trades["Realized P&L"].sum()), 2)],
+        [None, "Unrealized P&L", round(float(trades["Unrealized P&L"].sum()), 2)],
+        [],
+        [None, "Account Head", "Amount"],
+        [None, "Brokerage", round(charges * 0.4, 2)],
+        [None, "Exchange Transaction Charges", round(charges * 0.45, 2)],
+        [None, "Integrated GST", round(charges * 0.15, 2)],
+        [],
+        [None, f"P&L Statement for F&O from {start} to {end}"],
+        [],
+        [None] + HEADER,
+    ]
+
+    columns = [trades[name].tolist() for name in HEADER]
+    buy_col = HEADER.index("Buy Value")
+    for i, row in enumerate(zip(*columns)):
+        row = list(row)
+        if as_text[i]:
+            row[buy_col] = f"{row[buy_col]:,.2f}"
+        yield [None] + row
+
+
+def write_statement(
+    path: str,
+    trades: pd.DataFrame,
+    start: str = "2025-06-01",
+    end: str = "2026-02-05",
+    charges: Optional[float] = None,
+    other_credits_debits: float = -11.8,
+    seed: Optional[int] = 0,
+) -> None:
+    """
+    Write trades as a Zerodha-style statement.
+
+    A path ending in .csv gets the same sheet as CSV (every row padded to
+    the table width, as spreadsheet exports do), one ending in .xls a
+    legacy workbook (xlwt; at most 65,535 trades); anything else is written
+    as an xlsx workbook (write-only, streamed).
+    """
+    rows = _statement_rows(trades, start, end, charges, other_credits_debits, seed)
+    if path.lower().endswith(".csv"):
+        width = len(HEADER) + 1
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in rows:
+                # Missing values are empty cells, as in the workbook
+                row = [None if isinstance(v, float) and np.isnan(v) else v for v in row]
+                writer.writerow(row + [None] * (width - len(row)))
+        return
+
+    if path.lower().endswith(".xls"):
+        import xlwt
+
+        book = xlwt.Workbook()
+        sheet = book.add_sheet("F&O")
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                if value is not None and not (isinstance(value, float) and np.isnan(value)):
+                    sheet.write(r, c, value)
+        book.save(path)
+        return
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("F&O")
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def generate_statement(
+    path: str,
+    n_trades: int,
+    seed: Optional[int] = 0,
+    start: str = "2025-06-01",
+    end: str = "2026-02-05",
+) -> pd.DataFrame:
+    """Generate and write a statement with n_trades rows; returns the trades."""
+    trades = synthetic_trades(n_trades, seed=seed, start=start, end=end)
+    write_statement(path, trades, start=start, end=end, seed=seed)
+    return trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Zerodha F&O P&L statement.")
+    parser.add_argument("output", help="Output .xlsx, .xls or .csv path.")
+    parser.add_argument("--trades", "-n", type=int, default=1000, help="Number of trade rows (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s).")
+    parser.add_argument("--start", default="2025-06-01", help="Period start date (default: %(default)s).")
+    parser.add_argument("--end", default="2026-02-05", help="Period end date (default: %(default)s).")
+    args = parser.parse_args()
+    generate_statement(args.output, args.trades, seed=args.seed, start=args.start, end=args.end)
+    print(f"Wrote {args.trades} trades to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
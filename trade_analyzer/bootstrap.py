@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PATHS = 10000
+# Upper bound on the (paths x trades) block held in memory at once
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+BOOTSTRAP_METRICS = ["sharpe_ratio", "sortino_ratio", "final_pnl", "max_drawdown_pct"]
+
+
+@dataclass
+class BootstrapResult:
+    n_paths: int
+    n_trades: int
+    seed: Optional[int]
+    distributions: Dict[str, np.ndarray]
+
+    def confidence_interval(self, metric: str, level: float = 0.95) -> Tuple[float, float]:
+        """Percentile interval of `metric` (NaN paths, e.g. zero volatility, are ignored)."""
+        values = self.distributions[metric]
+        alpha = (1.0 - level) / 2.0
+        if np.isnan(values).all():
+            return float("nan"), float("nan")
+        lo, hi = np.nanquantile(values, [alpha, 1.0 - alpha])
+        return float(lo), float(hi)
+
+    def summary(self, level: float = 0.95) -> pd.DataFrame:
+        rows = []
+        for metric in BOOTSTRAP_METRICS:
+            values = self.distributions[metric]
+            lo, hi = self.confidence_interval(metric, level)
+            finite = values[~np.isnan(values)]
+            rows.append(
+                {
+                    "metric": metric,
+                    "mean": float(finite.mean()) if len(finite) else float("nan"),
+                    "median": float(np.median(finite)) if len(finite) else float("nan"),
+                    "ci_low": lo,
+                    "ci_high": hi,
+                    "valid_paths": int(len(finite)),
+                }
+            )
+        return pd.DataFrame(rows)
+
+
+def _path_metrics(
+    paths: np.ndarray,
+    initial_capital: float,
+    risk_free_rate: float,
+    years: float,
+) -> Dict[str, np.ndarray]:
+    """Sharpe, Sortino, final P&L and max drawdown for each row of `paths` (trade P&L)."""
+    n_paths, n = paths.shape
+    total = paths.sum(axis=1)
+
+    # Same definitions as MetricsState.finalize, one value per path
+    sharpe = np.full(n_paths, np.nan)
+    sortino = np.full(n_paths, np.nan)
+    if years > 0 and initial_capital > 0 and n > 1:
+        trades_per_year = n / years
+        excess = (total / initial_capital) / years - risk_free_rate
+        std = paths.std(axis=1, ddof=1) / initial_capital
+        volatility = std * np.sqrt(trades_per_year)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(volatility > 0, excess / volatility, np.nan)
+
+            negative = paths < 0
+            n_neg = negative.sum(axis=1)
+            neg_values = np.where(negative, paths, 0.0)
+            neg_sum = neg_values.sum(axis=1)
+            neg_sumsq = (neg_values * neg_values).sum(axis=1)
+            neg_var = (neg_sumsq - neg_sum * neg_sum / np.maximum(n_neg, 1)) / np.maximum(n_neg - 1, 1)
+            downside = np.sqrt(np.maximum(neg_var, 0.0)) / initial_capital
+            downside_volatility = np.where(n_neg > 1, downside * np.sqrt(trades_per_year * n_neg / n), 0.0)
+            sortino = np.where(downside_volatility > 0, excess / downside_volatility, np.nan)
+
+    # Max drawdown as % of portfolio value (see compute_drawdown)
+    capital = initial_capital if initial_capital > 0 else 1.0
+    value = capital + np.cumsum(paths, axis=1)
+    peak = np.maximum.accumulate(value, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak != 0, (value - peak) / peak, np.nan)
+    all_nan = np.isnan(drawdown).all(axis=1)
+    drawdown[all_nan] = 0.0
+    max_drawdown = np.where(all_nan, np.nan, np.nanmin(drawdown, axis=1) * 100.0)
+
+    return {
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "final_pnl": total,
+        "max_drawdown_pct": max_drawdown,
+    }
+
+
+def bootstrap_metrics(
+    trade_pnl: np.ndarray,
+    initial_capital: float,
+    risk_free_rate: float,
+    years: float,
+    n_paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> BootstrapResult:
+    """
+    Bootstrap the realized trade P&L into `n_paths` resampled trade sequences.
+
+    Each path draws len(trade_pnl) trades with replacement. Paths are
+    generated and evaluated in chunks so at most about `chunk_bytes` of
+    resampled P&L is in memory at once. Returns the per-path distributions.
+    """
+    trade_pnl = np.asarray(trade_pnl, dtype=float)
+    n = len(trade_pnl)
+    rng = np.random.default_rng(seed)
+    distributions = {metric: np.full(n_paths, np.nan) for metric in BOOTSTRAP_METRICS}
+    if n == 0 or n_paths <= 0:
+        return BootstrapResult(n_paths=n_paths, n_trades=n, seed=seed, distributions=distributions)
+
+    # The drawdown step holds a few (chunk x n) float arrays at once
+    chunk = max(1, min(n_paths, chunk_bytes // (n * 8 * 4)))
+    for start in range(0, n_paths, chunk):
+        stop = min(start + chunk, n_paths)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        for metric, values in _path_metrics(trade_pnl[idx], initial_capital, risk_free_rate, years).items():
+            distributions[metric][start:stop] = values
+    return BootstrapResult(n_paths=n_paths, n_trades=n, seed=seed, distributions=distributions)
+
+
+def bootstrap_section(result: BootstrapResult, level: float = 0.95) -> str:
+    """Markdown section with the bootstrap confidence intervals."""
+    labels = {
+        "sharpe_ratio": "Sharpe Ratio",
+        "sortino_ratio": "Sortino Ratio",
+        "final_pnl": "Final Realized P&L",
+        "max_drawdown_pct": "Max Drawdown %",
+    }
+    lines = ["## Bootstrap Confidence Intervals", ""]
+    lines.append(
+        f"Resampled {result.n_trades} realized trades with replacement into {result.n_paths:,} paths"
+        f" (seed: {result.seed if result.seed is not None else 'random'})."
+    )
+    lines.append("")
+    lines.append(f"| Metric | Median | {level:.0%} CI Low | {level:.0%} CI High |")
+    lines.append("| --- | --- | --- | --- |")
+    for row in result.summary(level).itertuples(index=False):
+        lines.append(f"| {labels[row.metric]} | {row.median:,.2f} | {row.ci_low:,.2f} | {row.ci_high:,.2f} |")
+    lines.append("")
+    return "\n".join(lines)
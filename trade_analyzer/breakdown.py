@@ -0,0 +1,213 @@
+from dataclasses import asdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from trade_analyzer import MetricsState, _trade_dates, add_symbol_columns
+
+
+BREAKDOWN_DIMENSIONS = ["underlying", "expiry", "option_type"]
+
+UNKNOWN_GROUP = "Unknown"
+
+# Rows per report table; a statement can span hundreds of expiries
+DEFAULT_BREAKDOWN_ROWS = 15
+
+# Columns shown in the report tables: (Metrics field, header, format)
+BREAKDOWN_COLUMNS = [
+    ("total_trades", "Trades", "{:,.0f}"),
+    ("win_rate", "Win Rate %", "{:.2f}"),
+    ("total_realized_pnl", "Realized P&L", "{:,.2f}"),
+    ("total_unrealized_pnl", "Unrealized P&L", "{:,.2f}"),
+    ("expectancy", "Expectancy", "{:,.2f}"),
+    ("profit_factor", "Profit Factor", "{:.2f}"),
+    ("sharpe_ratio", "Sharpe Ratio", "{:.2f}"),
+    ("max_drawdown_pct", "Max Drawdown %", "{:.2f}"),
+]
+
+
+def _group_labels(df: pd.DataFrame, by: str) -> pd.Series:
+    if by == "expiry":
+        labels = pd.to_datetime(df[by]).dt.strftime("%Y-%m-%d")
+    else:
+        labels = df[by].astype(object)
+    return labels.astype(object).where(labels.notna(), UNKNOWN_GROUP).astype(str)
+
+
+def _group_moments(codes: np.ndarray, values: np.ndarray, n_groups: int):
+    """Per-group (count, sum, mean, M2) from two bincount passes."""
+    count = np.bincount(codes, minlength=n_groups)
+    total = np.bincount(codes, weights=values, minlength=n_groups)
+    mean = np.divide(total, count, out=np.zeros(n_groups), where=count > 0)
+    m2 = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=n_groups)
+    return count, total, mean, m2
+
+
+def grouped_states(
+    df: pd.DataFrame,
+    by: str,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> Dict[str, MetricsState]:
+    """
+    One MetricsState per value of `by` (underlying, expiry or option_type).
+
+    Equivalent to MetricsState.from_frame on each group's rows, but built
+    with segmented reductions over one stable sort of the trades (trades of
+    the same date keep their row order, as in compute_metrics): bincount for the
+    counts, sums and moments, and one running max over the group-wise
+    cumulative P&L for the record-high drawdown segments. Charges are
+    statement-level and are not allocated to groups; every group keeps the
+    statement period so annualized figures stay comparable.
+    """
+    df = add_symbol_columns(df)
+    labels = _group_labels(df, by)
+    codes, names = pd.factorize(labels, sort=True)
+    n_groups = len(names)
+
+    zeros = pd.Series(0.0, index=df.index)
+    all_pnl = df.get("Realized P&L", zeros).to_numpy(dtype=float)
+    open_rows = df.get("Open Quantity", zeros).to_numpy() != 0
+    unrealized = np.bincount(
+        codes[open_rows],
+        weights=df.get("Unrealized P&L", zeros).to_numpy(dtype=float)[open_rows],
+        minlength=n_groups,
+    )
+
+    # Realized trades sorted by group, then date (undated last)
+    realized = all_pnl != 0
+    dates = _trade_dates(df).to_numpy(dtype="datetime64[ns]")[realized]
+    date_key = np.where(np.isnat(dates), np.iinfo(np.int64).max, dates.view(np.int64))
+    order = np.lexsort((date_key, codes[realized]))
+    group = codes[realized][order]
+    pnl = all_pnl[realized][order]
+    dates = dates[order]
+
+    count, total, mean, m2 = _group_moments(group, pnl, n_groups)
+    wins = pnl > 0
+    losses = pnl < 0
+    winning = np.bincount(group[wins], minlength=n_groups)
+    profit = np.bincount(group[wins], weights=pnl[wins], minlength=n_groups)
+    loss_count, loss_total, loss_mean, loss_m2 = _group_moments(group[losses], pnl[losses], n_groups)
+
+    dated = ~np.isnat(dates)
+    trade_dates = pd.Series(dates[dated]).groupby(group[dated]).agg(["min", "max"])
+
+    # Cumulative P&L within each group
+    starts = np.concatenate([[0], np.cumsum(count)[:-1]])
+    cum = np.cumsum(pnl)
+    offset = np.concatenate([[0.0], cum])[starts]
+    group_cum = cum - offset[group]
+    # Lift each group above every earlier one so a single running max never
+    # carries a peak across a group boundary
+    has_trades = count > 0
+    low = np.zeros(n_groups)
+    high = np.zeros(n_groups)
+    if len(pnl):
+        low[has_trades] = np.minimum.reduceat(group_cum, starts[has_trades])
+        high[has_trades] = np.maximum.reduceat(group_cum, starts[has_trades])
+    lift = np.concatenate([[0.0], np.cumsum(high - low + 1.0)[:-1]])
+    lifted = group_cum - low[group] + lift[group]
+    is_new_peak = np.ones(len(pnl), dtype=bool)
+    if len(pnl):
+        is_new_peak[1:] = lifted[1:] > np.maximum.accumulate(lifted)[:-1]
+    segment_starts = np.flatnonzero(is_new_peak)
+    peaks = group_cum[segment_starts]
+    troughs = np.minimum.reduceat(group_cum, segment_starts) if len(pnl) else np.empty(0)
+    bounds = np.searchsorted(group[segment_starts], np.arange(n_groups + 1))
+
+    states: Dict[str, MetricsState] = {}
+    for g, name in enumerate(names):
+        n = int(count[g])
+        first = last = None
+        if g in trade_dates.index:
+            first, last = trade_dates.at[g, "min"], trade_dates.at[g, "max"]
+        states[name] = MetricsState(
+            total_realized_pnl=float(total[g]),
+            total_unrealized_pnl=float(unrealized[g]),
+            total_trades=n,
+            winning_trades=int(winning[g]),
+            losing_trades=int(loss_count[g]),
+            total_profit=float(profit[g]),
+            total_loss=float(loss_total[g]),
+            pnl_moments=(n, float(mean[g]), float(m2[g])),
+            loss_moments=(int(loss_count[g]), float(loss_mean[g]), float(loss_m2[g])),
+            curve_end=float(group_cum[starts[g] + n - 1]) if n else 0.0,
+            curve_peaks=peaks[bounds[g] : bounds[g + 1]],
+            curve_troughs=troughs[bounds[g] : bounds[g + 1]],
+            start_date=start_date,
+            end_date=end_date,
+            first_trade_date=first,
+            last_trade_date=last,
+        )
+    return states
+
+
+def grouped_metrics(
+    df: pd.DataFrame,
+    by: str,
+    initial_capital: float,
+    risk_free_rate: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """Every Metrics field per group of `by`, one row per group (charges excluded)."""
+    states = grouped_states(df, by, start_date=start_date, end_date=end_date)
+    rows = [asdict(state.finalize(initial_capital, risk_free_rate)) for state in states.values()]
+    return pd.DataFrame(rows, index=pd.Index(list(states), name=by))
+
+
+def compute_breakdown(
+    df: pd.DataFrame,
+    initial_capital: float,
+    risk_free_rate: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    dimensions: Sequence[str] = BREAKDOWN_DIMENSIONS,
+) -> Dict[str, pd.DataFrame]:
+    """grouped_metrics for each dimension, keyed by dimension."""
+    return {
+        by: grouped_metrics(df, by, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+        for by in dimensions
+    }
+
+
+def breakdown_section(tables: Dict[str, pd.DataFrame], max_rows: int = DEFAULT_BREAKDOWN_ROWS) -> str:
+    """
+    Markdown tables of the main per-group metrics, one per dimension.
+
+    Groups without trades are left out and each table keeps the `max_rows`
+    most traded groups (compute_breakdown's tables have all of them).
+    """
+    titles = {"underlying": "Underlying", "expiry": "Expiry", "option_type": "Option Type"}
+    lines: List[str] = []
+    for by, table in tables.items():
+        title = titles.get(by, by)
+        lines.append(f"## Breakdown by {title}")
+        lines.append("")
+        traded = table[table["total_trades"] > 0]
+        shown = traded.sort_values("total_trades", ascending=False, kind="stable").head(max_rows)
+        # Expiries read best in date order, the others by realized P&L
+        if by == "expiry":
+            shown = shown.sort_index()
+        else:
+            shown = shown.sort_values("total_realized_pnl", ascending=False)
+        if len(shown) < len(table):
+            note = f"Showing the {len(shown)} most traded of {len(traded)} groups with trades"
+            if len(traded) < len(table):
+                note += f" ({len(table) - len(traded)} without trades left out)"
+            lines.append(note + ".")
+            lines.append("")
+        lines.append(f"| {title} | " + " | ".join(header for _, header, _ in BREAKDOWN_COLUMNS) + " |")
+        lines.append("| --- " * (len(BREAKDOWN_COLUMNS) + 1) + "|")
+        for name, row in shown.iterrows():
+            cells = []
+            for field, _, fmt in BREAKDOWN_COLUMNS:
+                value = row[field]
+                cells.append("N/A" if value is None or pd.isna(value) else fmt.format(value))
+            lines.append(f"| {name} | " + " | ".join(cells) + " |")
+        lines.append("")
+    lines.append("Charges and other credits/debits are statement-level and are not allocated to groups.")
+    lines.append("")
+    return "\n".join(lines)
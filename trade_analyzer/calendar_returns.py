@@ -0,0 +1,211 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Bucket name -> periods per year used to annualize
+PERIODS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12}
+
+MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+RETURN_STATS = [
+    "periods",
+    "positive_pct",
+    "mean_return_pct",
+    "volatility_pct",
+    "best_pct",
+    "worst_pct",
+    "sharpe_ratio",
+    "sortino_ratio",
+]
+
+
+@dataclass
+class CalendarReturns:
+    # One frame per PERIODS_PER_YEAR key, indexed by period start date, with
+    # columns pnl, start_value and return_pct; every period in the span is
+    # present (zero P&L when nothing expired)
+    buckets: Dict[str, pd.DataFrame]
+    # Realized trades without a date (not bucketed)
+    undated_trades: int
+
+    def returns(self, frequency: str) -> pd.Series:
+        """Period returns in % of the portfolio value at the start of the period."""
+        return self.buckets[frequency]["return_pct"]
+
+    def stats(self, risk_free_rate: float) -> pd.DataFrame:
+        """RETURN_STATS per frequency (rows), annualized with PERIODS_PER_YEAR."""
+        rows = {f: period_stats(self.returns(f).to_numpy(), risk_free_rate, PERIODS_PER_YEAR[f]) for f in self.buckets}
+        return pd.DataFrame.from_dict(rows, orient="index", columns=RETURN_STATS)
+
+    def monthly_table(self) -> pd.DataFrame:
+        """Monthly returns % as years x months, plus the compounded year total."""
+        monthly = self.returns("monthly")
+        if monthly.empty:
+            return pd.DataFrame(columns=MONTH_LABELS + ["Year"])
+        grid, first_year = monthly_grid(monthly)
+        table = pd.DataFrame(grid, index=range(first_year, first_year + len(grid)), columns=MONTH_LABELS)
+        growth = (1.0 + table / 100.0).prod(axis=1, min_count=1)
+        table["Year"] = (growth - 1.0) * 100.0
+        return table
+
+
+def period_stats(returns_pct: np.ndarray, risk_free_rate: float, periods_per_year: int) -> Dict[str, float]:
+    """
+    Time-based statistics of one return series (in %).
+
+    Sharpe is the mean excess return over its standard deviation and Sortino
+    the mean excess return over the downside deviation (root mean square of
+    the excess returns below zero), both times sqrt(periods_per_year).
+    """
+    r = np.asarray(returns_pct, dtype=float)
+    r = r[~np.isnan(r)] / 100.0
+    n = len(r)
+    stats = dict.fromkeys(RETURN_STATS, np.nan)
+    stats["periods"] = n
+    if n == 0:
+        return stats
+    stats["positive_pct"] = float((r > 0).mean() * 100.0)
+    stats["mean_return_pct"] = float(r.mean() * 100.0)
+    stats["best_pct"] = float(r.max() * 100.0)
+    stats["worst_pct"] = float(r.min() * 100.0)
+    if n < 2:
+        return stats
+    scale = np.sqrt(periods_per_year)
+    excess = r - risk_free_rate / periods_per_year
+    std = r.std(ddof=1)
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+    stats["volatility_pct"] = float(std * scale * 100.0)
+    stats["sharpe_ratio"] = float(excess.mean() / std * scale) if std > 0 else np.nan
+    stats["sortino_ratio"] = float(excess.mean() / downside * scale) if downside > 0 else np.nan
+    return stats
+
+
+def monthly_grid(monthly: pd.Series):
+    """(years x 12 array of monthly values with NaN outside the span, first year)."""
+    months = monthly.index.to_numpy().astype("datetime64[M]").astype(np.int64)
+    first_year = int(months[0] // 12) + 1970
+    offset = months - (first_year - 1970) * 12
+    grid = np.full(((int(offset[-1]) // 12) + 1) * 12, np.nan)
+    grid[offset] = monthly.to_numpy(dtype=float)
+    return grid.reshape(-1, 12), first_year
+
+
+def _bucket_frame(index: np.ndarray, pnl: np.ndarray, capital: float) -> pd.DataFrame:
+    # Each period's return is on the portfolio value at its start
+    start_value = capital + np.concatenate([[0.0], np.cumsum(pnl)[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(start_value > 0, pnl / start_value * 100.0, np.nan)
+    return pd.DataFrame(
+        {"pnl": pnl, "start_value": start_value, "return_pct": returns},
+        index=pd.DatetimeIndex(index.astype("datetime64[ns]"), name="period"),
+    )
+
+
+def calendar_returns(
+    trade_pnl: np.ndarray,
+    dates: np.ndarray,
+    initial_capital: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> CalendarReturns:
+    """
+    Daily, weekly and monthly P&L and returns from per-trade P&L and dates.
+
+    Each trade is mapped to an integer business-day index (weekend dates
+    roll back to Friday) and the P&L is summed per day with one bincount;
+    weeks (Monday start) are a bincount over the daily series and months a
+    bincount over the trades' month index.
+    The span covers the statement period and every trade date, so quiet
+    periods count as zero returns. Returns are on the portfolio value
+    (initial_capital plus realized P&L so far) at the start of each period.
+    """
+    pnl = np.asarray(trade_pnl, dtype=float)
+    days = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+    dated = ~np.isnat(days)
+    pnl, days = pnl[dated], days[dated]
+    capital = initial_capital if initial_capital > 0 else np.nan
+
+    bounds = [np.datetime64(pd.Timestamp(d).date(), "D") for d in (start_date, end_date) if d is not None and not pd.isna(d)]
+    span = np.concatenate([np.array(bounds, dtype="datetime64[D]"), days])
+    if len(span) == 0:
+        empty = _bucket_frame(np.empty(0, dtype="datetime64[D]"), np.empty(0), capital)
+        return CalendarReturns({f: empty for f in PERIODS_PER_YEAR}, int((~dated).sum()))
+
+    # The business days from the first to the last day of the span; a
+    # period starting on a weekend starts on the following Monday
+    trade_days = np.busday_offset(days, 0, roll="backward")
+    ends = np.concatenate([np.busday_offset(np.array(bounds, dtype="datetime64[D]"), 0, roll="forward"), trade_days])
+    first = ends.min()
+    n_days = int(np.busday_count(first, ends.max())) + 1
+
+    day_idx = np.busday_count(first, trade_days)
+    daily_pnl = np.bincount(day_idx, weights=pnl, minlength=n_days)
+    daily_index = np.busday_offset(first, np.arange(n_days))
+
+    # 1970-01-01 was a Thursday: shifting by 3 days makes weeks start on Monday
+    week_id = (daily_index.astype(np.int64) + 3) // 7
+    week_pnl = np.bincount(week_id - week_id[0], weights=daily_pnl)
+    week_index = ((np.arange(week_id[0], week_id[-1] + 1) * 7) - 3).astype("datetime64[D]")
+
+    # Months from the trade dates themselves: a rolled-back weekend date may
+    # fall in the previous month
+    first_month, last_month = span.min().astype("datetime64[M]"), span.max().astype("datetime64[M]")
+    month_idx = (days.astype("datetime64[M]") - first_month).astype(np.int64)
+    n_months = int((last_month - first_month).astype(np.int64)) + 1
+    month_pnl = np.bincount(month_idx, weights=pnl, minlength=n_months)
+    month_index = np.arange(first_month, last_month + 1).astype("datetime64[D]")
+
+    return CalendarReturns(
+        buckets={
+            "daily": _bucket_frame(daily_index, daily_pnl, capital),
+            "weekly": _bucket_frame(week_index, week_pnl, capital),
+            "monthly": _bucket_frame(month_index, month_pnl, capital),
+        },
+        undated_trades=int((~dated).sum()),
+    )
+
+
+def _fmt(value, fmt: str) -> str:
+    return "N/A" if value is None or pd.isna(value) else fmt.format(value)
+
+
+def calendar_section(result: CalendarReturns, risk_free_rate: float) -> str:
+    """Markdown section with time-based statistics and the monthly returns table."""
+    labels = [
+        ("periods", "Periods", "{:,.0f}"),
+        ("positive_pct", "Positive %", "{:.2f}"),
+        ("mean_return_pct", "Mean Return %", "{:.3f}"),
+        ("volatility_pct", "Volatility % (ann.)", "{:.2f}"),
+        ("best_pct", "Best %", "{:.2f}"),
+        ("worst_pct", "Worst %", "{:.2f}"),
+        ("sharpe_ratio", "Sharpe Ratio", "{:.2f}"),
+        ("sortino_ratio", "Sortino Ratio", "{:.2f}"),
+    ]
+    lines: List[str] = ["## Calendar Returns", ""]
+    lines.append(
+        "Realized P&L bucketed by trade date; returns are on the portfolio value at the start of each period"
+        " and ratios are annualized with " + ", ".join(f"{n} {f}" for f, n in PERIODS_PER_YEAR.items()) + " periods."
+    )
+    if result.undated_trades:
+        lines.append(f"{result.undated_trades} trade(s) without a date are not included.")
+    lines.append("")
+    stats = result.stats(risk_free_rate)
+    lines.append("| Frequency | " + " | ".join(header for _, header, _ in labels) + " |")
+    lines.append("| --- " * (len(labels) + 1) + "|")
+    for frequency, row in stats.iterrows():
+        lines.append(f"| {frequency.title()} | " + " | ".join(_fmt(row[k], fmt) for k, _, fmt in labels) + " |")
+    lines.append("")
+
+    table = result.monthly_table()
+    if not table.empty:
+        lines.append("### Monthly Returns %")
+        lines.append("")
+        lines.append("| Year | " + " | ".join(table.columns) + " |")
+        lines.append("| --- " * (len(table.columns) + 1) + "|")
+        for year, row in table.iterrows():
+            lines.append(f"| {year} | " + " | ".join(_fmt(v, "{:.2f}") if pd.notna(v) else "" for v in row) + " |")
+        lines.append("")
+    return "\n".join(lines)
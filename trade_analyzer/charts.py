@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from profiling import stage
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+# Bump when the drawing code changes so existing files are re-rendered
+CHART_VERSION = 1
+
+# Cumulative curves longer than this are min/max decimated before plotting
+MAX_CURVE_POINTS = 4000
+# Draw per-trade markers only for short curves
+MAX_MARKER_POINTS = 500
+# Write the value in each heatmap cell up to this many cells
+MAX_HEATMAP_LABELS = 240
+
+HIST_BINS = 30
+KDE_GRID_POINTS = 512
+
+MANIFEST_NAME = ".charts.json"
+
+ChartPayload = Dict[str, Any]
+
+
+def downsample_minmax(y: np.ndarray, max_points: int = MAX_CURVE_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a long series to about max_points, keeping each bucket's min and max.
+
+    Returns (x, y) where x are the original indices, so peaks and troughs
+    (and therefore the visible drawdowns) survive the reduction.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n), np.asarray(y, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_buckets = max(max_points // 2, 1)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    filled = ~np.isnan(blocks).all(axis=1)
+    base = np.flatnonzero(filled) * size
+    lows = base + np.nanargmin(blocks[filled], axis=1)
+    highs = base + np.nanargmax(blocks[filled], axis=1)
+    keep = np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+    return keep, y[keep]
+
+
+def binned_kde(values: np.ndarray, n_points: int = KDE_GRID_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gaussian KDE (Scott's bandwidth) evaluated on a grid by binning the data first.
+
+    Cost is O(n + n_points^2) instead of O(n * n_points), which keeps the
+    histogram overlay cheap for very large trade counts. Returns a density.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or std == 0:
+        return np.empty(0), np.empty(0)
+    bandwidth = std * n ** (-1.0 / 5.0)
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=n_points, range=(lo, hi))
+    grid = (edges[:-1] + edges[1:]) / 2
+    step = grid[1] - grid[0]
+    offsets = np.arange(-n_points + 1, n_points) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    density = np.convolve(counts, kernel, mode="valid") / n
+    return grid, density
+
+
+def _new_figure(figsize: Tuple[float, float]) -> "Figure":
+    # matplotlib is only imported once a chart is actually drawn
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=figsize)
+
+
+def _style_axes(ax) -> None:
+    # Whitegrid look without touching global rcParams (safe from threads)
+    ax.set_facecolor("white")
+    ax.set_axisbelow(True)
+    ax.grid(True, color="#dddddd", linewidth=0.8)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+
+def _draw_cumulative(payload: ChartPayload) -> "Figure":
+    fig = _new_figure((10, 5))
+    ax = fig.subplots()
+    _style_axes(ax)
+    ax.plot(payload["x"], payload["y"], marker="o" if len(payload["y"]) <= MAX_MARKER_POINTS else None)
+    ax.set_title("Cumulative Realized P&L")
+    ax.set_xlabel("Trade Index")
+    ax.set_ylabel("Cumulative P&L")
+    return fig
+
+
+def _draw_pie(payload: ChartPayload) -> "Figure":
+    fig = _new_figure((6, 6))
+    ax = fig.subplots()
+    ax.pie(
+        payload["sizes"],
+        labels=["Winning", "Losing", "Breakeven"],
+        autopct="%1.1f%%",
+        startangle=90,
+    )
+    ax.set_title("Win / Loss / Breakeven Distribution")
+    return fig
+
+
+def _draw_histogram(payload: ChartPayload) -> "Figure":
+    fig = _new_figure((10, 5))
+    ax = fig.subplots()
+    _style_axes(ax)
+    edges = payload["edges"]
+    ax.stairs(payload["counts"], edges, fill=True, alpha=0.6, edgecolor="white")
+    if len(payload["kde_x"]):
+        # Scale the density to the histogram's count axis
+        ax.plot(payload["kde_x"], payload["kde_y"] * payload["n"] * (edges[1] - edges[0]))
+    ax.set_title("Distribution of Realized Trade P&L")
+    ax.set_xlabel("Realized P&L per Trade")
+    ax.set_ylabel("Count")
+    return fig
+
+
+def _draw_rolling(payload: ChartPayload) -> "Figure":
+    fig = _new_figure((10, 8))
+    axes = fig.subplots(3, 1, sharex=True)
+    days = int(payload["days"][0])
+    span = f"{days} calendar days" if days else f"{int(payload['window'][0])} trades"
+    series = [
+        ("win_rate", "Win Rate %", None),
+        ("sharpe", "Sharpe Ratio", None),
+        ("drawdown", "Drawdown %", "tab:red"),
+    ]
+    for ax, (key, label, color) in zip(axes, series):
+        _style_axes(ax)
+        ax.plot(payload["x"], payload[key], color=color)
+        ax.set_ylabel(label)
+    axes[2].fill_between(payload["x"], payload["drawdown"], 0, color="tab:red", alpha=0.2)
+    axes[0].set_title(f"Rolling Metrics (last {span})")
+    axes[2].set_xlabel("Trade Index")
+    return fig
+
+
+def _draw_underwater(payload: ChartPayload) -> "Figure":
+    fig = _new_figure((10, 4))
+    ax = fig.subplots()
+    _style_axes(ax)
+    ax.fill_between(payload["x"], payload["y"], 0, color="tab:red", alpha=0.3, linewidth=0)
+    ax.plot(payload["x"], payload["y"], color="tab:red", linewidth=1)
+    ax.set_title("Underwater Curve (Drawdown from Running Peak)")
+    ax.set_xlabel("Trade Index")
+    ax.set_ylabel("Drawdown %")
+    return fig
+
+
+def _draw_monthly_heatmap(payload: ChartPayload) -> "Figure":
+    grid = payload["returns"]
+    first_year = int(payload["first_year"][0])
+    years = np.arange(first_year, first_year + grid.shape[0])
+    fig = _new_figure((10, 1.6 + 0.45 * len(years)))
+    ax = fig.subplots()
+    # Diverging colors centred on 0 so gains and losses are comparable
+    limit = float(np.nanmax(np.abs(grid))) if np.isfinite(grid).any() else 1.0
+    im = ax.imshow(grid, cmap="RdYlGn", vmin=-(limit or 1.0), vmax=limit or 1.0, aspect="auto")
+    ax.set_xticks(range(12))
+    ax.set_xticklabels(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+    ax.set_yticks(range(len(years)))
+    ax.set_yticklabels([str(y) for y in years])
+    if grid.size <= MAX_HEATMAP_LABELS:
+        for (row, col), value in np.ndenumerate(grid):
+            if np.isfinite(value):
+                ax.text(col, row, f"{value:.1f}", ha="center", va="center", fontsize=8)
+    ax.set_title("Monthly Returns %")
+    fig.colorbar(im, ax=ax, label="Return %")
+    return fig
+
+
+def _draw_sweep_heatmap(payload: ChartPayload, title: str) -> "Figure":
+    grid = payload["grid"]
+    fig = _new_figure((8, 6))
+    ax = fig.subplots()
+    im = ax.imshow(grid, aspect="auto", origin="lower", cmap="viridis")
+    ax.set_xticks(range(len(payload["rates"])))
+    ax.set_xticklabels([f"{r:.2%}" for r in payload["rates"]], rotation=45)
+    ax.set_yticks(range(len(payload["capitals"])))
+    ax.set_yticklabels([f"{c:,.0f}" for c in payload["capitals"]])
+    ax.set_xlabel("Risk-Free Rate")
+    ax.set_ylabel("Initial Capital")
+    ax.set_title(f"{title} by Capital and Risk-Free Rate")
+    fig.colorbar(im, ax=ax)
+    return fig
+
+
+CHART_DRAWERS: Dict[str, Callable[[ChartPayload], "Figure"]] = {
+    "cumulative_pnl": _draw_cumulative,
+    "wins_losses_pie": _draw_pie,
+    "pnl_histogram": _draw_histogram,
+    "rolling_metrics": _draw_rolling,
+    "underwater": _draw_underwater,
+    "monthly_returns": _draw_monthly_heatmap,
+    "sweep_sharpe_ratio": partial(_draw_sweep_heatmap, title="Sharpe Ratio"),
+    "sweep_sortino_ratio": partial(_draw_sweep_heatmap, title="Sortino Ratio"),
+}
+
+
+def cumulative_payload(cum_pnl: np.ndarray, max_points: int = MAX_CURVE_POINTS) -> ChartPayload:
+    x, y = downsample_minmax(np.asarray(cum_pnl, dtype=float), max_points)
+    return {"x": x, "y": y}
+
+
+def pie_payload(winning: int, losing: int, breakeven: int) -> ChartPayload:
+    return {"sizes": np.array([winning, losing, breakeven])}
+
+
+def histogram_payload(pnl: np.ndarray) -> ChartPayload:
+    pnl = np.asarray(pnl, dtype=float)
+    counts, edges = np.histogram(pnl, bins=HIST_BINS)
+    kde_x, kde_y = binned_kde(pnl)
+    return {"counts": counts, "edges": edges, "kde_x": kde_x, "kde_y": kde_y, "n": len(pnl)}
+
+
+def underwater_payload(underwater_pct: np.ndarray, max_points: int = MAX_CURVE_POINTS) -> ChartPayload:
+    x, y = downsample_minmax(np.nan_to_num(np.asarray(underwater_pct, dtype=float)), max_points)
+    return {"x": x, "y": y}
+
+
+def monthly_heatmap_payload(returns: np.ndarray, first_year: int) -> ChartPayload:
+    """Monthly returns % as a years x 12 grid (NaN outside the period)."""
+    return {"returns": np.asarray(returns, dtype=float), "first_year": np.array([first_year])}
+
+
+def sweep_heatmap_payload(grid: np.ndarray, capitals: np.ndarray, rates: np.ndarray) -> ChartPayload:
+    """A metric over a capitals x rates grid (rows: capital, columns: rate)."""
+    return {"grid": np.asarray(grid, dtype=float), "capitals": np.asarray(capitals, dtype=float), "rates": np.asarray(rates, dtype=float)}
+
+
+def rolling_payload(
+    trade: np.ndarray,
+    win_rate: np.ndarray,
+    sharpe: np.ndarray,
+    drawdown: np.ndarray,
+    window: Optional[int] = None,
+    days: Optional[int] = None,
+    max_points: int = MAX_CURVE_POINTS,
+) -> ChartPayload:
+    """
+    Rolling series for the chart; long series keep the points picked by
+    min/max decimation of the drawdown, so the deepest drawdowns are drawn.
+    """
+    drawdown = np.asarray(drawdown, dtype=float)
+    if np.isnan(drawdown).all():
+        keep = np.arange(len(drawdown))
+        if len(keep) > max_points:
+            keep = np.linspace(0, len(keep) - 1, max_points).astype(int)
+    else:
+        keep, _ = downsample_minmax(drawdown, max_points)
+    return {
+        "x": np.asarray(trade)[keep],
+        "win_rate": np.asarray(win_rate, dtype=float)[keep],
+        "sharpe": np.asarray(sharpe, dtype=float)[keep],
+        "drawdown": drawdown[keep],
+        "window": np.array([window or 0]),
+        "days": np.array([days or 0]),
+    }
+
+
+def render_chart(name: str, payload: ChartPayload, fmt: str = "png") -> bytes:
+    """Draw one chart on its own Figure and return the encoded image."""
+    with stage(f"plots.{name}"):
+        fig = CHART_DRAWERS[name](payload)
+        fig.tight_layout()
+        buf = BytesIO()
+        fig.savefig(buf, format=fmt)
+        return buf.getvalue()
+
+
+def payload_hash(name: str, payload: ChartPayload, fmt: str = "png") -> str:
+    h = hashlib.sha256(f"{name}:{fmt}:v{CHART_VERSION}".encode())
+    for key in sorted(payload):
+        h.update(key.encode())
+        h.update(np.ascontiguousarray(payload[key], dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def render_charts(
+    payloads: Dict[str, ChartPayload],
+    fmt: str = "png",
+    workers: Optional[int] = None,
+) -> Dict[str, bytes]:
+    """
+    Render several charts, in parallel worker processes when workers > 1.
+    """
+    names = list(payloads)
+    if workers is not None and workers > 1 and len(names) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(names))) as pool:
+            images = pool.map(render_chart, names, [payloads[n] for n in names], [fmt] * len(names))
+            return dict(zip(names, images))
+    return {name: render_chart(name, payloads[name], fmt) for name in names}
+
+
+def _load_manifest(output_dir: str) -> Dict[str, Dict[str, str]]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def write_charts(
+    payloads: Dict[str, ChartPayload],
+    output_dir: str,
+    fmt: str = "png",
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, str]:
+    """
+    Render charts into output_dir, skipping any whose input data is unchanged.
+
+    A manifest in output_dir records the payload hash behind each file; a
+    chart is only re-rendered when its hash differs or the file is missing.
+    Returns a dict mapping chart name -> path.
+    """
+    manifest = _load_manifest(output_dir)
+    paths: Dict[str, str] = {}
+    stale: Dict[str, ChartPayload] = {}
+    hashes: Dict[str, str] = {}
+    for name, payload in payloads.items():
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        paths[name] = path
+        hashes[name] = payload_hash(name, payload, fmt)
+        if force or manifest.get(name, {}).get("hash") != hashes[name] or not os.path.exists(path):
+            stale[name] = payload
+
+    if stale:
+        for name, image in render_charts(stale, fmt=fmt, workers=workers).items():
+            _write_atomic(paths[name], image)
+            manifest[name] = {"hash": hashes[name], "file": os.path.basename(paths[name])}
+        _write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+    return paths
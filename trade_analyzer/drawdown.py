@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_TOP_EPISODES = 5
+
+EPISODE_COLUMNS = [
+    "peak_trade",
+    "trough_trade",
+    "recovery_trade",
+    "peak_date",
+    "trough_date",
+    "recovery_date",
+    "peak_value",
+    "trough_value",
+    "depth",
+    "depth_pct",
+    "duration_trades",
+    "duration_days",
+    "recovered",
+]
+
+
+@dataclass
+class DrawdownAnalysis:
+    # Drawdown % of portfolio value after each trade (0 at a new high)
+    underwater_pct: np.ndarray
+    # One row per drawdown episode, deepest first (see EPISODE_COLUMNS)
+    episodes: pd.DataFrame
+    # Share of trades that ended below the running peak, in %
+    time_under_water_pct: float
+    longest_underwater_trades: int
+    longest_underwater_days: Optional[int]
+
+    def top(self, n: int = DEFAULT_TOP_EPISODES) -> pd.DataFrame:
+        return self.episodes.head(n)
+
+
+def _drawdown_pct(value: np.ndarray, peak: np.ndarray) -> np.ndarray:
+    # As MetricsState.max_drawdown_pct: below zero the peak itself is the
+    # worst ratio (0), and a zero peak has no ratio
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peak > 0, (value - peak) / peak * 100.0, np.where(peak < 0, 0.0, np.nan))
+
+
+def analyze_drawdowns(
+    trade_pnl: np.ndarray,
+    initial_capital: float = 0.0,
+    dates: Optional[np.ndarray] = None,
+) -> DrawdownAnalysis:
+    """
+    Underwater curve and drawdown episodes of the cumulative realized P&L.
+
+    Uses the same curve as compute_drawdown / MetricsState (portfolio value
+    initial_capital + cumulative P&L, starting at the first trade), so the
+    deepest episode's depth_pct equals Max Drawdown %. An episode runs from
+    a peak through the trades below it to the first trade back at or above
+    it (the recovery); the last episode may be unrecovered. Everything
+    comes from one running max plus segmented reductions over the trades.
+
+    Trade numbers are 1-based positions in the date-sorted trades; dates
+    (optional, one per trade) add calendar dates and day durations.
+    """
+    pnl = np.asarray(trade_pnl, dtype=float)
+    n = len(pnl)
+    if initial_capital <= 0:
+        initial_capital = 1.0  # as compute_drawdown: drawdown relative to P&L scale
+    value = initial_capital + np.cumsum(pnl)
+    peak = np.maximum.accumulate(value) if n else value
+    underwater = _drawdown_pct(value, peak)
+
+    below = value < peak
+    # Runs of consecutive trades below the running peak; each run follows
+    # the trade that set its peak
+    edges = np.diff(np.concatenate([[False], below, [False]]).astype(np.int8))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)  # exclusive
+    if dates is not None:
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+
+    episodes = pd.DataFrame(columns=EPISODE_COLUMNS)
+    longest_days = None
+    if len(run_starts):
+        lengths = run_ends - run_starts
+        run_id = np.repeat(np.arange(len(run_starts)), lengths)
+        positions = np.flatnonzero(below)  # the runs, back to back
+        troughs = np.minimum.reduceat(value[positions], np.concatenate([[0], np.cumsum(lengths)[:-1]]))
+        # First position of each run's minimum
+        at_trough = value[positions] == troughs[run_id]
+        _, first = np.unique(run_id[at_trough], return_index=True)
+        trough_pos = positions[at_trough][first]
+
+        peak_pos = run_starts - 1
+        recovered = run_ends < n
+        recovery_pos = np.where(recovered, run_ends, 0)
+        peak_value = value[peak_pos]
+        trough_value = value[trough_pos]
+        end_pos = np.where(recovered, run_ends, n - 1)
+        depth_pct = _drawdown_pct(trough_value, peak_value)
+
+        episodes = pd.DataFrame(
+            {
+                "peak_trade": peak_pos + 1,
+                "trough_trade": trough_pos + 1,
+                "recovery_trade": pd.Series(recovery_pos + 1.0).where(recovered).astype("Int64"),
+                "peak_date": pd.NaT,
+                "trough_date": pd.NaT,
+                "recovery_date": pd.NaT,
+                "peak_value": peak_value,
+                "trough_value": trough_value,
+                "depth": trough_value - peak_value,
+                "depth_pct": depth_pct,
+                "duration_trades": end_pos - peak_pos,
+                "duration_days": pd.Series(np.nan, index=range(len(peak_pos))).astype("Int64"),
+                "recovered": recovered,
+            }
+        )
+        if dates is not None:
+            episodes["peak_date"] = dates[peak_pos]
+            episodes["trough_date"] = dates[trough_pos]
+            episodes["recovery_date"] = np.where(recovered, dates[recovery_pos], np.datetime64("NaT"))
+            days = (dates[end_pos] - dates[peak_pos]) / np.timedelta64(1, "D")
+            episodes["duration_days"] = pd.Series(days).round().astype("Int64")
+            if episodes["duration_days"].notna().any():
+                longest_days = int(episodes["duration_days"].max())
+        episodes = episodes.sort_values(["depth_pct", "peak_trade"], kind="stable").reset_index(drop=True)
+
+    return DrawdownAnalysis(
+        underwater_pct=underwater,
+        episodes=episodes,
+        time_under_water_pct=float(below.mean() * 100.0) if n else 0.0,
+        longest_underwater_trades=int((run_ends - run_starts).max()) if len(run_starts) else 0,
+        longest_underwater_days=longest_days,
+    )
+
+
+def _fmt_date(value) -> str:
+    return "-" if value is None or pd.isna(value) else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def drawdown_section(analysis: DrawdownAnalysis, top: int = DEFAULT_TOP_EPISODES) -> str:
+    """Markdown section with the time under water and the deepest episodes."""
+    lines: List[str] = ["## Drawdown Episodes", ""]
+    lines.append(f"- Time under water: {analysis.time_under_water_pct:.2f}% of trades")
+    lines.append(f"- Longest stretch under water: {analysis.longest_underwater_trades} consecutive trades")
+    if analysis.longest_underwater_days is not None:
+        lines.append(f"- Longest episode (peak to recovery or end): {analysis.longest_underwater_days} days")
+    lines.append(f"- Episodes: {len(analysis.episodes)}")
+    lines.append("")
+    if analysis.episodes.empty:
+        lines.append("No drawdowns: every trade set a new high.")
+        lines.append("")
+        return "\n".join(lines)
+    lines.append("| # | Peak | Trough | Recovery | Depth | Depth % | Duration (trades) | Duration (days) |")
+    lines.append("| --- | --- | --- | --- | --- | --- | --- | --- |")
+    for i, ep in enumerate(analysis.top(top).itertuples(index=False), start=1):
+        peak = f"#{ep.peak_trade} {_fmt_date(ep.peak_date)}"
+        trough = f"#{ep.trough_trade} {_fmt_date(ep.trough_date)}"
+        recovery = f"#{ep.recovery_trade} {_fmt_date(ep.recovery_date)}" if ep.recovered else "not recovered"
+        depth_pct = f"{ep.depth_pct:.2f}" if pd.notna(ep.depth_pct) else "N/A"
+        days = f"{ep.duration_days}" if pd.notna(ep.duration_days) else "-"
+        lines.append(
+            f"| {i} | {peak} | {trough} | {recovery} | {ep.depth:,.2f} | {depth_pct} | {ep.duration_trades} | {days} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
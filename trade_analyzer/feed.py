@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Bump when the feed layout changes (read by financial-dashboard)
+FEED_VERSION = 1
+
+# Default number of points kept from the cumulative P&L curve
+DEFAULT_FEED_POINTS = 200
+
+WIN_LOSS_COLORS = {"Wins": "#22c55e", "Losses": "#ef4444", "Breakeven": "#a3a3a3"}
+
+# (label, Metrics field, format, row type). The row type is either fixed
+# ("positive" / "negative" / "neutral") or a pivot: above it is positive,
+# below it negative.
+SUMMARY_ROWS = [
+    ("Total Realized P&L", "total_realized_pnl", "{:,.2f}", 0.0),
+    ("Total Unrealized P&L", "total_unrealized_pnl", "{:,.2f}", 0.0),
+    ("Total Charges", "total_charges", "{:,.2f}", "neutral"),
+    ("Other Credits/Debits", "other_credits_debits", "{:,.2f}", 0.0),
+    ("Net P&L (after charges)", "net_pnl", "{:,.2f}", 0.0),
+    ("Portfolio Value", "portfolio_value", "{:,.2f}", "neutral"),
+]
+
+# Same rows and explanations as the report's Performance Metrics table
+METRIC_ROWS = [
+    ("Total Trades", "total_trades", "{:d}", "Number of trades with non-zero realized P&L", "neutral"),
+    ("Winning Trades", "winning_trades", "{:d}", "Trades with positive realized P&L", "positive"),
+    ("Losing Trades", "losing_trades", "{:d}", "Trades with negative realized P&L", "negative"),
+    ("Breakeven Trades", "breakeven_trades", "{:d}", "Trades with zero realized P&L", "neutral"),
+    ("Win Rate %", "win_rate", "{:.2f}%", "Winning trades / total trades", 50.0),
+    ("Average Win", "avg_win", "{:,.2f}", "Mean P&L of winning trades", "positive"),
+    ("Average Loss", "avg_loss", "{:,.2f}", "Mean P&L of losing trades (negative)", "negative"),
+    ("Win/Loss Ratio", "win_loss_ratio", "{:.2f}", "Average win / average loss (abs)", 1.0),
+    ("Expectancy", "expectancy", "{:,.2f}", "Expected P&L per trade", 0.0),
+    ("Profit Factor", "profit_factor", "{:.2f}", "Total profits / total losses", 1.0),
+    ("Total Return %", "total_return_pct", "{:.2f}%", "Net P&L / initial capital", 0.0),
+    ("Sharpe Ratio", "sharpe_ratio", "{:.2f}", "Risk-adjusted return (all volatility)", 0.0),
+    ("Sortino Ratio", "sortino_ratio", "{:.2f}", "Risk-adjusted return (downside volatility only)", 0.0),
+    ("Max Drawdown %", "max_drawdown_pct", "{:.2f}%", "Max peak-to-trough decline on cumulative P&L", "negative"),
+    ("CAGR", "cagr", "{:.0%}", "Compounded annual growth rate (approx)", 0.0),
+    ("Avg Trade Duration (days)", "avg_trade_duration_days", "{:.2f}", "Approx. period / total trades", "neutral"),
+]
+
+
+def lttb(y: np.ndarray, max_points: int = DEFAULT_FEED_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling of a series indexed 0..n-1.
+
+    Keeps the first and last points and, from each of max_points - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the next bucket's average, so the visual
+    shape (including sharp peaks and drawdowns) survives. Returns (x, y)
+    where x are the original indices.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points or n < 3:
+        return np.arange(n), y
+    if max_points < 3:
+        keep = np.array([0, n - 1])
+        return keep, y[keep]
+
+    # max_points - 2 buckets over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = (next_lo + next_hi - 1) / 2.0
+        next_y = y[next_lo:next_hi].mean()
+
+        xs = np.arange(lo, hi)
+        area = np.abs((a - next_x) * (y[lo:hi] - y[a]) - (a - xs) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep, y[keep]
+
+
+def _date_str(value: Any) -> Optional[str]:
+    if value is None or value != value:
+        return None
+    return value.strftime("%Y-%m-%d") if hasattr(value, "strftime") else str(value)
+
+
+def _row_type(value: Optional[float], kind: Any) -> str:
+    if isinstance(kind, str):
+        return kind
+    if value is None or np.isnan(value) or value == kind:
+        return "neutral"
+    return "positive" if value > kind else "negative"
+
+
+def _row(label: str, value: Any, fmt: str, kind: Any) -> Dict[str, Any]:
+    if isinstance(value, np.generic):
+        value = value.item()
+    missing = value is None or (isinstance(value, float) and np.isnan(value))
+    return {
+        "metric": label,
+        "value": "N/A" if missing else fmt.format(value),
+        # JSON has no NaN / Infinity
+        "raw": value if not missing and np.isfinite(value) else None,
+        "type": _row_type(None if missing else float(value), kind),
+    }
+
+
+def build_feed(
+    metrics: Any,
+    trade_pnl: np.ndarray,
+    max_points: int = DEFAULT_FEED_POINTS,
+    start_date: Any = None,
+    end_date: Any = None,
+) -> Dict[str, Any]:
+    """
+    Build the dashboard feed from a Metrics object and the realized trade P&L
+    (in trade order, see realized_pnl_series).
+
+    The cumulative P&L curve is reduced to at most max_points with LTTB, so
+    the feed size does not grow with the number of trades.
+    """
+    values = asdict(metrics)
+    summary = [_row(label, values[field], fmt, kind) for label, field, fmt, kind in SUMMARY_ROWS]
+    rows: List[Dict[str, Any]] = []
+    for label, field, fmt, explanation, kind in METRIC_ROWS:
+        row = _row(label, values[field], fmt, kind)
+        row["explanation"] = explanation
+        rows.append(row)
+
+    counts = [("Wins", metrics.winning_trades), ("Losses", metrics.losing_trades)]
+    if metrics.breakeven_trades:
+        counts.append(("Breakeven", metrics.breakeven_trades))
+    win_loss = [{"name": name, "value": int(count), "color": WIN_LOSS_COLORS[name]} for name, count in counts]
+
+    # Trade 0 is the starting point (no P&L yet)
+    cum_pnl = np.concatenate([[0.0], np.cumsum(np.asarray(trade_pnl, dtype=float))])
+    x, y = lttb(cum_pnl, max_points)
+    curve = [{"trade": int(t), "pnl": round(float(p), 2)} for t, p in zip(x, y)]
+
+    return {
+        "version": FEED_VERSION,
+        "period": {"start": _date_str(start_date), "end": _date_str(end_date)},
+        "summary": summary,
+        "metrics": rows,
+        "winLoss": win_loss,
+        "cumulativePnl": curve,
+    }
+
+
+def write_feed(feed: Dict[str, Any], output_path: str) -> None:
+    """Write the feed as JSON, replacing output_path atomically."""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(feed, f, indent=2)
+        f.write("\n")
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, output_path)
@@ -1,10 +1,37 @@
-import os
+import hashlib
+import json
 from io import BytesIO
 
 import streamlit as st
 import pandas as pd
 
-from trade_analyzer import load_data, compute_metrics, generate_plots, generate_report, _ensure_plots_dir
+from trade_analyzer import load_data_cached, compute_metrics, render_html_report, render_plots, render_report
+from profiling import profiling, stage
+
+# Bounds for the in-process caches shared by all sessions
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL_SECONDS = 60 * 60
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _parse_upload(upload_key: str, _data: bytes):
+    """Parse stage: keyed by the upload's content hash only."""
+    return load_data_cached(BytesIO(_data))
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES * 8, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _compute(upload_key: str, _parsed, initial_capital: float, risk_free_rate: float):
+    """Metrics stage: the only stage that reruns when capital or risk-free rate change."""
+    df, total_charges, other_credits_debits, start_date, end_date = _parsed
+    setattr(df, "_total_charges", total_charges)
+    setattr(df, "_other_credits_debits", other_credits_debits)
+    return compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _plots(upload_key: str, _df: pd.DataFrame, _metrics):
+    """Plot stage: charts don't depend on capital or risk-free rate."""
+    return render_plots(_df, _metrics)
 
 
 def main():
@@ -17,7 +44,7 @@ def main():
         """
     )
 
-    uploaded_file = st.file_uploader("Upload Zerodha P&L Excel file", type=["xlsx", "xls"])
+    uploaded_file = st.file_uploader("Upload Zerodha P&L statement (Excel or CSV)", type=["xlsx", "xls", "csv"])
 
     col1, col2 = st.columns(2)
     with col1:
@@ -25,40 +52,60 @@ def main():
     with col2:
         risk_free_rate = st.number_input("Risk-Free Rate (annual, %)", min_value=0.0, value=3.0, step=0.5) / 100.0
 
+    profile = st.sidebar.checkbox(
+        "Profile stages",
+        help="Record wall time, CPU time and peak memory of each stage. Cached stages do not rerun and are not listed.",
+    )
+
     if uploaded_file is not None:
         if st.button("Generate Report"):
-            with st.spinner("Processing file and generating report..."):
-                # Read uploaded file into a temp buffer for pandas
-                data = uploaded_file.read()
-                buffer = BytesIO(data)
-
-                df, total_charges, other_credits_debits, start_date, end_date = load_data(buffer)
-                setattr(df, "_total_charges", total_charges)
-                setattr(df, "_other_credits_debits", other_credits_debits)
-
-                metrics = compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
-
-                base_dir = os.getcwd()
-                plots_dir = _ensure_plots_dir(base_dir)
-                plots = generate_plots(df, metrics, plots_dir)
-
-                report_path = os.path.join(base_dir, "report_streamlit.md")
-                generate_report(metrics, df, plots, report_path)
-
-                st.success("Report generated.")
-
-                # Display report content inline
-                with open(report_path, "r", encoding="utf-8") as f:
-                    report_md = f.read()
-                st.markdown(report_md)
-
-                # Show plots inline if available
-                if plots:
-                    st.subheader("Plots")
-                    for name, path in plots.items():
-                        st.image(path, caption=name.replace("_", " ").title(), use_column_width=True)
+            with st.spinner("Processing file and generating report..."), profiling(profile) as profiler:
+                data = uploaded_file.getvalue()
+                upload_key = hashlib.sha256(data).hexdigest()
+
+                with stage("load"):
+                    parsed = _parse_upload(upload_key, data)
+                with stage("metrics"):
+                    metrics = _compute(upload_key, parsed, initial_capital, risk_free_rate)
+                with stage("plots"):
+                    images = _plots(upload_key, parsed[0], metrics)
+
+                # Rendered in memory and kept per session; nothing is written to disk
+                plot_names = {name: f"{name}.png" for name in images}
+                with stage("report"):
+                    report_md = render_report(metrics, parsed[0], plot_names)
+                    report_html = render_html_report(metrics, parsed[0], images, fmt="png")
+                st.session_state["report"] = (report_md, images, report_html)
+            st.session_state["profile"] = profiler.trace() if profiler is not None else None
+
+        trace = st.session_state.get("profile")
+        if profile and trace:
+            st.sidebar.subheader("Profile")
+            st.sidebar.dataframe(
+                pd.DataFrame(trace["stages"]).assign(
+                    stage=lambda t: ["  " * d + n for d, n in zip(t["depth"], t["name"])],
+                    peak_mb=lambda t: pd.to_numeric(t["peak_memory_bytes"]) / (1024 * 1024),
+                )[["stage", "wall_seconds", "cpu_seconds", "peak_mb"]],
+                hide_index=True,
+            )
+            if not trace["memory_traced"]:
+                st.sidebar.caption("Memory was already being traced elsewhere, so peaks are not recorded.")
+            st.sidebar.download_button("Download trace (JSON)", json.dumps(trace, indent=2), file_name="profile.json")
+
+        if "report" in st.session_state:
+            report_md, images, report_html = st.session_state["report"]
+            st.success("Report generated.")
+            st.download_button("Download HTML report", report_html, file_name="report.html", mime="text/html")
+
+            # Display report content inline
+            st.markdown(report_md)
+
+            # Show plots inline if available
+            if images:
+                st.subheader("Plots")
+                for name, image in images.items():
+                    st.image(image, caption=name.replace("_", " ").title(), use_column_width=True)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,154 @@
+"""
+Self-contained HTML reports.
+
+The Markdown report (render_report) is converted to HTML and the charts are
+embedded inline, as SVG markup or base64 PNG data URIs, so the document has
+no external references. Everything is rendered in memory; write_html sends
+the bytes to a binary stream or replaces a file atomically.
+"""
+import base64
+import html
+import os
+import re
+import tempfile
+from typing import BinaryIO, Dict, List, Union
+
+HTML_CHART_FORMATS = ["svg", "png"]
+DEFAULT_HTML_CHART_FORMAT = "svg"
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #222; max-width: 1100px; margin: 2em auto; padding: 0 1em; }
+h1 { font-size: 1.6em; margin-bottom: 0.2em; }
+h2 { font-size: 1.25em; margin-top: 1.8em; border-bottom: 1px solid #ddd; padding-bottom: 0.2em; }
+table { border-collapse: collapse; margin: 0.8em 0; font-size: 0.9em; }
+th, td { border: 1px solid #ddd; padding: 0.3em 0.7em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+th { background: #f4f4f4; }
+tr:nth-child(even) td { background: #fafafa; }
+figure { margin: 1.5em 0; }
+figure svg, figure img { max-width: 100%; height: auto; }
+figcaption { font-weight: 600; margin-bottom: 0.4em; }
+code { background: #f4f4f4; padding: 0 0.2em; }
+"""
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_CODE = re.compile(r"`([^`]+)`")
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    return _CODE.sub(r"<code>\1</code>", text)
+
+
+def _cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def markdown_to_html(markdown: str) -> str:
+    """
+    HTML for the Markdown subset the report sections use: headings, pipe
+    tables (first row is the header), "- " lists, paragraphs, **bold** and
+    `code`.
+    """
+    out: List[str] = []
+    lines = markdown.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line:
+            i += 1
+        elif line.startswith("#"):
+            level = min(len(line) - len(line.lstrip("#")), 6)
+            out.append(f"<h{level}>{_inline(line[level:].strip())}</h{level}>")
+            i += 1
+        elif line.startswith("|"):
+            rows = []
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(_cells(lines[i]))
+                i += 1
+            # Drop the "| --- |" separator row
+            body = [r for r in rows[1:] if not all(set(c) <= set("-: ") for c in r)]
+            out.append("<table>")
+            out.append("<thead><tr>" + "".join(f"<th>{_inline(c)}</th>" for c in rows[0]) + "</tr></thead>")
+            out.append("<tbody>")
+            out.extend("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in row) + "</tr>" for row in body)
+            out.append("</tbody></table>")
+        elif line.startswith("- "):
+            out.append("<ul>")
+            while i < len(lines) and lines[i].strip().startswith("- "):
+                out.append(f"<li>{_inline(lines[i].strip()[2:])}</li>")
+                i += 1
+            out.append("</ul>")
+        else:
+            paragraph = []
+            while i < len(lines) and lines[i].strip() and not lines[i].strip().startswith(("#", "|", "- ")):
+                paragraph.append(lines[i].strip())
+                i += 1
+            out.append(f"<p>{_inline(' '.join(paragraph))}</p>")
+    return "\n".join(out)
+
+
+def _embed(image: bytes, fmt: str) -> str:
+    if fmt == "svg":
+        markup = image.decode("utf-8")
+        # Drop the XML declaration and DOCTYPE; inline SVG starts at <svg
+        return markup[markup.index("<svg") :]
+    encoded = base64.b64encode(image).decode("ascii")
+    return f'<img alt="" src="data:image/{fmt};base64,{encoded}">'
+
+
+def render_html(
+    markdown: str,
+    images: Dict[str, bytes],
+    fmt: str = DEFAULT_HTML_CHART_FORMAT,
+    title: str = "Trade Analyzer Report",
+) -> bytes:
+    """
+    One HTML document from the report Markdown and rendered charts.
+
+    `images` maps chart name -> image bytes in `fmt` ("svg" or "png"), as
+    returned by render_plots; they become the Visuals section.
+    """
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f"<title>{html.escape(title)}</title>",
+        f"<style>{STYLE}</style>",
+        "</head>",
+        "<body>",
+        f"<h1>{html.escape(title)}</h1>",
+        markdown_to_html(markdown),
+        "<h2>Visuals</h2>",
+    ]
+    if images:
+        for name, image in images.items():
+            caption = html.escape(name.replace("_", " ").title())
+            parts.append(f'<figure id="{html.escape(name)}"><figcaption>{caption}</figcaption>{_embed(image, fmt)}</figure>')
+    else:
+        parts.append("<p>No plots generated (no sufficient data).</p>")
+    parts.extend(["</body>", "</html>", ""])
+    return "\n".join(parts).encode("utf-8")
+
+
+def write_html(document: bytes, target: Union[str, BinaryIO]) -> None:
+    """
+    Write a rendered document to a binary stream, or to a path atomically
+    (temp file in the same directory, then os.replace).
+    """
+    if hasattr(target, "write"):
+        target.write(document)
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(document)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
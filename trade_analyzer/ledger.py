@@ -0,0 +1,306 @@
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from statement_cache import ParsedStatement
+
+
+LEDGER_MANIFEST = "ledger.json"
+TRADES_DIR = "trades"
+UNDATED_PARTITION = "unknown"
+
+# Columns that identify a trade row. Identical rows from overlapping
+# statements of the same account are stored once.
+ROW_KEY_COLUMNS = [
+    "Symbol",
+    "Quantity",
+    "Buy Value",
+    "Sell Value",
+    "Realized P&L",
+    "Open Quantity",
+    "Unrealized P&L",
+]
+
+CATEGORY_COLUMNS = ["Symbol", "underlying", "option_type", "account"]
+
+
+@dataclass
+class LedgerStatement:
+    key: str
+    account: str
+    source: Optional[str]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    total_charges: float
+    other_credits_debits: float
+    rows: int
+    added_rows: int
+    added_at: str
+
+
+def _date_str(ts) -> Optional[str]:
+    return None if ts is None or pd.isna(ts) else pd.Timestamp(ts).strftime("%Y-%m-%d")
+
+
+def _partition_name(month: Optional[str]) -> str:
+    return f"expiry_month={month or UNDATED_PARTITION}"
+
+
+def _charge_shares(statements: List[LedgerStatement]) -> Dict[str, float]:
+    """
+    Share of each statement's charges that is not already counted, by statement key.
+
+    Each day of an account's charge periods is attributed to the first
+    statement (in the order they were added) whose period covers it, and a
+    statement's share is the fraction of its days attributed to it. A
+    re-export of a covered period gets 0, a disjoint period 1. Charges are
+    only known per statement, so a partial overlap assumes they accrue
+    evenly over the period. A statement without a period counts in full
+    unless all its rows were duplicates.
+    """
+    covered: Dict[str, List[Tuple[pd.Timestamp, pd.Timestamp]]] = {}
+    shares = {}
+    for s in statements:
+        if s.start_date is None or s.end_date is None:
+            shares[s.key] = 0.0 if s.rows and not s.added_rows else 1.0
+            continue
+        lo, hi = pd.Timestamp(s.start_date), pd.Timestamp(s.end_date)
+        days = (hi - lo).days + 1
+        intervals = covered.setdefault(s.account, [])
+        overlap = sum(max(0, (min(hi, b) - max(lo, a)).days + 1) for a, b in intervals)
+        shares[s.key] = max(0.0, 1.0 - overlap / days) if days > 0 else 0.0
+        # Keep the covered days as disjoint intervals so overlaps aren't counted twice
+        merged = []
+        for a, b in sorted(intervals + [(lo, hi)]):
+            if merged and a <= merged[-1][1] + pd.Timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        covered[s.account] = merged
+    return shares
+
+
+def row_ids(df: pd.DataFrame, account: str) -> np.ndarray:
+    """
+    Stable 64-bit id per trade row from the account and ROW_KEY_COLUMNS.
+
+    Repeats of an identical row within one statement get distinct ids (the
+    occurrence number is part of the hash), so only cross-statement
+    duplicates collapse.
+    """
+    keys = pd.DataFrame({"account": np.full(len(df), account)}, index=df.index)
+    for col in ROW_KEY_COLUMNS:
+        if col in df.columns:
+            keys[col] = df[col].astype(str) if col == "Symbol" else df[col].astype("float64")
+    base = pd.util.hash_pandas_object(keys, index=False)
+    occurrence = base.groupby(base.to_numpy()).cumcount()
+    return pd.util.hash_pandas_object(pd.DataFrame({"h": base.to_numpy(), "n": occurrence.to_numpy()}), index=False).to_numpy()
+
+
+class TradeLedger:
+    """
+    Persistent trade history built from parsed statements.
+
+    Trades are stored as Parquet under trades/expiry_month=YYYY-MM/, one file
+    per statement and month, so date-range queries only read the months they
+    need. ledger.json lists the statements that were added with their
+    account, period and statement-level charges.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.trades_dir = os.path.join(root, TRADES_DIR)
+
+    # Manifest
+
+    def statements(self) -> List[LedgerStatement]:
+        try:
+            with open(os.path.join(self.root, LEDGER_MANIFEST), "r", encoding="utf-8") as f:
+                return [LedgerStatement(**s) for s in json.load(f)["statements"]]
+        except FileNotFoundError:
+            return []
+
+    def accounts(self) -> List[str]:
+        return sorted({s.account for s in self.statements()})
+
+    def _write_manifest(self, statements: List[LedgerStatement]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        payload = json.dumps({"statements": [asdict(s) for s in statements]}, indent=2).encode()
+        self._write_atomic(os.path.join(self.root, LEDGER_MANIFEST), payload)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # Writing
+
+    def _partition_files(self, partition: str) -> List[str]:
+        directory = os.path.join(self.trades_dir, partition)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".parquet"))
+
+    def append(self, parsed: ParsedStatement, account: str, statement_key: str, source: Optional[str] = None) -> int:
+        """
+        Add a parsed statement (as returned by load_data) to the ledger.
+
+        Rows already stored from an overlapping statement of the same
+        account are skipped, and a statement that was already added is
+        ignored. Returns the number of new rows.
+        """
+        statements = self.statements()
+        if any(s.key == statement_key for s in statements):
+            return 0
+        df, total_charges, other_credits_debits, start_date, end_date = parsed
+
+        rows = df.copy()
+        for col in CATEGORY_COLUMNS:
+            if col in rows.columns:
+                rows[col] = rows[col].astype(object)
+        rows["account"] = account
+        rows["row_id"] = row_ids(df, account)
+        expiry = rows["expiry"] if "expiry" in rows.columns else pd.Series(pd.NaT, index=rows.index)
+        months = pd.to_datetime(expiry).dt.strftime("%Y-%m")
+
+        added = 0
+        for month, part in rows.groupby(months.fillna(UNDATED_PARTITION), sort=True):
+            partition = _partition_name(None if month == UNDATED_PARTITION else month)
+            existing = self._partition_files(partition)
+            if existing:
+                seen = pd.read_parquet(existing, columns=["row_id"])["row_id"].to_numpy()
+                part = part[~np.isin(part["row_id"].to_numpy(), seen)]
+            if part.empty:
+                continue
+            directory = os.path.join(self.trades_dir, partition)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{statement_key[:16]}.parquet")
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            os.close(fd)
+            part.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            added += len(part)
+
+        statements.append(
+            LedgerStatement(
+                key=statement_key,
+                account=account,
+                source=os.path.basename(source) if source else None,
+                start_date=_date_str(start_date),
+                end_date=_date_str(end_date),
+                total_charges=float(total_charges),
+                other_credits_debits=float(other_credits_debits),
+                rows=int(len(df)),
+                added_rows=int(added),
+                added_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            )
+        )
+        self._write_manifest(statements)
+        return added
+
+    # Reading
+
+    def _partitions(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> List[str]:
+        if not os.path.isdir(self.trades_dir):
+            return []
+        lo = start.strftime("%Y-%m") if start is not None else None
+        hi = end.strftime("%Y-%m") if end is not None else None
+        selected = []
+        for name in sorted(os.listdir(self.trades_dir)):
+            month = name.partition("=")[2]
+            if month == UNDATED_PARTITION:
+                # Undated rows can't be placed in a date range
+                if lo is None and hi is None:
+                    selected.append(name)
+                continue
+            if (lo is None or month >= lo) and (hi is None or month <= hi):
+                selected.append(name)
+        return selected
+
+    def _selected_statements(
+        self,
+        accounts: Optional[Iterable[str]],
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+    ) -> List[Tuple[LedgerStatement, float]]:
+        statements = self.statements()
+        shares = _charge_shares(statements)
+        chosen = []
+        for s in statements:
+            if accounts is not None and s.account not in accounts:
+                continue
+            # Its whole period is covered by earlier statements of the account
+            if shares[s.key] == 0.0:
+                continue
+            # Statement periods that overlap the range (unknown periods always do)
+            if end is not None and s.start_date is not None and pd.Timestamp(s.start_date) > end:
+                continue
+            if start is not None and s.end_date is not None and pd.Timestamp(s.end_date) < start:
+                continue
+            chosen.append((s, shares[s.key]))
+        return chosen
+
+    def select(
+        self,
+        accounts: Optional[Iterable[str]] = None,
+        start=None,
+        end=None,
+    ) -> ParsedStatement:
+        """
+        Trades for the given accounts and expiry date range, shaped like load_data's output.
+
+        Only the month partitions overlapping [start, end] are read. Charges
+        and other credits/debits are only known per statement: they are
+        summed over the selected accounts' statements whose period overlaps
+        the range. Days covered by several statements of an account count
+        once (see _charge_shares), which is exact for repeated and disjoint
+        periods and pro rata for partial overlaps. The returned period is
+        [start, end] when given, else the span of those statements.
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        accounts = set(accounts) if accounts is not None else None
+
+        files = [f for p in self._partitions(start, end) for f in self._partition_files(p)]
+        filters = [("account", "in", sorted(accounts))] if accounts is not None else None
+        df = pd.read_parquet(files, filters=filters) if files else pd.DataFrame()
+        if not df.empty and (start is not None or end is not None):
+            keep = pd.Series(True, index=df.index)
+            if start is not None:
+                keep &= df["expiry"] >= start
+            if end is not None:
+                keep &= df["expiry"] <= end
+            df = df[keep]
+        df = df.drop(columns=["row_id"], errors="ignore").reset_index(drop=True)
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
+        statements = self._selected_statements(accounts, start, end)
+        starts = [pd.Timestamp(s.start_date) for s, _ in statements if s.start_date]
+        ends = [pd.Timestamp(s.end_date) for s, _ in statements if s.end_date]
+        period_start = start if start is not None else (min(starts) if starts else None)
+        period_end = end if end is not None else (max(ends) if ends else None)
+        return (
+            df,
+            float(sum(s.total_charges * share for s, share in statements)),
+            float(sum(s.other_credits_debits * share for s, share in statements)),
+            period_start,
+            period_end,
+        )
+
+    def summary(self) -> Tuple[int, Dict[str, int]]:
+        """Number of stored statements and stored rows per account."""
+        statements = self.statements()
+        rows: Dict[str, int] = {}
+        for s in statements:
+            rows[s.account] = rows.get(s.account, 0) + s.added_rows
+        return len(statements), rows
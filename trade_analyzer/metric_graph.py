@@ -0,0 +1,77 @@
+"""
+Lazily evaluated dependency graph of metrics and their intermediates.
+
+Each node is a function registered with the names of the nodes it needs.
+A Graph evaluates a node on first access, after its dependencies, and
+keeps the value, so an intermediate shared by several metrics (or by the
+metrics, the charts and the report) is computed at most once per graph,
+and asking for a subset of metrics only computes what that subset needs.
+
+Values can be seeded (parameters such as the capital, or precomputed
+statistics) and a graph can fall back to another one for names it has no
+node for, e.g. metrics that depend on the capital on top of a cached graph
+of per-dataset intermediates.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    needs: Tuple[str, ...]
+    func: Callable[..., Any]
+
+
+class Registry:
+    """Named nodes; register with the `node` decorator."""
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+
+    def node(self, name: str, needs: Iterable[str] = ()) -> Callable:
+        """Register the decorated function as `name`, called with the values of `needs`."""
+
+        def register(func: Callable) -> Callable:
+            self.nodes[name] = Node(name, tuple(needs), func)
+            return func
+
+        return register
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.nodes
+
+
+class Graph:
+    """Values of a registry's nodes, each computed at most once."""
+
+    def __init__(
+        self,
+        registry: Registry,
+        values: Optional[Mapping[str, Any]] = None,
+        fallback: Optional["Graph"] = None,
+    ):
+        self.registry = registry
+        self.values: Dict[str, Any] = dict(values or {})
+        self.fallback = fallback
+        # Names in the order they were computed (seeded values not included)
+        self.computed: List[str] = []
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self.values[name]
+        except KeyError:
+            pass
+        node = self.registry.nodes.get(name)
+        if node is None:
+            if self.fallback is None:
+                raise KeyError(f"Unknown metric or intermediate: {name}")
+            return self.fallback[name]
+        value = node.func(*[self[need] for need in node.needs])
+        self.values[name] = value
+        self.computed.append(name)
+        return value
+
+    def get(self, names: Iterable[str]) -> Dict[str, Any]:
+        """name -> value for each of `names`, computing only what they depend on."""
+        return {name: self[name] for name in names}
@@ -0,0 +1,187 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional, TextIO
+
+
+@dataclass
+class StageRecord:
+    name: str
+    depth: int
+    wall_seconds: float
+    cpu_seconds: float
+    # Peak traced allocation above the memory in use when the stage started
+    peak_memory_bytes: Optional[int]
+
+
+class Profiler:
+    """
+    Records wall time, CPU time and peak traced memory per named stage.
+
+    Stages may nest; a nested stage's peak also counts towards its parents.
+    With trace_memory=False tracemalloc is not started (it slows
+    allocation-heavy code noticeably) and peaks are reported as None.
+    tracemalloc is process-wide, so only one profiler traces memory at a
+    time: one started while another is tracing (e.g. a second session of
+    the Streamlit app) runs without memory tracing.
+    """
+
+    def __init__(self, trace_memory: bool = True, cprofile: bool = False):
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self._peaks: List[List[int]] = []  # [start, peak] per open stage
+        self._depth = 0
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._owns_tracemalloc = False
+        self.cprofile = cProfile.Profile() if cprofile else None
+
+    def start(self) -> "Profiler":
+        if self.trace_memory:
+            self._owns_tracemalloc = _acquire_tracemalloc(self)
+            self.trace_memory = self._owns_tracemalloc
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        return self
+
+    def stop(self) -> None:
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self._owns_tracemalloc:
+            _release_tracemalloc(self)
+            self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append([current, current])
+        # Reserve the slot so records stay in start order
+        index = len(self.records)
+        self.records.append(StageRecord(name, self._depth, 0.0, 0.0, None))
+        self._depth += 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record = self.records[index]
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            if tracing:
+                start, peak = self._peaks.pop()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record.peak_memory_bytes = peak - start
+                if self._peaks:
+                    self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+                tracemalloc.reset_peak()
+
+    def trace(self) -> dict:
+        return {
+            "total_wall_seconds": time.perf_counter() - self._started,
+            "total_cpu_seconds": time.process_time() - self._cpu_started,
+            "memory_traced": self.trace_memory,
+            "stages": [asdict(r) for r in self.records],
+        }
+
+    def write_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace(), f, indent=2)
+
+    def dump_cprofile(self, path: str) -> None:
+        """Write cProfile stats (readable with pstats or snakeviz)."""
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(path)
+
+    def print_summary(self, stream: TextIO = sys.stderr) -> None:
+        print(f"{'stage':<32} {'wall s':>9} {'cpu s':>9} {'peak MB':>9}", file=stream)
+        for r in self.records:
+            peak = f"{r.peak_memory_bytes / (1024 * 1024):9.2f}" if r.peak_memory_bytes is not None else f"{'-':>9}"
+            label = "  " * r.depth + r.name
+            print(f"{label:<32} {r.wall_seconds:9.4f} {r.cpu_seconds:9.4f} {peak}", file=stream)
+
+
+# The profiler of the current thread / task: concurrent sessions of a
+# threaded server each see only their own (new threads start with None)
+_active: ContextVar[Optional[Profiler]] = ContextVar("trade_analyzer_profiler", default=None)
+_NULL_STAGE = nullcontext()
+
+# The profiler that started tracemalloc, if any
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_owner: Optional[Profiler] = None
+
+
+def _acquire_tracemalloc(profiler: Profiler) -> bool:
+    """Start tracemalloc for `profiler`; False when it is already tracing (for another profiler or the caller)."""
+    global _tracemalloc_owner
+    with _tracemalloc_lock:
+        if _tracemalloc_owner is not None or tracemalloc.is_tracing():
+            return False
+        tracemalloc.start()
+        _tracemalloc_owner = profiler
+        return True
+
+
+def _release_tracemalloc(profiler: Profiler) -> None:
+    global _tracemalloc_owner
+    with _tracemalloc_lock:
+        if _tracemalloc_owner is profiler:
+            tracemalloc.stop()
+            _tracemalloc_owner = None
+
+
+def stage(name: str):
+    """
+    Context manager timing `name` on the active profiler.
+
+    When profiling is off this returns a shared no-op context, so
+    instrumented code pays one context-variable lookup per stage.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+def start_profiling(trace_memory: bool = True, cprofile: bool = False) -> Profiler:
+    """Start a profiler for the current context (thread / task)."""
+    profiler = Profiler(trace_memory=trace_memory, cprofile=cprofile).start()
+    _active.set(profiler)
+    return profiler
+
+
+def stop_profiling() -> Optional[Profiler]:
+    """Stop the current context's profiler; other contexts' profilers keep running."""
+    profiler = _active.get()
+    _active.set(None)
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+@contextmanager
+def profiling(enabled: bool = True, trace_memory: bool = True, cprofile: bool = False) -> Iterator[Optional[Profiler]]:
+    """Profile the enclosed block when enabled; yields the Profiler (or None)."""
+    if not enabled:
+        yield None
+        return
+    profiler = Profiler(trace_memory=trace_memory, cprofile=cprofile).start()
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        # Restores an enclosing profiler of the same context, if any
+        _active.reset(token)
+        profiler.stop()
@@ -0,0 +1,231 @@
+"""
+Statement readers for the formats load_data accepts.
+
+The format is detected from the file's leading bytes, not its name: xlsx
+(zip container), legacy xls (OLE2 compound file) or CSV (text). Every
+reader yields the sheet as row tuples with None for empty cells, which is
+what load_data's single scan expects. The Excel readers give integral
+numbers as int; the CSV reader gives every cell as the string in the file,
+and load_data's numeric cleaning turns both into the same values.
+CSV also supports a bulk path for the trade table (Arrow's CSV reader, or
+pandas' C parser when pyarrow is missing), so large CSV exports never
+become Python tuples.
+
+Excel engines are tried in EXCEL_ENGINES order and skipped when not
+installed; pass `engine` to force one.
+"""
+import csv
+import io
+import os
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+
+XLSX_MAGIC = b"PK\x03\x04"
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+SNIFF_BYTES = 4096
+
+# Engines per format in order of preference; the first installed one is used
+EXCEL_ENGINES: Dict[str, List[str]] = {
+    "xlsx": ["calamine", "openpyxl"],
+    "xls": ["calamine", "xlrd"],
+}
+
+# Module that must be importable for each engine
+ENGINE_MODULES = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+    "xlrd": "xlrd",
+    "pyarrow": "pyarrow",
+    "c": "pandas",
+}
+
+
+@dataclass
+class Reader:
+    format: str
+    engine: str
+    # Yields the first worksheet row by row
+    iter_rows: Callable[[object], Iterator[tuple]]
+    # Optional bulk read of the rows after `skip_rows` as a DataFrame with
+    # `width` positional columns (raw cell values, None / NaN when empty)
+    read_table: Optional[Callable[[object, int, int], Optional[pd.DataFrame]]] = None
+
+
+def _head(source, n: int = SNIFF_BYTES) -> bytes:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read(n)
+    pos = source.tell()
+    try:
+        return source.read(n)
+    finally:
+        source.seek(pos)
+
+
+def detect_format(source) -> str:
+    """'xlsx', 'xls' or 'csv' from the leading bytes of a path or binary file object."""
+    head = _head(source)
+    if head.startswith(XLSX_MAGIC):
+        return "xlsx"
+    if head.startswith(XLS_MAGIC):
+        return "xls"
+    if head and b"\x00" not in head:
+        try:
+            # A multi-byte character may be cut at the sniff boundary
+            head.decode("utf-8-sig")
+            return "csv"
+        except UnicodeDecodeError as e:
+            if e.start >= len(head) - 3:
+                return "csv"
+    raise ValueError("Unrecognized statement format (expected an xlsx, xls or CSV file)")
+
+
+def engine_available(engine: str) -> bool:
+    return find_spec(ENGINE_MODULES[engine]) is not None
+
+
+def _open_binary(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    source.seek(0)
+    # Don't let the caller's file object be closed with ours
+    return io.BytesIO(source.read())
+
+
+def _cell(value):
+    # Empty cells as None and whole floats as int, as openpyxl returns them
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+# Excel
+
+def _iter_openpyxl(source) -> Iterator[tuple]:
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # Exported workbooks often carry a stale <dimension> tag; ignore it
+        ws.reset_dimensions()
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_calamine(source) -> Iterator[tuple]:
+    from python_calamine import CalamineWorkbook
+
+    with _open_binary(source) as f:
+        wb = CalamineWorkbook.from_filelike(f)
+        sheet = wb.get_sheet_by_index(0)
+        # Rows start at row 1, but columns at the first used one: put back
+        # the empty leading columns so cells line up with the other readers
+        pad = (None,) * (sheet.start[1] if sheet.start else 0)
+        for row in sheet.iter_rows():
+            yield pad + tuple(_cell(v) for v in row)
+
+
+def _iter_xlrd(source) -> Iterator[tuple]:
+    import xlrd
+
+    with _open_binary(source) as f:
+        book = xlrd.open_workbook(file_contents=f.read(), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for i in range(sheet.nrows):
+            yield tuple(_cell(v) for v in sheet.row_values(i))
+    finally:
+        book.release_resources()
+
+
+# CSV
+
+def _text_stream(source) -> io.TextIOBase:
+    return io.TextIOWrapper(_open_binary(source), encoding="utf-8-sig", newline="")
+
+
+def _iter_csv(source) -> Iterator[tuple]:
+    with _text_stream(source) as f:
+        for row in csv.reader(f):
+            yield tuple(None if v == "" else v for v in row)
+
+
+def _csv_table_arrow(source, skip_rows: int, width: int) -> Optional[pd.DataFrame]:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    names = [str(i) for i in range(width)]
+    with _open_binary(source) as f:
+        try:
+            table = pa_csv.read_csv(
+                f,
+                read_options=pa_csv.ReadOptions(skip_rows=skip_rows, column_names=names, encoding="utf8"),
+                convert_options=pa_csv.ConvertOptions(strings_can_be_null=True, quoted_strings_can_be_null=True),
+            )
+        except pa.ArrowInvalid:
+            # Ragged rows: let the caller fall back to row iteration
+            return None
+    df = table.to_pandas()
+    df.columns = range(width)
+    return df
+
+
+def _csv_table_c(source, skip_rows: int, width: int) -> Optional[pd.DataFrame]:
+    with _text_stream(source) as f:
+        try:
+            return pd.read_csv(f, header=None, names=list(range(width)), skiprows=skip_rows, engine="c")
+        except (pd.errors.ParserError, ValueError):
+            return None
+
+
+CSV_TABLE_READERS = {
+    "pyarrow": _csv_table_arrow,
+    "c": _csv_table_c,
+}
+
+
+ROW_READERS: Dict[str, Callable[[object], Iterator[tuple]]] = {
+    "openpyxl": _iter_openpyxl,
+    "calamine": _iter_calamine,
+    "xlrd": _iter_xlrd,
+}
+
+
+def get_reader(source, engine: Optional[str] = None) -> Reader:
+    """
+    Reader for `source` (path or binary file object) based on its content.
+
+    For Excel formats `engine` picks the library (default: the first
+    installed from EXCEL_ENGINES); for CSV it picks the bulk table parser,
+    "pyarrow" (default when installed) or "c".
+    """
+    fmt = detect_format(source)
+    if fmt == "csv":
+        if engine is None:
+            engine = "pyarrow" if engine_available("pyarrow") else "c"
+        if engine not in CSV_TABLE_READERS:
+            raise ValueError(f"Engine {engine!r} cannot read CSV (use one of {sorted(CSV_TABLE_READERS)})")
+        return Reader(fmt, engine, _iter_csv, CSV_TABLE_READERS[engine])
+
+    candidates = EXCEL_ENGINES[fmt]
+    if engine is None:
+        engine = next((e for e in candidates if engine_available(e)), None)
+        if engine is None:
+            raise ImportError(f"Reading {fmt} files needs one of: {', '.join(ENGINE_MODULES[e] for e in candidates)}")
+    elif engine not in candidates:
+        raise ValueError(f"Engine {engine!r} cannot read {fmt} (use one of {candidates})")
+    return Reader(fmt, engine, ROW_READERS[engine])
+
+
+def available_engines(fmt: str) -> List[str]:
+    """Installed engines for a format, in order of preference."""
+    names = list(CSV_TABLE_READERS) if fmt == "csv" else EXCEL_ENGINES[fmt]
+    return [e for e in names if engine_available(e)]
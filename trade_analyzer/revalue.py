@@ -0,0 +1,159 @@
+"""
+Revaluation of open positions from a local file of price marks.
+
+The statement fixes unrealized P&L at its own mark (Previous Closing Price).
+OpenPositions extracts the rows with a non-zero Open Quantity once, as flat
+arrays; each re-mark is then a vectorized lookup of the marks by symbol and
+one dot product, so repeated intraday revaluations take milliseconds:
+
+    unrealized = statement unrealized + (mark - previous close) * signed quantity
+
+Positions without a mark keep the statement's value.
+"""
+from dataclasses import dataclass, replace
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Accepted names for the marks file's columns (case-insensitive)
+SYMBOL_COLUMNS = ["symbol", "tradingsymbol", "instrument"]
+PRICE_COLUMNS = ["price", "mark", "ltp", "last_price", "close"]
+
+
+def _normalize_symbols(symbols) -> pd.Index:
+    return pd.Index(pd.Series(symbols, dtype=object).astype(str).str.strip().str.upper())
+
+
+def load_marks(source) -> pd.Series:
+    """
+    Symbol -> price from a CSV (path or file object).
+
+    Columns are matched by name (SYMBOL_COLUMNS / PRICE_COLUMNS); a file
+    without a recognized header is read as symbol,price. Later rows win for
+    repeated symbols; unparseable prices are dropped.
+    """
+    table = pd.read_csv(source, dtype=str, skipinitialspace=True)
+    names = {str(c).strip().lower(): c for c in table.columns}
+    symbol_col = next((names[n] for n in SYMBOL_COLUMNS if n in names), None)
+    price_col = next((names[n] for n in PRICE_COLUMNS if n in names), None)
+    if symbol_col is None or price_col is None:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        table = pd.read_csv(source, header=None, dtype=str, usecols=[0, 1], skipinitialspace=True)
+        symbol_col, price_col = 0, 1
+    prices = pd.to_numeric(table[price_col].str.replace(",", "", regex=False), errors="coerce").to_numpy()
+    marks = pd.Series(prices, index=_normalize_symbols(table[symbol_col]), name="price")
+    marks = marks[~np.isnan(prices)]
+    return marks[~marks.index.duplicated(keep="last")]
+
+
+@dataclass
+class Revaluation:
+    # Unrealized P&L of the open positions at the statement's mark and at the new marks
+    statement_unrealized_pnl: float
+    unrealized_pnl: float
+    marked_positions: int
+    unmarked_positions: int
+    open_positions: "OpenPositions"
+    # Per position: the new mark (NaN without one) and the revalued unrealized P&L
+    marks: np.ndarray
+    unrealized: np.ndarray
+
+    @property
+    def delta(self) -> float:
+        return self.unrealized_pnl - self.statement_unrealized_pnl
+
+    @property
+    def positions(self) -> pd.DataFrame:
+        """Per position: Symbol, quantity (signed), previous_close, mark, statement and revalued unrealized P&L."""
+        open_positions = self.open_positions
+        return pd.DataFrame(
+            {
+                "Symbol": open_positions.symbols,
+                "quantity": open_positions.quantity,
+                "previous_close": open_positions.previous_close,
+                "mark": self.marks,
+                "statement_unrealized_pnl": open_positions.unrealized,
+                "unrealized_pnl": self.unrealized,
+            }
+        )
+
+
+class OpenPositions:
+    """The open positions of a cleaned statement, ready to be re-marked."""
+
+    def __init__(self, df: pd.DataFrame):
+        zeros = pd.Series(0.0, index=df.index)
+        quantity = df.get("Open Quantity", zeros).to_numpy(dtype=float)
+        open_rows = np.flatnonzero(np.nan_to_num(quantity) != 0)
+        quantity = quantity[open_rows]
+        if "Open Quantity Type" in df.columns:
+            # Quantities are exported unsigned; the type says which way
+            short = df["Open Quantity Type"].iloc[open_rows].astype(str).str.strip().str.lower().str.startswith("short")
+            quantity = np.where(short.to_numpy(), -np.abs(quantity), quantity)
+        self.symbols = df["Symbol"].iloc[open_rows].astype(str).to_numpy() if "Symbol" in df.columns else np.full(len(open_rows), "")
+        # Positions often share a symbol: marks are looked up once per distinct symbol
+        self.codes, self.keys = pd.factorize(_normalize_symbols(self.symbols))
+        self.quantity = quantity
+        self.previous_close = np.nan_to_num(df.get("Previous Closing Price", zeros).to_numpy(dtype=float)[open_rows])
+        self.unrealized = np.nan_to_num(df.get("Unrealized P&L", zeros).to_numpy(dtype=float)[open_rows])
+        self.statement_unrealized_pnl = float(self.unrealized.sum())
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def revalue(self, marks: Union[pd.Series, dict]) -> Revaluation:
+        """Re-mark the positions at `marks` (symbol -> price, e.g. from load_marks)."""
+        if not isinstance(marks, pd.Series):
+            marks = pd.Series(marks, dtype=float)
+        if len(marks) and not marks.index.equals(_normalize_symbols(marks.index)):
+            marks = pd.Series(marks.to_numpy(dtype=float), index=_normalize_symbols(marks.index))
+        prices = np.append(marks.to_numpy(dtype=float), np.nan)
+        # Hash join of the distinct symbols against the marks; -1 (no mark) picks the NaN appended above
+        mark = prices[marks.index.get_indexer(self.keys)[self.codes]] if len(marks) else np.full(len(self), np.nan)
+        found = ~np.isnan(mark)
+        revalued = np.where(found, self.unrealized + (mark - self.previous_close) * self.quantity, self.unrealized)
+        marked = int(found.sum())
+        return Revaluation(
+            statement_unrealized_pnl=self.statement_unrealized_pnl,
+            unrealized_pnl=float(revalued.sum()),
+            marked_positions=marked,
+            unmarked_positions=len(self) - marked,
+            open_positions=self,
+            marks=mark,
+            unrealized=revalued,
+        )
+
+
+def revalued_state(state, revaluation: Revaluation):
+    """A MetricsState with the statement's unrealized P&L replaced by the revalued one."""
+    return replace(state, total_unrealized_pnl=state.total_unrealized_pnl + revaluation.delta)
+
+
+def revaluation_section(revaluation: Revaluation, top: int = 10) -> str:
+    """Markdown section with the revaluation summary and the largest position changes."""
+    lines: List[str] = ["## Revaluation of Open Positions", ""]
+    lines.append("| Metric | Value |")
+    lines.append("| --- | --- |")
+    lines.append(f"| Open Positions | {len(revaluation.open_positions)} |")
+    lines.append(f"| Re-marked | {revaluation.marked_positions} |")
+    lines.append(f"| Without a Mark (statement value kept) | {revaluation.unmarked_positions} |")
+    lines.append(f"| Unrealized P&L at Statement | {revaluation.statement_unrealized_pnl:,.2f} |")
+    lines.append(f"| Unrealized P&L Revalued | {revaluation.unrealized_pnl:,.2f} |")
+    lines.append(f"| Change | {revaluation.delta:,.2f} |")
+    lines.append("")
+    moved = revaluation.positions.assign(change=lambda t: t["unrealized_pnl"] - t["statement_unrealized_pnl"])
+    moved = moved[moved["mark"].notna()]
+    if not moved.empty:
+        moved = moved.reindex(moved["change"].abs().sort_values(ascending=False).index).head(top)
+        lines.append("| Symbol | Quantity | Previous Close | Mark | Unrealized P&L | Change |")
+        lines.append("| --- | --- | --- | --- | --- | --- |")
+        for row in moved.itertuples(index=False):
+            lines.append(
+                f"| {row.Symbol} | {row.quantity:,.0f} | {row.previous_close:,.2f} | {row.mark:,.2f} "
+                f"| {row.unrealized_pnl:,.2f} | {row.change:,.2f} |"
+            )
+        lines.append("")
+    return "\n".join(lines)
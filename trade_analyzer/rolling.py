@@ -0,0 +1,171 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_ROLLING_TRADES = 20
+
+ROLLING_METRICS = ["win_rate", "expectancy", "sharpe_ratio", "drawdown_pct"]
+
+
+def _window_sums(values: np.ndarray, left: np.ndarray) -> np.ndarray:
+    """Sum of values[left[i]..i] for every i, from one cumulative sum."""
+    csum = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+    return csum[1:] - csum[left]
+
+
+def sliding_max(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Max of values[max(0, i-k+1)..i] for every i in O(n) (van Herk / Gil-Werman).
+
+    The array is cut into blocks of k; within each block a running max from
+    the left and from the right is taken, and every window spans the tail
+    of one block and the head of the next.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0 or k <= 1:
+        return values.copy()
+    n_blocks = -(-n // k)
+    padded = np.full(n_blocks * k, -np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, k)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()[:n]
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    result = prefix.copy()
+    # Windows shorter than k (the first k-1) are plain prefixes of block 0
+    if n >= k:
+        result[k - 1 :] = np.maximum(suffix[: n - k + 1], prefix[k - 1 :])
+    return result
+
+
+def range_max(values: np.ndarray, left: np.ndarray) -> np.ndarray:
+    """
+    Max of values[left[i]..i] for every i with variable window starts.
+
+    Uses a sparse table (maxima over power-of-two spans), so every query
+    is two lookups: O(n log n) in total, all vectorized.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    table = [values]
+    span = 1
+    while 2 * span <= n:
+        prev = table[-1]
+        table.append(np.maximum(prev[:-span], prev[span:]))
+        span *= 2
+    right = np.arange(n)
+    length = right - left + 1
+    level = np.floor(np.log2(length)).astype(int)
+    result = np.empty(n)
+    for j in np.unique(level):
+        rows = level == j
+        width = 1 << j
+        result[rows] = np.maximum(table[j][left[rows]], table[j][right[rows] - width + 1])
+    return result
+
+
+def rolling_metrics(
+    trade_pnl: np.ndarray,
+    initial_capital: float,
+    risk_free_rate: float,
+    trades_per_year: float,
+    window: int = DEFAULT_ROLLING_TRADES,
+    days: Optional[int] = None,
+    dates: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Rolling win rate, expectancy, Sharpe and drawdown over trailing windows.
+
+    Windows are the last `window` trades, or, with `days`, all trades whose
+    date lies within the last `days` calendar days (`dates` must then be the
+    sorted trade dates; undated trades are dropped). Every series comes from
+    cumulative sums and one sliding-max pass, so the cost does not grow with
+    the window size. Trade-count windows start once `window` trades exist.
+
+    Sharpe is per-trade excess return over its standard deviation,
+    annualized with sqrt(trades_per_year). Drawdown is the current
+    portfolio value against its high within the window (including the
+    value just before the window's first trade), in %.
+    """
+    pnl = np.asarray(trade_pnl, dtype=float)
+    if days is not None:
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        dated = ~np.isnat(dates)
+        pnl, dates = pnl[dated], dates[dated]
+    n = len(pnl)
+    idx = np.arange(n)
+    if days is not None:
+        left = np.searchsorted(dates, dates - np.timedelta64(days, "D"), side="right")
+    else:
+        left = np.maximum(idx - window + 1, 0)
+    count = (idx - left + 1).astype(float)
+
+    total = _window_sums(pnl, left)
+    total_sq = _window_sums(pnl * pnl, left)
+    wins = _window_sums((pnl > 0).astype(float), left)
+
+    win_rate = wins / count * 100.0
+    expectancy = total / count
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(count > 1, (total_sq - total * total / count) / (count - 1), np.nan)
+        std = np.sqrt(np.maximum(var, 0.0))
+        if initial_capital > 0 and trades_per_year > 0:
+            excess = expectancy / initial_capital - risk_free_rate / trades_per_year
+            sharpe = np.where(std > 0, excess / (std / initial_capital) * np.sqrt(trades_per_year), np.nan)
+        else:
+            sharpe = np.full(n, np.nan)
+
+    # Portfolio value with the starting value in front, so window [left, i]
+    # of trades covers values [left, i + 1]
+    capital = initial_capital if initial_capital > 0 else 1.0
+    value = np.concatenate([[capital], capital + np.cumsum(pnl)])
+    if days is not None:
+        peak = range_max(value, np.concatenate([[0], left]))[1:]
+    else:
+        peak = sliding_max(value, window + 1)[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (value[1:] - peak) / peak * 100.0, np.nan)
+
+    table = pd.DataFrame(
+        {
+            "trade": idx + 1,
+            "trades_in_window": count.astype(int),
+            "win_rate": win_rate,
+            "expectancy": expectancy,
+            "sharpe_ratio": sharpe,
+            "drawdown_pct": drawdown,
+        }
+    )
+    if days is not None:
+        table.insert(1, "date", dates)
+    else:
+        table.loc[count < window, ROLLING_METRICS] = np.nan
+    return table
+
+
+def rolling_section(table: pd.DataFrame, window: int = DEFAULT_ROLLING_TRADES, days: Optional[int] = None) -> str:
+    """Markdown section summarizing the rolling series."""
+    labels = {
+        "win_rate": "Win Rate %",
+        "expectancy": "Expectancy",
+        "sharpe_ratio": "Sharpe Ratio",
+        "drawdown_pct": "Drawdown %",
+    }
+    span = f"{days} calendar days" if days is not None else f"{window} trades"
+    lines = [f"## Rolling Metrics (last {span})", ""]
+    lines.append("| Metric | Latest | Min | Median | Max |")
+    lines.append("| --- | --- | --- | --- | --- |")
+    for metric in ROLLING_METRICS:
+        values = table[metric].dropna()
+        if values.empty:
+            lines.append(f"| {labels[metric]} | N/A | N/A | N/A | N/A |")
+            continue
+        lines.append(
+            f"| {labels[metric]} | {values.iloc[-1]:,.2f} | {values.min():,.2f} | {values.median():,.2f} | {values.max():,.2f} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
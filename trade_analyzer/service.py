@@ -0,0 +1,325 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from feed import DEFAULT_FEED_POINTS, build_feed
+from statement_cache import DEFAULT_CACHE_DIR, StatementCache, content_key
+from trade_analyzer import (
+    LOADER_VERSION,
+    compute_metrics,
+    load_data,
+    load_data_cached,
+    metrics_to_dict,
+    realized_pnl_series,
+    render_html_report,
+    render_plots,
+    render_report,
+)
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Larger uploads are rejected with 413 before the body is read
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+# Completed analyses kept in memory (results include the rendered charts)
+DEFAULT_RESULT_ENTRIES = 64
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+Analysis = Dict[str, Any]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def analyze_statement(
+    data: bytes,
+    initial_capital: float,
+    risk_free_rate: float,
+    cache_dir: Optional[str] = None,
+    feed_points: int = DEFAULT_FEED_POINTS,
+) -> Analysis:
+    """
+    Worker: parse one uploaded statement and produce metrics, report and charts.
+
+    Parsing goes through the on-disk statement cache when cache_dir is set,
+    so the same statement re-analyzed with other parameters skips openpyxl.
+    """
+    source = BytesIO(data)
+    if cache_dir:
+        parsed = load_data_cached(source, StatementCache(cache_dir))
+    else:
+        parsed = load_data(source)
+    df, total_charges, other_credits_debits, start_date, end_date = parsed
+    setattr(df, "_total_charges", total_charges)
+    setattr(df, "_other_credits_debits", other_credits_debits)
+    metrics = compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+
+    images = render_plots(df, metrics)
+    report = render_report(metrics, df, {name: f"plots/{name}.png" for name in images})
+    return {
+        "metrics": metrics_to_dict(metrics),
+        "feed": build_feed(metrics, realized_pnl_series(df), feed_points, start_date=start_date, end_date=end_date),
+        "report": report,
+        # Same charts, embedded: served as one file without touching disk
+        "html": render_html_report(metrics, df, images, fmt="png"),
+        "images": images,
+    }
+
+
+class AnalysisService:
+    """
+    Runs analyses in a process pool behind a small asyncio HTTP server.
+
+    Results are cached in memory by (content hash, parameters). Identical
+    requests that arrive while an analysis is running wait for that same
+    analysis instead of starting another.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        max_results: int = DEFAULT_RESULT_ENTRIES,
+    ):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache_dir = cache_dir
+        self.max_results = max_results
+        self.results: "OrderedDict[str, Analysis]" = OrderedDict()
+        self.in_flight: Dict[str, "asyncio.Future[Analysis]"] = {}
+        self.stats = {"requests": 0, "analyses": 0, "cache_hits": 0, "deduplicated": 0}
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def result_key(data: bytes, initial_capital: float, risk_free_rate: float, feed_points: int) -> str:
+        statement = content_key(data, LOADER_VERSION)
+        params = f"{statement}:{initial_capital!r}:{risk_free_rate!r}:{feed_points}"
+        return hashlib.sha256(params.encode()).hexdigest()[:32]
+
+    def _remember(self, key: str, result: Analysis) -> None:
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+
+    async def analyze(
+        self,
+        data: bytes,
+        initial_capital: float,
+        risk_free_rate: float,
+        feed_points: int = DEFAULT_FEED_POINTS,
+    ) -> Tuple[str, Analysis]:
+        key = self.result_key(data, initial_capital, risk_free_rate, feed_points)
+        if key in self.results:
+            self.stats["cache_hits"] += 1
+            self.results.move_to_end(key)
+            return key, self.results[key]
+        if key in self.in_flight:
+            self.stats["deduplicated"] += 1
+            return key, await asyncio.shield(self.in_flight[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.pool, analyze_statement, data, initial_capital, risk_free_rate, self.cache_dir, feed_points
+        )
+        self.in_flight[key] = future
+        self.stats["analyses"] += 1
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key]
+        self._remember(key, result)
+        return key, result
+
+    @staticmethod
+    def _summary(key: str, result: Analysis, elapsed: float) -> Dict[str, Any]:
+        return {
+            "key": key,
+            "elapsed_seconds": round(elapsed, 4),
+            "metrics": result["metrics"],
+            "feed": result["feed"],
+            "artifacts": {
+                "report": f"/results/{key}/report.md",
+                "html": f"/results/{key}/report.html",
+                "plots": {name: f"/results/{key}/plots/{name}.png" for name in result["images"]},
+            },
+        }
+
+    def _artifact(self, parts) -> Tuple[str, bytes]:
+        result = self.results.get(parts[1])
+        if result is None:
+            raise HTTPError(404, "unknown or expired result")
+        if len(parts) == 2:
+            return "application/json", json.dumps(self._summary(parts[1], result, 0.0)).encode()
+        if parts[2:] == ["report.md"]:
+            return "text/markdown; charset=utf-8", result["report"].encode()
+        if parts[2:] == ["report.html"]:
+            return "text/html; charset=utf-8", result["html"]
+        if len(parts) == 4 and parts[2] == "plots" and parts[3].endswith(".png"):
+            image = result["images"].get(parts[3][: -len(".png")])
+            if image is not None:
+                return "image/png", image
+        raise HTTPError(404, "no such artifact")
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[str, bytes]:
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            payload = dict(self.stats, cached=len(self.results), in_flight=len(self.in_flight))
+            return "application/json", json.dumps(payload).encode()
+        if parts == ["analyze"]:
+            if method != "POST":
+                raise HTTPError(405, "use POST with the statement as the request body")
+            if not body:
+                raise HTTPError(400, "empty upload")
+            query = parse_qs(url.query)
+            try:
+                capital = float(query.get("capital", ["100000"])[0])
+                rate = float(query.get("risk_free_rate", ["0.03"])[0])
+                points = int(query.get("feed_points", [str(DEFAULT_FEED_POINTS)])[0])
+            except ValueError as exc:
+                raise HTTPError(400, f"invalid parameter: {exc}")
+            start = time.perf_counter()
+            try:
+                key, result = await self.analyze(body, capital, rate, points)
+            except Exception as exc:
+                raise HTTPError(422, f"could not analyze statement: {exc}")
+            return "application/json", json.dumps(self._summary(key, result, time.perf_counter() - start)).encode()
+        if len(parts) >= 2 and parts[0] == "results":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return self._artifact(parts)
+        raise HTTPError(404, "not found")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection (keep-alive, Content-Length bodies)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = True
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = await _read_headers(reader)
+                    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                    body = await _read_body(reader, headers)
+                    self.stats["requests"] += 1
+                    content_type, payload = await self.route(method, target, body)
+                    status = 200
+                except HTTPError as exc:
+                    status, content_type = exc.status, "application/json"
+                    payload = json.dumps({"error": exc.message}).encode()
+                    # The unread body (if any) would corrupt the next request
+                    keep_alive = keep_alive and status not in (411, 413)
+                except ValueError:
+                    status, content_type, payload = 400, "application/json", b'{"error": "malformed request"}'
+                    keep_alive = False
+                writer.write(_response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if "transfer-encoding" in headers:
+        raise HTTPError(411, "chunked uploads are not supported; send Content-Length")
+    length = int(headers.get("content-length", "0"))
+    if length > MAX_UPLOAD_BYTES:
+        raise HTTPError(413, f"upload larger than {MAX_UPLOAD_BYTES} bytes")
+    return await reader.readexactly(length) if length else b""
+
+
+def _response(status: int, content_type: str, payload: bytes, keep_alive: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + payload
+
+
+async def serve(host: str, port: int, service: AnalysisService) -> None:
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving on http://{host}:{port} (POST /analyze, GET /results/<key>, GET /health)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP service for concurrent statement analysis.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Bind address (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT}).")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Analysis worker processes (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Statement cache directory shared by the workers (default: {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk statement cache.")
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        default=DEFAULT_RESULT_ENTRIES,
+        help="Completed analyses kept in memory (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    service = AnalysisService(
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        max_results=args.max_results,
+    )
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import pandas as pd
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TRADE_ANALYZER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "trade_analyzer"),
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+ParsedStatement = Tuple[pd.DataFrame, float, float, Optional[pd.Timestamp], Optional[pd.Timestamp]]
+
+_CHUNK_SIZE = 1 << 20
+
+
+def content_key(source: Union[str, bytes, BinaryIO], version: Union[int, str]) -> str:
+    """
+    Hash the statement content together with the loader version.
+
+    `source` may be a path, raw bytes or a binary file object (the stream
+    position of a file object is restored afterwards).
+    """
+    h = hashlib.sha256(f"loader-v{version}:".encode())
+    if isinstance(source, (bytes, bytearray)):
+        h.update(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                h.update(chunk)
+    else:
+        pos = source.tell()
+        for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+        source.seek(pos)
+    return h.hexdigest()
+
+
+def _timestamp_to_json(ts: Optional[pd.Timestamp]) -> Optional[str]:
+    return None if ts is None else ts.isoformat()
+
+
+def _timestamp_from_json(value: Optional[str]) -> Optional[pd.Timestamp]:
+    return None if value is None else pd.Timestamp(value)
+
+
+class StatementCache:
+    """
+    Content-addressed on-disk cache of parsed statements.
+
+    Each entry is a Parquet file holding the cleaned trade table plus a small
+    JSON sidecar with the summary values and period dates. Entries are evicted
+    least-recently-used first once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return base + ".parquet", base + ".json"
+
+    def get(self, key: str) -> Optional[ParsedStatement]:
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            df = pd.read_parquet(data_path)
+        except (OSError, ValueError):
+            return None
+        # Mark as recently used for LRU eviction
+        for path in (data_path, meta_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return (
+            df,
+            float(meta["total_charges"]),
+            float(meta["other_credits_debits"]),
+            _timestamp_from_json(meta.get("start_date")),
+            _timestamp_from_json(meta.get("end_date")),
+        )
+
+    def put(self, key: str, parsed: ParsedStatement) -> None:
+        df, total_charges, other_credits_debits, start_date, end_date = parsed
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        meta = {
+            "total_charges": float(total_charges),
+            "other_credits_debits": float(other_credits_debits),
+            "start_date": _timestamp_to_json(start_date),
+            "end_date": _timestamp_to_json(end_date),
+        }
+        # Write to temp files and rename so readers never see partial entries
+        fd, tmp_data = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.reset_index(drop=True).to_parquet(tmp_data, index=False)
+            os.replace(tmp_data, data_path)
+        finally:
+            if os.path.exists(tmp_data):
+                os.remove(tmp_data)
+        fd, tmp_meta = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_meta, meta_path)
+        finally:
+            if os.path.exists(tmp_meta):
+                os.remove(tmp_meta)
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(last used, size, key) for every complete entry."""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            key = name[: -len(".json")]
+            size = 0
+            last_used = 0.0
+            for path in self._paths(key):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                size += st.st_size
+                last_used = max(last_used, st.st_mtime)
+            entries.append((last_used, size, key))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Keep at least the newest entry even if it alone exceeds the cap
+        while entries[:-1] and total > self.max_bytes:
+            _, size, key = entries.pop(0)
+            self._remove(key)
+            total -= size
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        """Remove every entry; returns the number of entries removed."""
+        entries = self._entries()
+        for _, _, key in entries:
+            self._remove(key)
+        return len(entries)
@@ -0,0 +1,67 @@
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from charts import sweep_heatmap_payload, write_charts
+from trade_analyzer import MetricsState
+
+
+SWEEP_METRICS = [
+    "total_return_pct",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "cagr",
+    "max_drawdown_pct",
+]
+
+# Metrics that vary with both parameters and are worth a heatmap
+HEATMAP_METRICS = ["sharpe_ratio", "sortino_ratio"]
+
+
+def parse_grid(spec: str) -> np.ndarray:
+    """
+    Parse a parameter grid: "start:stop:num" (inclusive linspace) or "a,b,c".
+    """
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in spec.split(",") if v.strip()])
+
+
+def sweep_metrics(
+    state: MetricsState,
+    capitals: Sequence[float],
+    risk_free_rates: Sequence[float],
+) -> pd.DataFrame:
+    """
+    Evaluate the capital / risk-free-rate dependent metrics over a whole grid.
+
+    The trades are summarized once (`state`) and the METRICS graph that
+    MetricsState.finalize uses is evaluated once, with the capital as a
+    (C, 1) column and the rate as a (1, R) row: its capital and rate nodes
+    broadcast, so each formula runs once over the whole grid. Returns one
+    row per (capital, risk_free_rate) pair.
+    """
+    capital = np.asarray(capitals, dtype=float)[:, None]  # (C, 1)
+    rate = np.asarray(risk_free_rates, dtype=float)[None, :]  # (1, R)
+    values = state.metric_graph(capital, rate).get(SWEEP_METRICS)
+
+    grid_capital, grid_rate = np.broadcast_arrays(capital, rate)
+    shape = grid_capital.shape
+    table = {"capital": grid_capital.ravel(), "risk_free_rate": grid_rate.ravel()}
+    for name in SWEEP_METRICS:
+        value = np.nan if values[name] is None else values[name]
+        table[name] = np.broadcast_to(np.asarray(value, dtype=float), shape).ravel()
+    return pd.DataFrame(table)
+
+
+def plot_sweep_heatmaps(table: pd.DataFrame, output_dir: str) -> Dict[str, str]:
+    """Save one capital x risk-free-rate heatmap per HEATMAP_METRICS entry (charts.py drawers)."""
+    payloads = {}
+    for metric in HEATMAP_METRICS:
+        grid = table.pivot(index="capital", columns="risk_free_rate", values=metric)
+        if grid.isna().all().all():
+            continue
+        payloads[f"sweep_{metric}"] = sweep_heatmap_payload(grid.to_numpy(), grid.index.to_numpy(), grid.columns.to_numpy())
+    return write_charts(payloads, output_dir) if payloads else {}
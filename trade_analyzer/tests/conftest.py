@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# The analyzer is a flat set of modules run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_trades():
+    """Factory for parsed statement frames, one row per trade.
+
+    Scalars are broadcast over the rows, so only the columns a test cares
+    about need to be spelled out.
+    """
+
+    def make(pnl, symbols="NIFTY25OCTFUT", open_quantity=0, unrealized=0.0):
+        return pd.DataFrame(
+            {
+                "Symbol": symbols,
+                "Realized P&L": pnl,
+                "Open Quantity": open_quantity,
+                "Unrealized P&L": unrealized,
+            },
+            index=pd.RangeIndex(len(pnl)),
+        )
+
+    return make
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from batch import combine_statements
+
+
+def _parsed(df, end):
+    return df, 10.0, 0.0, pd.Timestamp(end) - pd.Timedelta(days=27), pd.Timestamp(end)
+
+
+def _unrealized(df):
+    return float(df.loc[df["Open Quantity"] != 0, "Unrealized P&L"].sum())
+
+
+def test_combine_keeps_the_latest_unrealized_snapshot_per_account(make_trades):
+    june = _parsed(make_trades([100.0, 0.0], open_quantity=[0, 50], unrealized=[0.0, 300.0]), "2025-06-28")
+    july = _parsed(make_trades([60.0, 0.0], open_quantity=[0, 50], unrealized=[0.0, -120.0]), "2025-07-28")
+
+    # Statements of one account, in any order
+    df, charges, _, start, end = combine_statements([july, june])
+    assert _unrealized(df) == pytest.approx(-120.0)
+    assert df["Realized P&L"].sum() == pytest.approx(160.0)
+    assert charges == pytest.approx(20.0)
+    assert (start, end) == (june[3], july[4])
+
+    # Across accounts, each account's latest snapshot is counted
+    other = _parsed(make_trades([5.0, 0.0], open_quantity=[0, 10], unrealized=[0.0, 40.0]), "2025-06-28")
+    df = combine_statements([june, other, july], accounts=["A", "B", "A"])[0]
+    assert _unrealized(df) == pytest.approx(-80.0)
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bootstrap import BOOTSTRAP_METRICS, _path_metrics, bootstrap_metrics  # noqa: E402
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import add_symbol_columns, compute_metrics, metric_graph, realized_pnl_series  # noqa: E402
+
+CAPITAL, RATE = 100000.0, 0.03
+START, END = pd.Timestamp("2025-06-01"), pd.Timestamp("2026-02-05")
+
+
+@pytest.fixture(scope="module")
+def trades():
+    df = add_symbol_columns(synthetic_trades(400, seed=2))
+    years = metric_graph(df, CAPITAL, RATE, start_date=START, end_date=END)["years"]
+    return df, np.asarray(realized_pnl_series(df), dtype=float), years
+
+
+def test_path_metrics_of_the_actual_sequence_match_compute_metrics(trades):
+    df, pnl, years = trades
+    metrics = compute_metrics(df, CAPITAL, RATE, start_date=START, end_date=END)
+    point = {name: values[0] for name, values in _path_metrics(pnl[None, :], CAPITAL, RATE, years).items()}
+    assert point["sharpe_ratio"] == pytest.approx(metrics.sharpe_ratio)
+    assert point["sortino_ratio"] == pytest.approx(metrics.sortino_ratio)
+    assert point["final_pnl"] == pytest.approx(metrics.total_realized_pnl)
+    assert point["max_drawdown_pct"] == pytest.approx(metrics.max_drawdown_pct)
+
+
+def test_intervals_bracket_the_point_estimate_and_ignore_chunking(trades):
+    _, pnl, years = trades
+    result = bootstrap_metrics(pnl, CAPITAL, RATE, years, n_paths=2000, seed=1)
+    point = _path_metrics(pnl[None, :], CAPITAL, RATE, years)
+    for metric in BOOTSTRAP_METRICS:
+        lo, hi = result.confidence_interval(metric)
+        assert lo < point[metric][0] < hi, metric
+        assert result.confidence_interval(metric, level=0.5)[0] > lo
+
+    # A few paths per chunk draws the same paths as one block
+    chunked = bootstrap_metrics(pnl, CAPITAL, RATE, years, n_paths=2000, seed=1, chunk_bytes=len(pnl) * 8 * 4 * 7)
+    for metric in BOOTSTRAP_METRICS:
+        np.testing.assert_array_equal(chunked.distributions[metric], result.distributions[metric])
@@ -0,0 +1,56 @@
+import os
+import sys
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from breakdown import _group_labels, breakdown_section, compute_breakdown  # noqa: E402
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import add_symbol_columns, compute_metrics  # noqa: E402
+
+
+def _expiry_rows(section):
+    block = section.split("## Breakdown by Expiry")[1].split("## ")[0]
+    return [line for line in block.splitlines() if line.startswith("| 20")]
+
+
+def test_breakdown_expiries_use_decoded_symbols(make_trades):
+    df = make_trades([100.0, -50.0, 20.0], symbols=["NIFTY25OCT25000CE", "NIFTY25O1625000PE", "BANKNIFTY25NOVFUT"])
+    tables = compute_breakdown(df, 100000.0, 0.0, dimensions=["expiry"])
+    assert list(tables["expiry"].index) == ["2025-10-16", "2025-10-30", "2025-11-27"]
+
+
+def test_breakdown_section_drops_empty_groups_and_caps_rows(make_trades):
+    # Three expiries with 3, 2 and 1 trades, and one with only an open position
+    symbols = ["NIFTY25OCTFUT"] * 3 + ["NIFTY25NOVFUT"] * 2 + ["NIFTY25DECFUT", "NIFTY26JANFUT"]
+    df = make_trades([10.0, -5.0, 7.0, 3.0, 4.0, 1.0, 0.0], symbols=symbols, open_quantity=[0] * 6 + [50])
+    tables = compute_breakdown(df, 100000.0, 0.0, dimensions=["expiry"])
+    assert len(tables["expiry"]) == 4
+
+    section = breakdown_section(tables, max_rows=2)
+    rows = _expiry_rows(section)
+    # The two most traded expiries, in date order
+    assert [row.split(" | ")[0] for row in rows] == ["| 2025-10-30", "| 2025-11-27"]
+    assert "Showing the 2 most traded of 3 groups with trades (1 without trades left out)." in section
+
+    rows = _expiry_rows(breakdown_section(tables))
+    assert len(rows) == 3
+    assert not any("2026-01-29" in row for row in rows)
+
+
+def test_grouped_metrics_match_compute_metrics_on_each_group():
+    # Thousands of trades over a few dozen expiries: every group has many tied dates
+    df = add_symbol_columns(synthetic_trades(5000, seed=4))
+    start, end = pd.Timestamp("2025-06-01"), pd.Timestamp("2026-02-05")
+    tables = compute_breakdown(df, 100000.0, 0.05, start_date=start, end_date=end)
+    for by, table in tables.items():
+        labels = _group_labels(df, by)
+        for name, row in table.iterrows():
+            expected = asdict(compute_metrics(df[labels == name], 100000.0, 0.05, start_date=start, end_date=end))
+            for field, value in expected.items():
+                value = np.nan if value is None else value
+                assert row[field] == pytest.approx(value, nan_ok=True), (by, name, field)
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from calendar_returns import PERIODS_PER_YEAR, calendar_returns, period_stats  # noqa: E402
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import add_symbol_columns, compute_calendar_returns, realized_trades  # noqa: E402
+
+CAPITAL = 1_000_000.0
+START, END = pd.Timestamp("2025-06-01"), pd.Timestamp("2026-02-05")
+
+
+@pytest.fixture(scope="module")
+def trades():
+    df = add_symbol_columns(synthetic_trades(4000, seed=8))
+    pnl, dates = realized_trades(df)
+    return df, np.asarray(pnl, dtype=float), pd.DatetimeIndex(dates)
+
+
+def test_buckets_sum_to_total_pnl_and_match_a_groupby(trades):
+    df, pnl, dates = trades
+    result = compute_calendar_returns(df, CAPITAL, start_date=START, end_date=END)
+    assert result.undated_trades == 0
+    for frequency in PERIODS_PER_YEAR:
+        assert result.buckets[frequency]["pnl"].sum() == pytest.approx(pnl.sum())
+
+    # Weekend trades count on the Friday before
+    days = pd.DatetimeIndex(np.busday_offset(dates.values.astype("datetime64[D]"), 0, roll="backward"))
+    daily = pd.Series(pnl).groupby(days).sum()
+    buckets = result.buckets["daily"]["pnl"]
+    pd.testing.assert_series_equal(buckets[buckets != 0], daily[daily != 0], check_names=False, check_index_type=False, check_freq=False)
+    assert (buckets.index.dayofweek < 5).all()
+
+    weekly = pd.Series(pnl).groupby(days.to_period("W-SUN").start_time).sum()
+    buckets = result.buckets["weekly"]["pnl"]
+    np.testing.assert_allclose(buckets.reindex(weekly.index).to_numpy(), weekly.to_numpy())
+    assert (buckets.index.dayofweek == 0).all()
+
+    monthly = pd.Series(pnl).groupby(dates.to_period("M").start_time).sum()
+    buckets = result.buckets["monthly"]["pnl"]
+    np.testing.assert_allclose(buckets.reindex(monthly.index).to_numpy(), monthly.to_numpy())
+    # Every month of the statement period, quiet ones included
+    assert list(buckets.index) == list(pd.date_range("2025-06-01", "2026-02-01", freq="MS"))
+
+
+def test_compounded_period_returns_give_the_total_return(trades):
+    _, pnl, dates = trades
+    result = calendar_returns(pnl, dates.values, CAPITAL, start_date=START, end_date=END)
+    for frequency in PERIODS_PER_YEAR:
+        growth = np.prod(1.0 + result.returns(frequency).to_numpy() / 100.0)
+        assert growth - 1.0 == pytest.approx(pnl.sum() / CAPITAL), frequency
+    table = result.monthly_table()
+    assert ((1.0 + table["Year"] / 100.0).prod() - 1.0) == pytest.approx(pnl.sum() / CAPITAL)
+
+
+def test_undated_trades_are_counted_but_not_bucketed():
+    dates = np.array(["2025-03-07", "NaT", "2025-03-08"], dtype="datetime64[ns]")  # Friday, undated, Saturday
+    result = calendar_returns(np.array([10.0, 99.0, 5.0]), dates, 1000.0)
+    assert result.undated_trades == 1
+    daily = result.buckets["daily"]
+    assert list(daily.index) == [pd.Timestamp("2025-03-07")]
+    assert daily["pnl"].tolist() == [15.0]
+    assert daily["return_pct"].tolist() == [pytest.approx(1.5)]
+
+
+def test_period_stats():
+    returns = np.array([1.0, -2.0, 3.0, np.nan, 0.5])
+    stats = period_stats(returns, risk_free_rate=0.12, periods_per_year=12)
+    r = np.array([0.01, -0.02, 0.03, 0.005])
+    excess = r - 0.01
+    assert stats["periods"] == 4
+    assert stats["positive_pct"] == pytest.approx(75.0)
+    assert stats["volatility_pct"] == pytest.approx(r.std(ddof=1) * np.sqrt(12) * 100)
+    assert stats["sharpe_ratio"] == pytest.approx(excess.mean() / r.std(ddof=1) * np.sqrt(12))
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+    assert stats["sortino_ratio"] == pytest.approx(excess.mean() / downside * np.sqrt(12))
+    assert (stats["best_pct"], stats["worst_pct"]) == (pytest.approx(3.0), pytest.approx(-2.0))
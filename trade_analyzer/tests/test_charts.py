@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+import charts
+from charts import cumulative_payload, downsample_minmax, pie_payload, render_chart, write_charts
+
+
+def test_downsample_minmax_keeps_endpoints_and_extremes():
+    rng = np.random.default_rng(5)
+    y = np.cumsum(rng.normal(size=100_001))
+    x, kept = downsample_minmax(y, max_points=1000)
+    assert len(x) <= 1000 + 2
+    assert (np.diff(x) > 0).all()
+    assert (x[0], x[-1]) == (0, len(y) - 1)
+    np.testing.assert_array_equal(kept, y[x])
+    assert kept.min() == y.min() and kept.max() == y.max()
+
+    # Short series are returned whole
+    x, kept = downsample_minmax(y[:50], max_points=1000)
+    np.testing.assert_array_equal(x, np.arange(50))
+
+
+def test_render_chart_draws_an_image():
+    assert render_chart("wins_losses_pie", pie_payload(6, 3, 1)).startswith(b"\x89PNG")
+
+
+def test_write_charts_renders_only_changed_or_missing_charts(tmp_path, monkeypatch):
+    rendered = []
+    render_charts = charts.render_charts
+
+    def recording(payloads, **kwargs):
+        rendered.append(sorted(payloads))
+        return render_charts(payloads, **kwargs)
+
+    monkeypatch.setattr(charts, "render_charts", recording)
+    payloads = {"cumulative_pnl": cumulative_payload(np.cumsum(np.arange(200.0))), "wins_losses_pie": pie_payload(6, 3, 1)}
+    out = str(tmp_path)
+
+    paths = write_charts(payloads, out)
+    assert rendered == [["cumulative_pnl", "wins_losses_pie"]]
+    assert all(os.path.exists(p) for p in paths.values())
+
+    # Same data: nothing is drawn
+    write_charts(payloads, out)
+    assert len(rendered) == 1
+
+    # One chart's data changed and another's file is gone
+    payloads["wins_losses_pie"] = pie_payload(7, 3, 1)
+    os.remove(paths["cumulative_pnl"])
+    write_charts(payloads, out)
+    assert rendered[-1] == ["cumulative_pnl", "wins_losses_pie"]
+
+    payloads["wins_losses_pie"] = pie_payload(8, 3, 1)
+    write_charts(payloads, out)
+    assert rendered[-1] == ["wins_losses_pie"]
+
+    write_charts(payloads, out, force=True)
+    assert rendered[-1] == ["cumulative_pnl", "wins_losses_pie"]
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from drawdown import analyze_drawdowns  # noqa: E402
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import add_symbol_columns, compute_metrics, realized_trades  # noqa: E402
+
+
+def test_episodes_of_a_small_curve():
+    # Portfolio values 110, 105, 95, 115, 112, 117, 109
+    pnl = [10.0, -5.0, -10.0, 20.0, -3.0, 5.0, -8.0]
+    dates = pd.date_range("2025-01-01", periods=len(pnl), freq="2D").to_numpy()
+    analysis = analyze_drawdowns(pnl, 100.0, dates=dates)
+    episodes = analysis.episodes
+
+    assert list(episodes["peak_trade"]) == [1, 6, 4]
+    assert list(episodes["trough_trade"]) == [3, 7, 5]
+    assert list(episodes["recovery_trade"].astype(object)) == [4, pd.NA, 6]
+    assert list(episodes["recovered"]) == [True, False, True]
+    assert list(episodes["duration_trades"]) == [3, 1, 2]
+    assert list(episodes["duration_days"]) == [6, 2, 4]
+    np.testing.assert_allclose(episodes["depth"], [-15.0, -8.0, -3.0])
+    np.testing.assert_allclose(episodes["depth_pct"], [-15 / 110 * 100, -8 / 117 * 100, -3 / 115 * 100])
+
+    np.testing.assert_allclose(analysis.underwater_pct, [0.0, -5 / 110 * 100, -15 / 110 * 100, 0.0, -3 / 115 * 100, 0.0, -8 / 117 * 100])
+    assert analysis.time_under_water_pct == pytest.approx(4 / 7 * 100)
+    assert analysis.longest_underwater_trades == 2
+    assert analysis.longest_underwater_days == 6
+
+
+@pytest.mark.parametrize("capital", [100000.0, 0.0])
+def test_deepest_episode_is_max_drawdown(capital):
+    df = add_symbol_columns(synthetic_trades(3000, seed=6))
+    metrics = compute_metrics(df, capital, 0.0)
+    pnl, dates = realized_trades(df)
+    analysis = analyze_drawdowns(pnl, capital, dates=dates)
+    assert analysis.episodes["depth_pct"].iloc[0] == pytest.approx(metrics.max_drawdown_pct)
+    assert analysis.underwater_pct.min() == pytest.approx(metrics.max_drawdown_pct)
+    assert (analysis.episodes["depth_pct"].diff().dropna() >= 0).all()
+
+
+def test_no_episodes_without_losses():
+    analysis = analyze_drawdowns([5.0, 0.0, 7.0], 1000.0)
+    assert analysis.episodes.empty
+    assert analysis.longest_underwater_trades == 0
+    assert analysis.time_under_water_pct == 0.0
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+from feed import build_feed, lttb, write_feed
+from trade_analyzer import compute_metrics
+
+
+def _naive_lttb(y, max_points):
+    # Textbook LTTB: bucket i spans [1 + i*w, 1 + (i+1)*w) of the interior points
+    n = len(y)
+    w = (n - 2) / (max_points - 2)
+    kept = [0]
+    for i in range(max_points - 2):
+        lo, hi = int(1 + i * w), int(1 + (i + 1) * w)
+        next_lo, next_hi = hi, min(int(1 + (i + 2) * w), n) if i + 2 < max_points - 1 else n
+        next_x, next_y = (next_lo + next_hi - 1) / 2.0, np.mean(y[next_lo:next_hi])
+        a = kept[-1]
+        areas = [abs((a - next_x) * (y[j] - y[a]) - (a - j) * (next_y - y[a])) for j in range(lo, hi)]
+        kept.append(lo + int(np.argmax(areas)))
+    kept.append(n - 1)
+    return np.array(kept)
+
+
+@pytest.mark.parametrize("n, max_points", [(1000, 50), (10_007, 200), (301, 100)])
+def test_lttb_keeps_endpoints_and_point_count(n, max_points):
+    y = np.cumsum(np.random.default_rng(n).normal(size=n))
+    x, kept = lttb(y, max_points)
+    assert len(x) == max_points
+    assert (x[0], x[-1]) == (0, n - 1)
+    assert (np.diff(x) > 0).all()
+    np.testing.assert_array_equal(kept, y[x])
+    np.testing.assert_array_equal(x, _naive_lttb(y, max_points))
+
+
+def test_lttb_keeps_a_spike_and_short_series():
+    y = np.zeros(5000)
+    y[1234] = -50.0
+    x, _ = lttb(y, 20)
+    assert 1234 in x
+
+    x, kept = lttb(np.arange(10.0), 20)
+    np.testing.assert_array_equal(x, np.arange(10))
+
+
+def test_feed_curve_starts_at_zero_and_ends_at_the_total(tmp_path, make_trades):
+    pnl = np.random.default_rng(0).normal(10.0, 100.0, 3000).round(2)
+    df = make_trades(pnl)
+    feed = build_feed(compute_metrics(df, 100000.0, 0.0), pnl, max_points=100)
+    curve = feed["cumulativePnl"]
+    assert len(curve) == 100
+    assert curve[0] == {"trade": 0, "pnl": 0.0}
+    assert curve[-1]["trade"] == len(pnl)
+    assert curve[-1]["pnl"] == pytest.approx(pnl.sum(), abs=0.01)
+
+    path = tmp_path / "metrics.json"
+    write_feed(feed, str(path))
+    assert json.loads(path.read_text()) == feed
@@ -0,0 +1,63 @@
+import os
+import re
+from io import BytesIO
+
+import numpy as np
+
+from html_report import markdown_to_html, write_html
+from trade_analyzer import compute_metrics, generate_html_report
+
+
+def test_markdown_subset_converts_and_escapes():
+    markdown = "\n".join(
+        [
+            "## P&L <Summary>",
+            "",
+            "| Metric | Value |",
+            "| --- | ---: |",
+            "| **Net** | `1,000` |",
+            "",
+            "- first",
+            "- second",
+            "",
+            "Two lines",
+            "of text.",
+        ]
+    )
+    assert markdown_to_html(markdown).splitlines() == [
+        "<h2>P&amp;L &lt;Summary&gt;</h2>",
+        "<table>",
+        "<thead><tr><th>Metric</th><th>Value</th></tr></thead>",
+        "<tbody>",
+        "<tr><td><strong>Net</strong></td><td><code>1,000</code></td></tr>",
+        "</tbody></table>",
+        "<ul>",
+        "<li>first</li>",
+        "<li>second</li>",
+        "</ul>",
+        "<p>Two lines of text.</p>",
+    ]
+
+
+def test_html_report_is_self_contained(tmp_path, make_trades):
+    pnl = np.random.default_rng(3).normal(5.0, 50.0, 200).round(2)
+    df = make_trades(pnl)
+    metrics = compute_metrics(df, 100000.0, 0.0)
+
+    for fmt in ("svg", "png"):
+        buffer = BytesIO()
+        generate_html_report(metrics, df, buffer, fmt=fmt)
+        document = buffer.getvalue().decode("utf-8")
+        assert document.startswith("<!DOCTYPE html>")
+        figures = re.findall(r'<figure id="([a-z_]+)">', document)
+        assert "cumulative_pnl" in figures
+        embedded = document.count("<svg") if fmt == "svg" else document.count('src="data:image/png;base64,')
+        assert embedded == len(figures)
+        # Nothing is loaded from elsewhere
+        assert not re.search(r'(src|href)="(?!data:|#)', document)
+        assert "<?xml" not in document
+
+    path = tmp_path / "report.html"
+    write_html(b"<!DOCTYPE html>", str(path))
+    assert path.read_bytes() == b"<!DOCTYPE html>"
+    assert os.listdir(tmp_path) == ["report.html"]
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PACKAGE_DIR, "benchmarks"))
+
+from import_budget import LAZY_MODULES  # noqa: E402
+from synthetic import generate_statement  # noqa: E402
+
+
+def _loaded_lazy_modules(script: str) -> list:
+    """Lazy modules in sys.modules after running `script` in a fresh interpreter."""
+    probe = script + f"\nimport json; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({LAZY_MODULES!r}))))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=PACKAGE_DIR, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def test_import_does_not_load_plotting_or_excel_libraries():
+    assert _loaded_lazy_modules("import sys, trade_analyzer") == []
+
+
+def test_metrics_only_run_does_not_load_plotting_or_excel_libraries(tmp_path):
+    statement = str(tmp_path / "statement.csv")
+    generate_statement(statement, 200, seed=1)
+    script = f"import sys, trade_analyzer\nsys.argv = ['trade_analyzer.py', '--file', {statement!r}, '--metrics-only']\ntrade_analyzer.main()"
+    assert _loaded_lazy_modules(script) == []
+
+
+def test_import_budget_script_passes():
+    # Generous budgets: this guards against regressions such as an eager
+    # pandas-sized import, not against machine-to-machine noise
+    result = subprocess.run(
+        [sys.executable, os.path.join("benchmarks", "import_budget.py"), "--runs", "3", "--budget", "3", "--overhead-budget", "0.5"],
+        cwd=PACKAGE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
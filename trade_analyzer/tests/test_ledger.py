@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from ledger import TradeLedger
+from trade_analyzer import add_symbol_columns
+
+
+def _statement(df, charges, other, start, end):
+    return add_symbol_columns(df), charges, other, pd.Timestamp(start), pd.Timestamp(end)
+
+
+def test_overlapping_statements_count_rows_and_charges_once(tmp_path, make_trades):
+    symbols = ["NIFTY25JANFUT", "BANKNIFTY25JANFUT", "NIFTY25FEBFUT", "BANKNIFTY25FEBFUT"]
+    january = _statement(make_trades([10.0, 20.0, 30.0], symbols=symbols[:3]), 100.0, -10.0, "2025-01-01", "2025-01-31")
+    # Half of its 30 days and two of its three rows are already in the January export
+    rolled = _statement(make_trades([20.0, 30.0, 40.0], symbols=symbols[1:]), 60.0, -4.0, "2025-01-17", "2025-02-15")
+    other_account = _statement(make_trades([5.0], symbols=symbols[:1]), 50.0, 0.0, "2025-01-01", "2025-01-31")
+
+    ledger = TradeLedger(str(tmp_path))
+    assert ledger.append(january, "AB1234", "jan") == 3
+    assert ledger.append(rolled, "AB1234", "rolled") == 1
+    # The same period exported again, under another key
+    assert ledger.append(january, "AB1234", "jan-again") == 0
+    assert ledger.append(other_account, "CD5678", "other") == 1
+
+    df, charges, other, start, end = ledger.select(accounts=["AB1234"])
+    assert sorted(df["Realized P&L"]) == [10.0, 20.0, 30.0, 40.0]
+    assert charges == pytest.approx(100.0 + 60.0 * 0.5)
+    assert other == pytest.approx(-10.0 - 4.0 * 0.5)
+    assert (start, end) == (pd.Timestamp("2025-01-01"), pd.Timestamp("2025-02-15"))
+
+    # Accounts don't cover each other's periods
+    df, charges, _, _, _ = ledger.select()
+    assert len(df) == 5
+    assert charges == pytest.approx(130.0 + 50.0)
+
+    # Only February expiries; the January-only statements don't overlap the range
+    df, charges, _, _, _ = ledger.select(accounts=["AB1234"], start="2025-02-01", end="2025-02-28")
+    assert sorted(df["Realized P&L"]) == [30.0, 40.0]
+    assert charges == pytest.approx(30.0)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from synthetic import synthetic_trades, write_statement  # noqa: E402
+from trade_analyzer import _clean_numeric_column, load_data  # noqa: E402
+
+
+def test_load_data_reads_the_summary_period_and_trades_of_a_statement(tmp_path):
+    trades = synthetic_trades(500, seed=11)
+    path = str(tmp_path / "statement.xlsx")
+    write_statement(path, trades, start="2025-06-01", end="2026-02-05", charges=4321.5, other_credits_debits=-11.8)
+
+    df, charges, other, start, end = load_data(path, engine="openpyxl")
+    assert (charges, other) == (4321.5, -11.8)
+    assert (start, end) == (pd.Timestamp("2025-06-01"), pd.Timestamp("2026-02-05"))
+
+    # Every trade row and no summary row, with its values (some Buy Values are "1,234.50" text)
+    assert len(df) == len(trades)
+    assert list(df["Symbol"].astype(str)) == list(trades["Symbol"])
+    for col in ["Quantity", "Buy Value", "Sell Value", "Realized P&L", "Open Quantity", "Unrealized P&L"]:
+        np.testing.assert_allclose(df[col].to_numpy(), trades[col].to_numpy(dtype=float), err_msg=col)
+    assert df["expiry"].notna().all()
+    assert df["Symbol"].dtype == "category"
+    assert df["Realized P&L"].sum() == pytest.approx(trades["Realized P&L"].sum())
+
+
+def test_clean_numeric_column_parses_text_and_keeps_numbers():
+    col = pd.Series([1234.5, 7, "1,234.50", "₹ -2,000", "-", None, np.nan, " 12.25 "], dtype=object)
+    cleaned = _clean_numeric_column(col)
+    assert cleaned.dtype == "float64"
+    assert cleaned.tolist() == [1234.5, 7.0, 1234.5, -2000.0, 0.0, 0.0, 0.0, 12.25]
+
+    # Numeric columns are not touched, apart from missing values and the float width
+    numbers = pd.Series([0.1, np.nan, 1e12 + 0.37])
+    assert _clean_numeric_column(numbers).tolist() == [0.1, 0.0, 1e12 + 0.37]
+    assert _clean_numeric_column(numbers, float_dtype="float32").dtype == "float32"
+    assert _clean_numeric_column(pd.Series([3, 4])).tolist() == [3, 4]
+
+    # CSV readers hand over string columns
+    assert _clean_numeric_column(pd.Series(["1,000", None, "-0.5"], dtype="str")).tolist() == [1000.0, 0.0, -0.5]
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_analyzer import compute_metric_values, compute_metrics, trade_data
+
+
+def _tied_expiries(n=600, seed=0):
+    # Many trades per expiry, as in a real statement: the curve depends on the order within a date
+    rng = np.random.default_rng(seed)
+    symbols = rng.choice(["NIFTY25OCTFUT", "NIFTY25NOVFUT", "NIFTY25DECFUT"], n)
+    return pd.DataFrame({"Symbol": symbols, "Realized P&L": np.round(rng.normal(0.0, 1000.0, n), 2)})
+
+
+def test_trades_sharing_a_date_keep_their_row_order():
+    df = _tied_expiries()
+    data = trade_data(df)
+    dates = data["realized_dates"]
+    expected = df["Realized P&L"].to_numpy()[np.argsort(dates, kind="stable")]
+    np.testing.assert_array_equal(data["sorted_pnl"], expected)
+    np.testing.assert_allclose(data["cumulative_pnl"], np.cumsum(expected))
+
+
+def test_metric_subset_matches_compute_metrics():
+    df = _tied_expiries(seed=1)
+    metrics = compute_metrics(df, 100000.0, 0.05)
+    values = compute_metric_values(df, ["net_pnl", "sharpe_ratio", "max_drawdown_pct"], 100000.0, 0.05)
+    for name, value in values.items():
+        assert value == pytest.approx(getattr(metrics, name))
@@ -0,0 +1,77 @@
+import threading
+import tracemalloc
+
+from profiling import profiling, stage
+
+
+def _in_thread(func):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=func()))
+    thread.start()
+    thread.join()
+    return result.get("value")
+
+
+def _unprofiled_stage():
+    with stage("unprofiled"):
+        pass
+
+
+def test_stages_nest_under_the_active_profiler():
+    with profiling(trace_memory=False) as profiler:
+        with stage("outer"):
+            with stage("inner"):
+                pass
+    with stage("after"):
+        pass
+    assert [(r.name, r.depth) for r in profiler.records] == [("outer", 0), ("inner", 1)]
+
+
+def test_profilers_of_concurrent_sessions_are_independent():
+    started = threading.Event()
+    release = threading.Event()
+    other = {}
+
+    def session():
+        with profiling(trace_memory=False) as profiler:
+            other["profiler"] = profiler
+            started.set()
+            release.wait()
+            with stage("other.stage"):
+                pass
+
+    thread = threading.Thread(target=session)
+    with profiling(trace_memory=False) as profiler:
+        thread.start()
+        started.wait()
+        with stage("main.stage"):
+            # A thread without its own profiler records nothing here
+            _in_thread(_unprofiled_stage)
+        release.set()
+        thread.join()
+        # The other session stopping did not stop this one
+        with stage("main.after"):
+            pass
+
+    assert [r.name for r in profiler.records] == ["main.stage", "main.after"]
+    assert [r.name for r in other["profiler"].records] == ["other.stage"]
+
+
+def test_only_one_profiler_traces_memory():
+    assert not tracemalloc.is_tracing()
+    with profiling() as first:
+        second = _in_thread(lambda: _profile_in_thread())
+        assert tracemalloc.is_tracing()  # the second profiler's stop left it running
+        with stage("alloc"):
+            data = [0] * 100000
+        del data
+    assert first.trace_memory and not second.trace_memory
+    assert first.records[0].peak_memory_bytes > 0
+    assert not tracemalloc.is_tracing()
+
+
+def _profile_in_thread():
+    with profiling() as profiler:
+        with stage("other"):
+            pass
+    return profiler
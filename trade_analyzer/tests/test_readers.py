@@ -0,0 +1,41 @@
+import os
+import sys
+from importlib.util import find_spec
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from readers import CSV_TABLE_READERS, EXCEL_ENGINES, engine_available  # noqa: E402
+from synthetic import synthetic_trades, write_statement  # noqa: E402
+from trade_analyzer import load_data  # noqa: E402
+
+# Every (format, engine) pair; each must match the openpyxl read of the xlsx
+READERS = [(fmt, engine) for fmt, engines in EXCEL_ENGINES.items() for engine in engines]
+READERS += [("csv", engine) for engine in CSV_TABLE_READERS]
+
+
+@pytest.fixture(scope="module", params=[100, 3000])
+def statements(request, tmp_path_factory):
+    trades = synthetic_trades(request.param, seed=7)
+    data_dir = tmp_path_factory.mktemp(f"statements-{request.param}")
+    paths = {}
+    for fmt in ("xlsx", "xls", "csv"):
+        if fmt == "xls" and find_spec("xlwt") is None:
+            continue
+        paths[fmt] = str(data_dir / f"statement.{fmt}")
+        write_statement(paths[fmt], trades, seed=7)
+    return paths, load_data(paths["xlsx"], engine="openpyxl")
+
+
+@pytest.mark.parametrize("fmt, engine", READERS, ids=[f"{fmt}-{engine}" for fmt, engine in READERS])
+def test_every_reader_yields_the_same_statement(statements, fmt, engine):
+    if not engine_available(engine):
+        pytest.skip(f"{engine} is not installed")
+    paths, expected = statements
+    if fmt not in paths:
+        pytest.skip(f"writing a {fmt} statement needs xlwt")
+    parsed = load_data(paths[fmt], engine=engine)
+    pd.testing.assert_frame_equal(parsed[0], expected[0])
+    assert parsed[1:] == expected[1:]
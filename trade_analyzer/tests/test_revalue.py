@@ -0,0 +1,59 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+
+from revalue import OpenPositions, load_marks, revalued_state
+from trade_analyzer import MetricsState
+
+
+def _statement(make_trades):
+    df = make_trades(
+        [100.0, 0.0, 0.0, 0.0],
+        symbols=["NIFTY25OCTFUT", "NIFTY25OCT25000CE", "BANKNIFTY25OCTFUT", "NIFTY25OCT24000PE"],
+        open_quantity=[0, 75, 30, 50],
+        unrealized=[0.0, 500.0, -200.0, 40.0],
+    )
+    df["Open Quantity Type"] = [None, "Long", "Short", "Long"]
+    df["Previous Closing Price"] = [0.0, 120.0, 51000.0, 80.0]
+    return df
+
+
+def test_revalue_long_short_and_unmarked_positions(make_trades):
+    positions = OpenPositions(_statement(make_trades))
+    assert len(positions) == 3
+    np.testing.assert_array_equal(positions.quantity, [75.0, -30.0, 50.0])
+
+    # Marks match symbols case-insensitively; the put has no mark
+    revaluation = positions.revalue({"nifty25oct25000ce": 130.0, "BANKNIFTY25OCTFUT": 51100.0, "NIFTY25OCTFUT": 1.0})
+    expected = [500.0 + (130.0 - 120.0) * 75, -200.0 + (51100.0 - 51000.0) * -30, 40.0]
+    np.testing.assert_allclose(revaluation.unrealized, expected)
+    assert revaluation.statement_unrealized_pnl == pytest.approx(340.0)
+    assert revaluation.unrealized_pnl == pytest.approx(sum(expected))
+    assert revaluation.delta == pytest.approx(750.0 - 3000.0)
+    assert (revaluation.marked_positions, revaluation.unmarked_positions) == (2, 1)
+    assert np.isnan(revaluation.positions["mark"].iloc[2])
+
+    assert positions.revalue({}).unrealized_pnl == pytest.approx(340.0)
+
+
+def test_revalued_state_replaces_the_unrealized_pnl(make_trades):
+    df = _statement(make_trades)
+    state = MetricsState.from_frame(df)
+    revaluation = OpenPositions(df).revalue({"NIFTY25OCT25000CE": 130.0})
+    metrics = revalued_state(state, revaluation).finalize(100000.0, 0.0)
+    assert metrics.total_unrealized_pnl == pytest.approx(340.0 + 750.0)
+    assert metrics.total_realized_pnl == pytest.approx(100.0)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Symbol,LTP\nnifty25octfut ,\"25,010.5\"\nNIFTY25OCTFUT,25012\nBANKNIFTY25OCTFUT,n/a\n",
+        "NIFTY25OCTFUT,25000\nNIFTY25OCTFUT,25012\nBANKNIFTY25OCTFUT,\n",
+    ],
+    ids=["header", "headerless"],
+)
+def test_load_marks(text):
+    marks = load_marks(StringIO(text))
+    assert marks.to_dict() == {"NIFTY25OCTFUT": 25012.0}
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import range_max, rolling_metrics, sliding_max
+
+CAPITAL, RATE, TRADES_PER_YEAR = 100000.0, 0.03, 500.0
+
+
+def _naive(pnl, left, i):
+    window = pnl[left : i + 1]
+    std = window.std(ddof=1) if len(window) > 1 else np.nan
+    excess = window.mean() / CAPITAL - RATE / TRADES_PER_YEAR
+    value = CAPITAL + np.concatenate([[0.0], np.cumsum(pnl)])
+    peak = value[left : i + 2].max()
+    return {
+        "trades_in_window": len(window),
+        "win_rate": (window > 0).mean() * 100.0,
+        "expectancy": window.mean(),
+        "sharpe_ratio": excess / (std / CAPITAL) * np.sqrt(TRADES_PER_YEAR) if std > 0 else np.nan,
+        "drawdown_pct": (value[i + 1] - peak) / peak * 100.0,
+    }
+
+
+def _compare(table, pnl, lefts, first=0):
+    for i in range(first, len(pnl)):
+        expected = _naive(pnl, lefts[i], i)
+        row = table.iloc[i]
+        for metric, value in expected.items():
+            assert row[metric] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), (i, metric)
+
+
+def test_trade_windows_match_a_naive_recompute():
+    rng = np.random.default_rng(1)
+    pnl = rng.normal(20.0, 400.0, 300).round(2)
+    pnl[50:60] = 0.0  # a flat stretch: zero volatility
+    table = rolling_metrics(pnl, CAPITAL, RATE, TRADES_PER_YEAR, window=20)
+    assert table.loc[:18, "win_rate"].isna().all()
+    _compare(table, pnl, np.maximum(np.arange(len(pnl)) - 19, 0), first=19)
+
+
+def test_day_windows_match_a_naive_recompute():
+    rng = np.random.default_rng(2)
+    n = 400
+    pnl = rng.normal(0.0, 300.0, n).round(2)
+    dates = np.sort((pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="D")).to_numpy())
+    table = rolling_metrics(pnl, CAPITAL, RATE, TRADES_PER_YEAR, days=10, dates=dates)
+    lefts = [int(np.argmax(dates > d - np.timedelta64(10, "D"))) for d in dates]
+    _compare(table, pnl, lefts)
+    assert (table["date"].to_numpy() == dates).all()
+
+
+@pytest.mark.parametrize("k", [1, 2, 7, 64, 1000])
+def test_sliding_and_range_max_match_a_naive_max(k):
+    values = np.random.default_rng(k).normal(size=500)
+    naive = np.array([values[max(0, i - k + 1) : i + 1].max() for i in range(len(values))])
+    np.testing.assert_array_equal(sliding_max(values, k), naive)
+    np.testing.assert_array_equal(range_max(values, np.maximum(np.arange(len(values)) - k + 1, 0)), naive)
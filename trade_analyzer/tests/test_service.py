@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from service import AnalysisService, HTTPError  # noqa: E402
+from synthetic import synthetic_trades, write_statement  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def statement(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("service") / "statement.xlsx")
+    write_statement(path, synthetic_trades(200, seed=9))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def _request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    responses = await reader.read()
+    writer.close()
+    return responses
+
+
+def test_identical_requests_share_one_analysis(statement, tmp_path):
+    service = AnalysisService(workers=1, cache_dir=str(tmp_path / "cache"))
+
+    async def run():
+        target = "/analyze?capital=100000&risk_free_rate=0.03&feed_points=50"
+        concurrent = await asyncio.gather(*(service.route("POST", target, statement) for _ in range(3)))
+        again = await service.route("POST", target, statement)
+        return concurrent, again
+
+    try:
+        concurrent, again = asyncio.run(run())
+    finally:
+        service.close()
+    summaries = [json.loads(payload) for _, payload in concurrent + [again]]
+    assert len({s["key"] for s in summaries}) == 1
+    assert service.stats == {"requests": 0, "analyses": 1, "cache_hits": 1, "deduplicated": 2}
+    assert len(summaries[0]["feed"]["cumulativePnl"]) == 50
+
+    key = summaries[0]["key"]
+    content_type, html = service._artifact(["results", key, "report.html"])
+    assert content_type.startswith("text/html") and html.startswith(b"<!DOCTYPE html>")
+    content_type, image = service._artifact(["results", key, "plots", "cumulative_pnl.png"])
+    assert content_type == "image/png" and image.startswith(b"\x89PNG")
+    with pytest.raises(HTTPError) as exc:
+        service._artifact(["results", "unknown"])
+    assert exc.value.status == 404
+
+
+def test_http_errors_keep_the_connection_until_the_body_is_unreadable(tmp_path):
+    service = AnalysisService(workers=1, cache_dir=None)
+
+    async def run():
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            # Three requests on one keep-alive connection; the chunked upload closes it
+            pipelined = await _request(
+                port,
+                b"GET /health HTTP/1.1\r\n\r\n"
+                b"GET /analyze HTTP/1.1\r\n\r\n"
+                b"POST /analyze?capital=abc HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc"
+                b"POST /analyze HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"GET /health HTTP/1.1\r\n\r\n",
+            )
+        return pipelined
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        service.close()
+    statuses = re.findall(rb"HTTP/1\.1 (\d{3})", responses)
+    assert statuses == [b"200", b"405", b"400", b"411"]
+    assert b"Connection: close" in responses.split(b"HTTP/1.1 411")[1]
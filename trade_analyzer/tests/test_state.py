@@ -0,0 +1,18 @@
+import pytest
+
+from trade_analyzer import MetricsState
+
+
+def test_merge_keeps_the_later_unrealized_snapshot(make_trades):
+    # The same position is open at the end of both statements, marked at 300 then at -120
+    first = MetricsState.from_frame(make_trades([100.0, -40.0], open_quantity=[0, 50], unrealized=[0.0, 300.0]))
+    second = MetricsState.from_frame(make_trades([60.0, 0.0], open_quantity=[0, 50], unrealized=[0.0, -120.0]))
+
+    merged = first.merge(second)
+    assert merged.total_unrealized_pnl == pytest.approx(-120.0)
+    assert merged.total_realized_pnl == pytest.approx(120.0)
+    assert merged.total_trades == 3
+
+    metrics = merged.finalize(100000.0, 0.0)
+    assert metrics.total_unrealized_pnl == pytest.approx(-120.0)
+    assert metrics.net_pnl == pytest.approx(120.0 - 120.0)
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from statement_cache import StatementCache  # noqa: E402
+from synthetic import synthetic_trades, write_statement  # noqa: E402
+from trade_analyzer import load_data, load_data_cached  # noqa: E402
+
+
+def test_cached_load_roundtrip(tmp_path):
+    path = str(tmp_path / "statement.xlsx")
+    write_statement(path, synthetic_trades(50, seed=1))
+    cache = StatementCache(str(tmp_path / "cache"))
+    first = load_data_cached(path, cache)
+    second = load_data_cached(path, cache)
+    pd.testing.assert_frame_equal(first[0], second[0])
+    assert first[1:] == second[1:]
+
+
+def test_uncacheable_statement_still_loads(tmp_path):
+    # An ISIN column holding both strings and numbers cannot be written as Parquet
+    trades = synthetic_trades(20, seed=2)
+    trades["ISIN"] = [5 if i % 2 else "INE009A01021" for i in range(len(trades))]
+    path = str(tmp_path / "statement.xlsx")
+    write_statement(path, trades)
+    cache_dir = tmp_path / "cache"
+
+    parsed = load_data_cached(path, StatementCache(str(cache_dir)))
+    pd.testing.assert_frame_equal(parsed[0], load_data(path)[0])
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from sweep import SWEEP_METRICS, sweep_metrics  # noqa: E402
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import MetricsState, compute_metrics  # noqa: E402
+
+
+def test_sweep_matches_compute_metrics():
+    df = synthetic_trades(2000, seed=5)
+    start, end = pd.Timestamp("2025-06-01"), pd.Timestamp("2026-02-05")
+    state = MetricsState.from_frame(df, start_date=start, end_date=end)
+    table = sweep_metrics(state, [0.0, 50000.0, 1e6], [0.0, 0.07])
+    assert len(table) == 6
+
+    for row in table.itertuples(index=False):
+        metrics = compute_metrics(df, row.capital, row.risk_free_rate, start_date=start, end_date=end)
+        for name in SWEEP_METRICS:
+            expected = getattr(metrics, name)
+            expected = np.nan if expected is None else expected
+            assert getattr(row, name) == pytest.approx(expected, nan_ok=True), (row.capital, row.risk_free_rate, name)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_analyzer import decode_symbols, infer_trade_date_from_symbol
+
+
+@pytest.mark.parametrize(
+    "symbol, underlying, expiry, strike, option_type",
+    [
+        # Monthly options: UNDERLYING + YY + MON + STRIKE + CE/PE, last Thursday of the month
+        ("ADANIENT25JUL2400PE", "ADANIENT", "2025-07-31", 2400.0, "PE"),
+        ("NIFTY25JUN18300CE", "NIFTY", "2025-06-26", 18300.0, "CE"),
+        ("BAJAJ-AUTO25SEP8000PE", "BAJAJ-AUTO", "2025-09-25", 8000.0, "PE"),
+        ("M&M25DEC3000CE", "M&M", "2025-12-25", 3000.0, "CE"),
+        # Weekly options: UNDERLYING + YY + M + DD + STRIKE + CE/PE
+        ("NIFTY2561918300CE", "NIFTY", "2025-06-19", 18300.0, "CE"),
+        ("BANKNIFTY25O0752000PE", "BANKNIFTY", "2025-10-07", 52000.0, "PE"),
+        ("NIFTY25N2024500CE", "NIFTY", "2025-11-20", 24500.0, "CE"),
+        ("NIFTY25D1124500.5CE", "NIFTY", "2025-12-11", 24500.5, "CE"),
+        # Futures: UNDERLYING + YY + MON + FUT, expiring with the monthly contracts
+        ("NIFTY25NOVFUT", "NIFTY", "2025-11-27", np.nan, "FUT"),
+        ("RELIANCE26JANFUT", "RELIANCE", "2026-01-29", np.nan, "FUT"),
+    ],
+)
+def test_decode_real_symbols(symbol, underlying, expiry, strike, option_type):
+    row = decode_symbols(pd.Series([symbol])).iloc[0]
+    assert row["underlying"] == underlying
+    assert row["expiry"] == pd.Timestamp(expiry)
+    assert (np.isnan(strike) and np.isnan(row["strike"])) or row["strike"] == strike
+    assert row["option_type"] == option_type
+
+
+def test_decode_unknown_symbols():
+    decoded = decode_symbols(pd.Series(["RELIANCE", "", None, "NIFTY2563118300CE"]))
+    assert decoded["expiry"].isna().all()  # June 31st does not exist
+    assert list(decoded["option_type"]) == ["OTHER", "OTHER", "OTHER", "CE"]
+    assert decoded["underlying"].iloc[0] == "RELIANCE"
+
+
+def test_decode_broadcasts_per_row():
+    symbols = pd.Series(["nifty25jun18300ce", "NIFTY25JUN18300CE ", "NIFTY25JUNFUT"], index=[5, 7, 9])
+    decoded = decode_symbols(symbols)
+    assert list(decoded.index) == [5, 7, 9]
+    assert decoded["expiry"].nunique() == 1
+    assert list(decoded["strike"].iloc[:2]) == [18300.0, 18300.0]
+
+
+def test_infer_trade_date_from_symbol():
+    assert infer_trade_date_from_symbol("NIFTY2561918300CE") == pd.Timestamp("2025-06-19")
+    assert infer_trade_date_from_symbol("RELIANCE") is None
+    assert infer_trade_date_from_symbol(None) is None
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from synthetic import synthetic_trades  # noqa: E402
+from trade_analyzer import decode_symbols  # noqa: E402
+
+
+def test_synthetic_symbols_use_zerodha_layouts():
+    trades = synthetic_trades(5000, seed=3)
+    decoded = decode_symbols(trades["Symbol"])
+    assert decoded["expiry"].notna().all()
+    assert (decoded["expiry"].dt.dayofweek == 3).all()  # every contract expires on a Thursday
+    assert set(decoded["option_type"]) == {"CE", "PE", "FUT"}
+    options = decoded["option_type"] != "FUT"
+    assert decoded.loc[options, "strike"].notna().all()
+
+    # Weekly contracts (YY + M + DD) are present and only for index underlyings
+    weekly = trades["Symbol"].str.match(r"^[A-Z]+\d{2}[1-9OND]\d{2}\d+(?:CE|PE)$")
+    assert weekly.any()
+    assert set(decoded.loc[weekly, "underlying"]) <= {"NIFTY", "BANKNIFTY", "FINNIFTY"}
+    # Monthly contracts expire on the last Thursday of their month
+    monthly = ~weekly
+    expiry = decoded.loc[monthly, "expiry"]
+    assert ((expiry + pd.Timedelta(days=7)).dt.month != expiry.dt.month).all()
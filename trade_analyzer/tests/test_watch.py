@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from synthetic import synthetic_trades, write_statement  # noqa: E402
+from watch import StatementWatcher  # noqa: E402
+
+
+def _touch(path, mtime):
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_statements_are_processed_once_they_settle(tmp_path):
+    source, output = tmp_path / "statements", tmp_path / "reports"
+    source.mkdir()
+    first = str(source / "pnl-AB1234-2025.xlsx")
+    write_statement(first, synthetic_trades(50, seed=1))
+    _touch(first, 1_000_000_000)
+    watcher = StatementWatcher(
+        str(source), str(output), 100000.0, 0.0, workers=1, debounce=2.0, feed_path=str(output / "metrics.json"), log=lambda _: None
+    )
+
+    assert watcher.check(now=0.0) is None
+    assert watcher.next_deadline(0.5) == 1.5
+    # Still being written: the quiet period restarts
+    _touch(first, 2_000_000_000)
+    assert watcher.check(now=1.0) is None
+    assert watcher.check(now=2.9) is None
+
+    update = watcher.check(now=3.0)
+    assert update.changed == [first] and update.removed == [] and update.failed == {}
+    assert update.accounts == ["AB1234"]
+    assert (output / "AB1234.md").exists() and (output / "metrics.json").exists()
+    assert watcher.check(now=10.0) is None
+    assert watcher.next_deadline(10.0) is None
+
+    # A new account only rewrites its own report
+    second = str(source / "pnl-CD5678-2025.xlsx")
+    write_statement(second, synthetic_trades(30, seed=2))
+    assert watcher.check(now=20.0) is None
+    report_mtime = os.stat(output / "AB1234.md").st_mtime_ns
+    update = watcher.check(now=22.0)
+    assert update.changed == [second] and update.accounts == ["CD5678"]
+    assert os.stat(output / "AB1234.md").st_mtime_ns == report_mtime
+
+    # Removals need no quiet period
+    os.remove(first)
+    update = watcher.check(now=23.0)
+    assert update.changed == [] and update.removed == [first] and update.accounts == ["AB1234"]
+    assert not (output / "AB1234.md").exists()
+    assert sorted(watcher.state.results) == [second]
@@ -1,16 +1,37 @@
 import argparse
+import json
 import os
 import re
-from dataclasses import dataclass, asdict
-from typing import Dict, Tuple, Optional
+import sys
+from dataclasses import dataclass, asdict, field, fields
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Optional, Union
 
 import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")  # non-interactive backend for scripts/servers
-import matplotlib.pyplot as plt
-import seaborn as sns
 
+from calendar_returns import CalendarReturns, calendar_returns, calendar_section, monthly_grid
+from charts import (
+    ChartPayload,
+    cumulative_payload,
+    histogram_payload,
+    monthly_heatmap_payload,
+    pie_payload,
+    render_charts,
+    rolling_payload,
+    underwater_payload,
+    write_charts,
+)
+from drawdown import DEFAULT_TOP_EPISODES, analyze_drawdowns, drawdown_section
+from html_report import DEFAULT_HTML_CHART_FORMAT, HTML_CHART_FORMATS, render_html, write_html
+from metric_graph import Graph, Registry
+from profiling import profiling, stage
+from readers import get_reader
+from rolling import DEFAULT_ROLLING_TRADES, ROLLING_METRICS, rolling_metrics, rolling_section
+from statement_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, StatementCache, content_key
+
+
+# Bump whenever load_data's output changes so stale cache entries are ignored
+LOADER_VERSION = 4
 
 NUMERIC_COLUMNS = [
     "Quantity",
@@ -54,6 +75,22 @@ class Metrics:
     avg_trade_duration_days: float
 
 
+HEADER_KEYWORDS = {"Symbol", "Quantity", "Buy Value", "Sell Value"}
+
+# How far into the sheet each piece of preamble is searched for
+PERIOD_SCAN_ROWS = 15
+SUMMARY_SCAN_ROWS = 25
+SUMMARY_TEXT_ROWS = 20
+HEADER_SCAN_ROWS = 60
+FALLBACK_HEADER_ROW = 5
+
+_PERIOD_RE = re.compile(r"from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})", re.IGNORECASE)
+
+
+def _is_header_row(values) -> bool:
+    return HEADER_KEYWORDS.issubset({str(v).strip() for v in values})
+
+
 def detect_header_row(df_raw: pd.DataFrame) -> int:
     """
     Attempt to detect the row index where the trade table header starts.
@@ -61,18 +98,154 @@ def detect_header_row(df_raw: pd.DataFrame) -> int:
     We look for a row that contains 'Symbol' and 'Quantity' in its values.
     Fallback: assume row 5 (skip 5 summary rows).
     """
-    header_keywords = {"Symbol", "Quantity", "Buy Value", "Sell Value"}
-    for idx in range(min(60, len(df_raw))):
-        values = {str(v).strip() for v in df_raw.iloc[idx].tolist()}
-        if header_keywords.issubset(values):
+    for idx, row in enumerate(df_raw.head(HEADER_SCAN_ROWS).itertuples(index=False, name=None)):
+        if _is_header_row(row):
             return idx
     # Fallback: assume 5 lines of summary
-    return 5
+    return FALLBACK_HEADER_ROW
+
+
+def _parse_period(row: tuple) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    # Look for pattern: "from YYYY-MM-DD to YYYY-MM-DD"
+    row_text = " ".join(str(v) for v in row if v is not None)
+    match = _PERIOD_RE.search(row_text)
+    if match:
+        try:
+            return pd.Timestamp(match.group(1)), pd.Timestamp(match.group(2))
+        except Exception:
+            pass
+    return None, None
+
+
+def _parse_summary_row(row: tuple) -> Tuple[Optional[float], Optional[float]]:
+    """Return (total_charges, other_credits_debits) if this summary row holds either."""
+    # Summary often has label in col 1 and value in col 2
+    label = str(row[1]).strip() if len(row) > 1 else ""
+    try:
+        val = float(row[2]) if len(row) > 2 and row[2] is not None else None
+    except (TypeError, ValueError):
+        val = None
+    if val is None or val != val:
+        return None, None
+    charges = credits = None
+    if "Charges" in label and "Account" not in label and "Exchange" not in label and "Clearing" not in label and "GST" not in label and "Transaction" not in label and "Turnover" not in label and "Stamp" not in label and "IPFT" not in label:
+        charges = val
+    if "Other Credit" in label or "Other credit" in label or "Othercredits" in label.lower():
+        credits = val
+    return charges, credits
+
+
+def _parse_summary_text(lines: List[str]) -> Tuple[float, float]:
+    """Fallback: look for the summary values in the whitespace-stripped row text."""
+    total_charges = 0.0
+    other_credits_debits = 0.0
+    for line in lines:
+        if "TotalCharges" in line:
+            try:
+                num_str = "".join(ch if (ch.isdigit() or ch in ".-") else " " for ch in line.split("TotalCharges", 1)[1])
+                total_charges = float(num_str.split()[-1])
+            except Exception:
+                pass
+        if "Othercreditsanddebits" in line or "OtherCreditsDebits" in line:
+            try:
+                num_str = "".join(ch if (ch.isdigit() or ch in ".-") else " " for ch in line.split("credits", 1)[-1])
+                other_credits_debits = float(num_str.split()[-1])
+            except Exception:
+                pass
+    return total_charges, other_credits_debits
+
+
+def _column_names(header: tuple) -> List[str]:
+    """Name header cells the way pandas.read_excel does (blank -> 'Unnamed: i', duplicates -> 'X.1')."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for i, v in enumerate(header):
+        name = f"Unnamed: {i}" if v is None or (isinstance(v, str) and not v.strip()) else str(v)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _frame_from_rows(header: tuple, rows: List[tuple]) -> pd.DataFrame:
+    # Trailing blank rows are formatting leftovers, not trades
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    width = len(header)
+    while width and header[width - 1] is None and all(len(r) < width or r[width - 1] is None for r in rows):
+        width -= 1
+    header = header[:width]
+    rows = [tuple(r[:width]) + (None,) * (width - len(r)) for r in rows]
+    return pd.DataFrame(rows, columns=_column_names(header))
+
+
+def _frame_from_table(header: tuple, table: pd.DataFrame) -> pd.DataFrame:
+    """_frame_from_rows for a table parsed in bulk (columns by position)."""
+    blank = table.isna().all(axis=1).to_numpy()
+    # Trailing blank rows are formatting leftovers, not trades
+    table = table.iloc[: len(blank) - int(np.argmax(~blank[::-1])) if (~blank).any() else 0]
+    width = len(header)
+    while width and header[width - 1] is None and table[width - 1].isna().all():
+        width -= 1
+    table = table.iloc[:, :width].reset_index(drop=True)
+    table.columns = _column_names(header[:width])
+    return table
+
+
+def _clean_numeric_column(col: pd.Series, float_dtype: str = "float64") -> pd.Series:
+    """
+    Coerce a trade-table column to numbers without a string round-trip.
+
+    Cells the reader already returned as numbers are kept as they are; only
+    cells that really are text (e.g. "1,234.50") get their separators and
+    symbols stripped. Anything unparseable becomes 0.
+    """
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        values = col
+    else:
+        if pd.api.types.is_string_dtype(col) and not pd.api.types.is_object_dtype(col):
+            is_text = col.notna()
+        else:
+            is_text = col.map(lambda v: isinstance(v, str)).astype(bool)
+        values = pd.to_numeric(col.where(~is_text), errors="coerce")
+        if is_text.any():
+            cleaned = (
+                col[is_text]
+                .astype(str)
+                .str.replace(",", "", regex=False)
+                .str.replace(r"[^\d\.\-]", "", regex=True)
+            )
+            values = values.astype(float)
+            values[is_text] = pd.to_numeric(cleaned, errors="coerce")
+    values = values.fillna(0)
+    if values.dtype.kind == "f":
+        values = values.astype(float_dtype)
+    return values
+
+
+def frame_memory_bytes(df: pd.DataFrame) -> int:
+    """Memory footprint of the frame, including string / category payloads."""
+    return int(df.memory_usage(index=True, deep=True).sum())
 
 
-def load_data(file_path: str) -> Tuple[pd.DataFrame, float, float, Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+def load_data(
+    file_path: str,
+    float_dtype: str = "float64",
+    engine: Optional[str] = None,
+) -> Tuple[pd.DataFrame, float, float, Optional[pd.Timestamp], Optional[pd.Timestamp]]:
     """
-    Read and clean the Zerodha P&L Excel file.
+    Read and clean a Zerodha P&L statement (xlsx, xls or CSV export).
+
+    The format is detected from the file content and read with the first
+    installed engine (see readers.get_reader; `engine` forces one). The
+    sheet is streamed once: period dates, summary values, the header row
+    and the trade rows are all picked up in the same pass; CSV trade tables
+    are parsed in bulk. Every reader yields the same cleaned frame. Numeric
+    columns are stored as `float_dtype` (e.g. "float32" to halve their
+    memory) and Symbol as a categorical.
 
     Returns:
         df (pd.DataFrame): Cleaned trade table.
@@ -81,133 +254,239 @@ def load_data(file_path: str) -> Tuple[pd.DataFrame, float, float, Optional[pd.T
         start_date (Optional[pd.Timestamp]): Period start date if found
         end_date (Optional[pd.Timestamp]): Period end date if found
     """
-    # Read raw file with no header to detect structure
-    df_raw = pd.read_excel(file_path, header=None, engine="openpyxl")
-    
-    # Try to extract period dates from the header (e.g., "P&L Statement for F&O from 2025-06-01 to 2026-02-05")
     start_date = None
     end_date = None
-    for idx in range(min(15, len(df_raw))):
-        row_text = " ".join(str(v) for v in df_raw.iloc[idx].tolist() if pd.notna(v))
-        # Look for pattern: "from YYYY-MM-DD to YYYY-MM-DD"
-        match = re.search(r"from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})", row_text, re.IGNORECASE)
-        if match:
-            try:
-                start_date = pd.Timestamp(match.group(1))
-                end_date = pd.Timestamp(match.group(2))
-                break
-            except Exception:
-                pass
-
-    # Try to infer total charges and other credits/debits from the summary section
     total_charges = 0.0
     other_credits_debits = 0.0
-    for idx in range(min(25, len(df_raw))):
-        row = df_raw.iloc[idx]
-        # Summary often has label in col 1 and value in col 2
-        label = str(row.iloc[1]).strip() if len(row) > 1 else ""
-        try:
-            val = float(row.iloc[2]) if len(row) > 2 and pd.notna(row.iloc[2]) else None
-        except (TypeError, ValueError):
-            val = None
-        if val is not None:
-            if "Charges" in label and "Account" not in label and "Exchange" not in label and "Clearing" not in label and "GST" not in label and "Transaction" not in label and "Turnover" not in label and "Stamp" not in label and "IPFT" not in label:
-                total_charges = val
-            if "Other Credit" in label or "Other credit" in label or "Othercredits" in label.lower():
-                other_credits_debits = val
+    summary_text: List[str] = []
+
+    preamble: List[tuple] = []
+    header_idx: Optional[int] = None
+    trade_rows: List[tuple] = []
+
+    def scan_preamble(idx: int, row: tuple) -> None:
+        nonlocal start_date, end_date, total_charges, other_credits_debits
+        # Period line (e.g., "P&L Statement for F&O from 2025-06-01 to 2026-02-05")
+        if idx < PERIOD_SCAN_ROWS and start_date is None:
+            start_date, end_date = _parse_period(row)
+        charges, credits = _parse_summary_row(row)
+        if charges is not None:
+            total_charges = charges
+        if credits is not None:
+            other_credits_debits = credits
+        if idx < SUMMARY_TEXT_ROWS:
+            summary_text.append("".join("".join(str(v).split()) for v in row if v is not None))
+
+    reader = get_reader(file_path, engine)
+    sheet = reader.iter_rows(file_path)
+    rows = enumerate(sheet)
+    table: Optional[pd.DataFrame] = None
+    # Opening the workbook and scanning the summary rows up to the header
+    with stage("load.detect_header"):
+        for idx, row in rows:
+            if idx < SUMMARY_SCAN_ROWS:
+                scan_preamble(idx, row)
+            if idx < HEADER_SCAN_ROWS:
+                preamble.append(row)
+                if _is_header_row(row):
+                    header_idx = idx
+                    break
+            else:
+                # No header within the scan window: fall back to a fixed summary size
+                header_idx = FALLBACK_HEADER_ROW
+                trade_rows.extend(preamble[header_idx + 1 :])
+                trade_rows.append(row)
+                break
+
+    with stage("load.read_rows"):
+        if header_idx is not None and not trade_rows and reader.read_table is not None:
+            # Summary rows may follow the header; the rest is parsed in bulk
+            for idx, row in rows:
+                if idx >= SUMMARY_SCAN_ROWS:
+                    break
+                scan_preamble(idx, row)
+            sheet.close()
+            table = reader.read_table(file_path, header_idx + 1, len(preamble[header_idx]))
+            if table is None:
+                # The bulk parser gave up (e.g. ragged rows): stream the rows instead
+                for idx, row in enumerate(reader.iter_rows(file_path)):
+                    if idx > header_idx:
+                        trade_rows.append(row)
+        else:
+            for idx, row in rows:
+                if idx < SUMMARY_SCAN_ROWS:
+                    scan_preamble(idx, row)
+                trade_rows.append(row)
+
+    if header_idx is None:
+        header_idx = FALLBACK_HEADER_ROW
+        trade_rows = preamble[header_idx + 1 :]
+
     # Fallback: concat row text and parse
     if total_charges == 0.0 and other_credits_debits == 0.0:
-        summary_section = df_raw.head(20).astype(str).agg(" ".join, axis=1).str.replace(r"\s+", "", regex=True)
-        for line in summary_section:
-            if "TotalCharges" in line:
-                try:
-                    num_str = "".join(ch if (ch.isdigit() or ch in ".-") else " " for ch in line.split("TotalCharges", 1)[1])
-                    total_charges = float(num_str.split()[-1])
-                except Exception:
-                    pass
-            if "Othercreditsanddebits" in line or "OtherCreditsDebits" in line:
-                try:
-                    num_str = "".join(ch if (ch.isdigit() or ch in ".-") else " " for ch in line.split("credits", 1)[-1])
-                    other_credits_debits = float(num_str.split()[-1])
-                except Exception:
-                    pass
-
-    header_row = detect_header_row(df_raw)
-    df = pd.read_excel(
-        file_path,
-        header=header_row,
-        engine="openpyxl",
-    )
-
-    # Drop completely empty columns
-    df = df.dropna(axis=1, how="all")
-
-    # Clean column names
-    df.columns = [str(c).strip().replace("\n", " ") for c in df.columns]
-
-    # Basic trimming of string columns
-    if "Symbol" in df.columns:
-        df["Symbol"] = df["Symbol"].astype(str).str.strip()
+        total_charges, other_credits_debits = _parse_summary_text(summary_text)
+
+    with stage("load.build_frame"):
+        header = preamble[header_idx] if header_idx < len(preamble) else ()
+        if table is not None:
+            df = _frame_from_table(tuple(header), table)
+        else:
+            df = _frame_from_rows(tuple(header), trade_rows)
+
+        # Drop completely empty columns
+        df = df.dropna(axis=1, how="all")
+
+        # Clean column names
+        df.columns = [str(c).strip().replace("\n", " ") for c in df.columns]
+
+        # Basic trimming of string columns
+        if "Symbol" in df.columns:
+            df["Symbol"] = df["Symbol"].astype(str).str.strip()
 
     # Ensure numeric columns are numeric; non-existing columns are ignored
-    for col in NUMERIC_COLUMNS:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(",", "", regex=False)
-                .str.replace(r"[^\d\.\-]", "", regex=True)
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    with stage("load.clean_numeric"):
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = _clean_numeric_column(df[col], float_dtype)
 
     # Filter out rows that don't have a symbol (likely extra summary/footer)
     if "Symbol" in df.columns:
-        df = df[df["Symbol"].astype(str).str.strip() != ""]
+        with stage("load.decode_symbols"):
+            df = df[df["Symbol"].astype(str).str.strip() != ""]
+            df = add_symbol_columns(df)
+            df["Symbol"] = df["Symbol"].astype("category")
 
     return df, float(total_charges), float(other_credits_debits), start_date, end_date
 
 
-def infer_trade_date_from_symbol(symbol: str) -> Optional[pd.Timestamp]:
+def load_data_cached(
+    file_path,
+    cache: Optional[StatementCache] = None,
+    float_dtype: str = "float64",
+    engine: Optional[str] = None,
+) -> Tuple[pd.DataFrame, float, float, Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """
+    `load_data` backed by the content-addressed statement cache.
+
+    The cache key is a hash of the file content plus LOADER_VERSION (and the
+    float width), so an unchanged statement is served from disk without
+    touching the Excel reader. Pass `cache=None` to use the default cache
+    directory. Every reader engine yields the same frame, so `engine` is
+    not part of the key.
     """
-    Try to infer an approximate date from an F&O symbol such as:
-    ADANIENT25JUL2400PE
+    cache = cache or StatementCache()
+    key = content_key(file_path, f"{LOADER_VERSION}-{float_dtype}")
+    with stage("load.cache_lookup"):
+        parsed = cache.get(key)
+    if parsed is None:
+        parsed = load_data(file_path, float_dtype=float_dtype, engine=engine)
+        try:
+            cache.put(key, parsed)
+        except (OSError, ImportError, ValueError, TypeError, NotImplementedError):
+            # Caching is best effort; never fail the run because of it (pyarrow
+            # raises ArrowTypeError, a TypeError, for mixed-type object columns)
+            pass
+    return parsed
 
-    Heuristic:
-        - Look for patterns like 25JUL24 (day + month + 2-digit year)
-        - Fallback: None
+
+def infer_trade_date_from_symbol(symbol: str) -> Optional[pd.Timestamp]:
+    """
+    Infer the expiry date of an F&O symbol such as NIFTY25JUN18300CE
+    (see decode_symbols for the layouts understood); None if unknown.
     """
     if not isinstance(symbol, str):
         return None
+    expiry = decode_symbols(pd.Series([symbol]))["expiry"].iloc[0]
+    return None if pd.isna(expiry) else pd.Timestamp(expiry)
+
+
+SYMBOL_COLUMNS = ["underlying", "expiry", "strike", "option_type"]
+
+_MONTH_CODES = "JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC"
+_MONTH_NUMBERS = {m: i for i, m in enumerate(_MONTH_CODES.split("|"), start=1)}
+# Weekly contracts write the month as one character: 1-9 for Jan-Sep, O / N / D for Oct-Dec
+_WEEKLY_MONTH_NUMBERS = {**{str(i): i for i in range(1, 10)}, "O": 10, "N": 11, "D": 12}
+
+# Zerodha trading symbols, with a 2-digit year:
+#   monthly option  UNDERLYING + YY + MON + STRIKE + CE/PE   NIFTY25JUN18300CE
+#   weekly option   UNDERLYING + YY + M + DD + STRIKE + CE/PE  NIFTY2561918300CE
+#   future          UNDERLYING + YY + MON + FUT              NIFTY25JUNFUT
+_SYMBOL_MONTHLY_RE = rf"^(?P<underlying>.+?)(?P<year>\d{{2}})(?P<month>{_MONTH_CODES})(?:(?P<strike>\d+(?:\.\d+)?)(?:CE|PE)|FUT)$"
+_SYMBOL_WEEKLY_RE = r"^(?P<underlying>.+?)(?P<year>\d{2})(?P<month>[1-9OND])(?P<day>\d{2})(?P<strike>\d+(?:\.\d+)?)(?:CE|PE)$"
+
+# Monthly contracts (and futures) expire on the last Thursday of the month;
+# exchange holidays that move an expiry are not accounted for
+MONTHLY_EXPIRY_WEEKMASK = "Thu"
+
+
+def decode_symbols(symbols: pd.Series) -> pd.DataFrame:
+    """
+    Decode F&O symbols into typed underlying / expiry / strike / option_type columns.
+
+    Regex extraction runs once per unique symbol and the results are broadcast
+    back to every row, so statements with many fills of the same contract
+    stay cheap. The returned frame shares the index of `symbols`.
+    """
+    codes, uniques = pd.factorize(symbols.astype(object).fillna("").astype(str).str.upper().str.strip())
+    uniq = pd.Series(uniques, dtype=object)
+
+    monthly = uniq.str.extract(_SYMBOL_MONTHLY_RE)
+    weekly = uniq.str.extract(_SYMBOL_WEEKLY_RE)
+    is_weekly = monthly["year"].isna() & weekly["year"].notna()
+    parts = monthly.where(~is_weekly, weekly[monthly.columns])
+
+    # Symbols in neither layout: everything before the first digit (or before FUT)
+    underlying = parts["underlying"].fillna(uniq.str.extract(r"^(.*?)(?=\d)", expand=False))
+    underlying = underlying.fillna(uniq.str.replace(r"FUT$", "", regex=True)).replace("", np.nan)
+
+    month = np.where(is_weekly, parts["month"].map(_WEEKLY_MONTH_NUMBERS), parts["month"].map(_MONTH_NUMBERS))
+    year = 2000 + pd.to_numeric(parts["year"])
+    month_start = pd.to_datetime(pd.DataFrame({"year": year, "month": month, "day": 1}), errors="coerce")
+    month_end = (month_start + pd.offsets.MonthEnd(0)).to_numpy().astype("datetime64[D]")
+    last_thursday = np.busday_offset(month_end, 0, roll="backward", weekmask=MONTHLY_EXPIRY_WEEKMASK)
+    weekly_expiry = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": month, "day": pd.to_numeric(weekly["day"])}), errors="coerce"
+    )
+    expiry = np.where(is_weekly, weekly_expiry.to_numpy(), last_thursday.astype("datetime64[ns]"))
+
+    strike = pd.to_numeric(parts["strike"], errors="coerce")
+
+    option_type = np.select(
+        # A strike digit before CE / PE, so equities such as RELIANCE are not options
+        [uniq.str.contains(r"\dCE$"), uniq.str.contains(r"\dPE$"), uniq.str.endswith("FUT")],
+        ["CE", "PE", "FUT"],
+        default="OTHER",
+    )
+
+    decoded = pd.DataFrame(
+        {
+            "underlying": underlying.to_numpy()[codes],
+            "expiry": expiry[codes],
+            "strike": strike.to_numpy(dtype=float)[codes],
+            "option_type": option_type[codes],
+        },
+        index=symbols.index,
+    )
+    decoded["underlying"] = decoded["underlying"].astype("category")
+    decoded["option_type"] = decoded["option_type"].astype("category")
+    return decoded
+
+
+def add_symbol_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with the decoded SYMBOL_COLUMNS attached (no-op if already present)."""
+    if "Symbol" not in df.columns or all(c in df.columns for c in SYMBOL_COLUMNS):
+        return df
+    df = df.drop(columns=[c for c in SYMBOL_COLUMNS if c in df.columns])
+    return pd.concat([df, decode_symbols(df["Symbol"])], axis=1)
 
-    # Very simple heuristic: search for THREE-letter month codes and surrounding digits
-    months = {
-        "JAN": 1,
-        "FEB": 2,
-        "MAR": 3,
-        "APR": 4,
-        "MAY": 5,
-        "JUN": 6,
-        "JUL": 7,
-        "AUG": 8,
-        "SEP": 9,
-        "OCT": 10,
-        "NOV": 11,
-        "DEC": 12,
-    }
-    up = symbol.upper()
-    for m_str, m_num in months.items():
-        idx = up.find(m_str)
-        if idx > 1 and idx + len(m_str) + 2 <= len(up):
-            day_part = up[idx - 2 : idx]
-            year_part = up[idx + len(m_str) : idx + len(m_str) + 2]
-            if day_part.isdigit() and year_part.isdigit():
-                day = int(day_part)
-                year = 2000 + int(year_part)
-                try:
-                    return pd.Timestamp(year=year, month=m_num, day=day)
-                except Exception:
-                    continue
-    return None
+
+def _trade_dates(df: pd.DataFrame) -> pd.Series:
+    """Per-row trade date (the decoded symbol expiry); NaT where unknown."""
+    if "expiry" in df.columns:
+        return df["expiry"]
+    if "Symbol" in df.columns:
+        return decode_symbols(df["Symbol"])["expiry"]
+    return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
 
 
 def compute_drawdown(cum_pnl: pd.Series, initial_capital: float = 0.0) -> Optional[float]:
@@ -228,170 +507,656 @@ def compute_drawdown(cum_pnl: pd.Series, initial_capital: float = 0.0) -> Option
     return float(drawdown.min() * 100.0)
 
 
-def compute_metrics(
-    df: pd.DataFrame,
-    initial_capital: float,
-    risk_free_rate: float,
-    start_date: Optional[pd.Timestamp] = None,
-    end_date: Optional[pd.Timestamp] = None,
-) -> Metrics:
-    # Realized and unrealized subsets
-    realized_mask = df.get("Realized P&L", pd.Series([0.0] * len(df))) != 0
-    unrealized_mask = df.get("Open Quantity", pd.Series([0.0] * len(df))) != 0
+def _welford_merge(
+    a: Tuple[int, float, float], b: Tuple[int, float, float]
+) -> Tuple[int, float, float]:
+    """Combine (count, mean, M2) moments of two samples (Chan et al. parallel update)."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
 
-    df_realized = df[realized_mask].copy()
-    df_unrealized = df[unrealized_mask].copy()
 
-    total_realized_pnl = float(df_realized.get("Realized P&L", pd.Series(dtype=float)).sum())
-    total_unrealized_pnl = float(df_unrealized.get("Unrealized P&L", pd.Series(dtype=float)).sum())
+def _moments(values: np.ndarray) -> Tuple[int, float, float]:
+    if len(values) == 0:
+        return 0, 0.0, 0.0
+    mean = float(values.mean())
+    return len(values), mean, float(((values - mean) ** 2).sum())
 
-    # Charges and other credits are not in df; they are computed at load time and passed via df attrs.
-    total_charges = float(getattr(df, "_total_charges", 0.0))
-    other_credits_debits = float(getattr(df, "_other_credits_debits", 0.0))
 
-    net_pnl = total_realized_pnl + total_unrealized_pnl - total_charges + other_credits_debits
-    portfolio_value = initial_capital + net_pnl
+def _min_date(a: Optional[pd.Timestamp], b: Optional[pd.Timestamp]) -> Optional[pd.Timestamp]:
+    return b if a is None else a if b is None else min(a, b)
 
-    total_trades = len(df_realized)
-    winning_trades = int((df_realized["Realized P&L"] > 0).sum()) if total_trades else 0
-    losing_trades = int((df_realized["Realized P&L"] < 0).sum()) if total_trades else 0
-    breakeven_trades = int((df_realized["Realized P&L"] == 0).sum()) if total_trades else 0
 
-    if total_trades > 0:
-        win_rate = winning_trades / total_trades * 100.0
-    else:
-        win_rate = 0.0
+def _max_date(a: Optional[pd.Timestamp], b: Optional[pd.Timestamp]) -> Optional[pd.Timestamp]:
+    return b if a is None else a if b is None else max(a, b)
 
-    wins = df_realized[df_realized["Realized P&L"] > 0]["Realized P&L"]
-    losses = df_realized[df_realized["Realized P&L"] < 0]["Realized P&L"]
 
-    avg_win = float(wins.mean()) if not wins.empty else 0.0
-    avg_loss = float(losses.mean()) if not losses.empty else 0.0  # negative
-    avg_loss_abs = abs(avg_loss) if avg_loss != 0 else 0.0
-    win_loss_ratio = avg_win / avg_loss_abs if avg_loss_abs > 0 else 0.0
+def _frozen(values: np.ndarray) -> np.ndarray:
+    # Cached intermediates are shared by every consumer of the frame
+    values.flags.writeable = False
+    return values
+
+
+def _curve_segments(cum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Record-high segments of a cumulative curve: (each new running peak, lowest point before the next)."""
+    if len(cum) == 0:
+        return np.empty(0), np.empty(0)
+    prev_max = np.maximum.accumulate(cum)
+    # A new segment starts whenever the curve sets a new high
+    is_new_peak = np.empty(len(cum), dtype=bool)
+    is_new_peak[0] = True
+    is_new_peak[1:] = cum[1:] > prev_max[:-1]
+    starts = np.flatnonzero(is_new_peak)
+    return cum[starts], np.minimum.reduceat(cum, starts)
+
+
+def _as_value(value):
+    """A 0-d result as a float; arrays (capital / rate grids, see sweep.py) unchanged."""
+    return float(value) if np.ndim(value) == 0 else value
+
+
+def _as_optional(value):
+    """Like _as_value, with NaN as None for 0-d results."""
+    if np.ndim(value) == 0:
+        return None if np.isnan(value) else float(value)
+    return value
 
-    win_prob = winning_trades / total_trades if total_trades > 0 else 0.0
-    loss_prob = losing_trades / total_trades if total_trades > 0 else 0.0
-    expectancy = avg_win * win_prob + avg_loss * loss_prob
 
-    total_profit = float(wins.sum()) if not wins.empty else 0.0
-    total_loss_abs = float(-losses.sum()) if not losses.empty else 0.0
-    profit_factor = total_profit / total_loss_abs if total_loss_abs > 0 else np.nan
+def _positive_or_nan(values):
+    return np.where(np.asarray(values) > 0, values, np.nan)
 
-    # Approximate period
+
+def _segments_max_drawdown_pct(peaks: np.ndarray, troughs: np.ndarray, initial_capital: float) -> Optional[float]:
+    """
+    Max drawdown as % of portfolio value from record-high segments (see compute_drawdown).
+
+    initial_capital may be an array, giving one drawdown per capital.
+    """
+    capital = np.asarray(initial_capital, dtype=float)
+    if not len(peaks):
+        return None if capital.ndim == 0 else np.full(capital.shape, np.nan)
+    # Non-positive capital: avoid div by zero; drawdown will be relative to P&L scale
+    capital = np.where(capital > 0, capital, 1.0)
+    peak_value = capital[..., None] + peaks  # (..., segments)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(
+            peak_value > 0,
+            (troughs - peaks) / peak_value,
+            # Below zero the peak itself is the worst ratio in its segment
+            np.where(peak_value < 0, 0.0, np.nan),
+        )
+    undefined = np.isnan(drawdown).all(axis=-1)
+    worst = np.where(np.isnan(drawdown), np.inf, drawdown).min(axis=-1)
+    return _as_optional(np.where(undefined, np.nan, worst * 100.0))
+
+
+def _period_days(
+    start_date: Optional[pd.Timestamp],
+    end_date: Optional[pd.Timestamp],
+    first_trade_date: Optional[pd.Timestamp],
+    last_trade_date: Optional[pd.Timestamp],
+) -> int:
+    """Length of the analysed period in days (at least 1)."""
     if start_date is None:
         # Try infer from symbols
-        inferred_dates = df_realized["Symbol"].apply(infer_trade_date_from_symbol) if "Symbol" in df_realized.columns else pd.Series([], dtype="datetime64[ns]")
-        if not inferred_dates.dropna().empty:
-            start_date = inferred_dates.min()
-            end_date = inferred_dates.max()
+        if first_trade_date is not None:
+            start_date = first_trade_date
+            end_date = last_trade_date
         else:
             # Fallback: assume 1 year period
             start_date = pd.Timestamp.today() - pd.Timedelta(days=365)
             end_date = pd.Timestamp.today()
     if end_date is None:
         end_date = pd.Timestamp.today()
+    return max((end_date - start_date).days, 1)
 
-    days = max((end_date - start_date).days, 1)
-    years = days / 365.0
-
-    total_return_pct = (net_pnl / initial_capital) * 100.0 if initial_capital > 0 else 0.0
-
-    # Calculate Sharpe and Sortino ratios using trade-level returns
-    # This gives a more accurate measure than evenly distributed daily returns
-    if years > 0 and initial_capital > 0 and total_trades > 1:  # Need at least 2 trades for std dev
-        # Calculate returns per trade: P&L / initial capital
-        # This approximates return per trade assuming constant capital base
-        trade_returns = df_realized["Realized P&L"].values / initial_capital
-        
-        # Annualized return: total return / years
-        annualized_return = (total_realized_pnl / initial_capital) / years if years > 0 else 0.0
-        excess_annualized_return = annualized_return - risk_free_rate
-        
-        # Calculate volatility: std dev of trade returns
-        # To annualize, we need to scale by sqrt(trades per year)
-        # This accounts for the fact that more frequent trading increases volatility
-        trade_returns_std = trade_returns.std(ddof=1)  # Sample std dev
-        trades_per_year = total_trades / years if years > 0 else total_trades
-        
-        # Annualize volatility: std_dev * sqrt(trades_per_year)
-        # This assumes returns are independent and identically distributed
-        annualized_volatility = trade_returns_std * np.sqrt(trades_per_year) if trades_per_year > 0 else 0.0
-        
-        # Calculate downside deviation for Sortino (only negative returns)
-        negative_returns = trade_returns[trade_returns < 0]
-        if len(negative_returns) > 1:
-            downside_std = negative_returns.std(ddof=1)
-            # Annualize downside volatility
-            # Scale by sqrt of proportion of negative trades * trades per year
-            neg_trade_proportion = len(negative_returns) / total_trades
-            annualized_downside_volatility = downside_std * np.sqrt(trades_per_year * neg_trade_proportion) if trades_per_year > 0 else 0.0
-        else:
-            annualized_downside_volatility = 0.0
-        
-        # Sharpe Ratio = (Annualized Return - Risk-Free Rate) / Annualized Volatility
-        sharpe_ratio = float(excess_annualized_return / annualized_volatility) if annualized_volatility > 0 else np.nan
-        
-        # Sortino Ratio = (Annualized Return - Risk-Free Rate) / Annualized Downside Volatility
-        sortino_ratio = (
-            float(excess_annualized_return / annualized_downside_volatility)
-            if annualized_downside_volatility > 0
-            else np.nan
-        )
-    else:
-        sharpe_ratio = np.nan
-        sortino_ratio = np.nan
-
-    # Max drawdown based on cumulative realized P&L (as % of portfolio value)
-    if "Symbol" in df_realized.columns and not df_realized.empty:
-        df_realized = df_realized.copy()
-        df_realized["__date__"] = df_realized["Symbol"].apply(infer_trade_date_from_symbol)
-        if df_realized["__date__"].notna().any():
-            df_realized = df_realized.sort_values("__date__")
-        else:
-            df_realized = df_realized.reset_index(drop=True)
-        cum_pnl = df_realized["Realized P&L"].cumsum()
-        max_drawdown_pct = compute_drawdown(cum_pnl, initial_capital)
-    else:
-        max_drawdown_pct = None
 
-    # CAGR
-    if years > 0 and initial_capital > 0:
-        ending_value = initial_capital + total_realized_pnl
-        try:
-            cagr = (ending_value / initial_capital) ** (1 / years) - 1
-        except Exception:
-            cagr = np.nan
-    else:
-        cagr = np.nan
+# Intermediates that depend only on the trade table ("frame"). trade_data()
+# caches one graph per frame, so the realized filter, the date inference and
+# sort and the cumulative curve are shared by the metrics, charts, drawdown,
+# rolling and calendar sections.
+TRADE_DATA = Registry()
+
+
+@TRADE_DATA.node("realized_mask", ["frame"])
+def _realized_mask(df: pd.DataFrame) -> np.ndarray:
+    if "Realized P&L" not in df.columns:
+        return _frozen(np.zeros(len(df), dtype=bool))
+    return _frozen(df["Realized P&L"].to_numpy(dtype=float) != 0)
+
+
+@TRADE_DATA.node("realized_pnl", ["frame", "realized_mask"])
+def _realized_pnl(df: pd.DataFrame, mask: np.ndarray) -> np.ndarray:
+    """Realized trade P&L in row order."""
+    if not mask.any():
+        return _frozen(np.empty(0))
+    return _frozen(df["Realized P&L"].to_numpy(dtype=float)[mask])
+
+
+@TRADE_DATA.node("realized_dates", ["frame", "realized_mask"])
+def _realized_dates(df: pd.DataFrame, mask: np.ndarray) -> np.ndarray:
+    """Trade date of each realized trade in row order (NaT where unknown)."""
+    if not mask.any():
+        return _frozen(np.empty(0, dtype="datetime64[ns]"))
+    if "expiry" in df.columns:
+        return _frozen(df["expiry"].to_numpy(dtype="datetime64[ns]")[mask])
+    # Decode only the realized rows
+    return _frozen(_trade_dates(df[mask]).to_numpy(dtype="datetime64[ns]"))
+
+
+@TRADE_DATA.node("date_order", ["realized_dates"])
+def _date_order(dates: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Positions of the realized trades in trade-date order (undated last); None
+    keeps row order. The sort is stable: trades sharing a date (every trade of
+    an expiry) keep their row order, so the curve does not depend on ties.
+    """
+    if np.isnat(dates).all():
+        return None
+    return _frozen(pd.Series(dates).sort_values(kind="stable").index.to_numpy())
+
+
+@TRADE_DATA.node("sorted_pnl", ["realized_pnl", "date_order"])
+def _sorted_pnl(pnl: np.ndarray, order: Optional[np.ndarray]) -> np.ndarray:
+    return pnl if order is None else _frozen(pnl[order])
+
+
+@TRADE_DATA.node("sorted_dates", ["realized_dates", "date_order"])
+def _sorted_dates(dates: np.ndarray, order: Optional[np.ndarray]) -> np.ndarray:
+    return dates if order is None else _frozen(dates[order])
+
+
+@TRADE_DATA.node("cumulative_pnl", ["sorted_pnl"])
+def _cumulative_pnl(pnl: np.ndarray) -> np.ndarray:
+    return _frozen(np.cumsum(pnl))
+
+
+@TRADE_DATA.node("curve", ["cumulative_pnl"])
+def _curve(cum: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return tuple(_frozen(a) for a in _curve_segments(cum))
+
+
+@TRADE_DATA.node("wins", ["realized_pnl"])
+def _wins(pnl: np.ndarray) -> np.ndarray:
+    return _frozen(pnl[pnl > 0])
+
+
+@TRADE_DATA.node("losses", ["realized_pnl"])
+def _losses(pnl: np.ndarray) -> np.ndarray:
+    return _frozen(pnl[pnl < 0])
+
+
+TRADE_DATA.node("total_realized_pnl", ["realized_pnl"])(lambda pnl: float(pnl.sum()))
+TRADE_DATA.node("total_trades", ["realized_pnl"])(len)
+TRADE_DATA.node("winning_trades", ["wins"])(len)
+TRADE_DATA.node("losing_trades", ["losses"])(len)
+TRADE_DATA.node("breakeven_trades", ["realized_pnl"])(lambda pnl: int((pnl == 0).sum()))
+TRADE_DATA.node("total_profit", ["wins"])(lambda wins: float(wins.sum()))
+TRADE_DATA.node("total_loss", ["losses"])(lambda losses: float(losses.sum()))
+TRADE_DATA.node("pnl_moments", ["realized_pnl"])(_moments)
+TRADE_DATA.node("loss_moments", ["losses"])(_moments)
+
+
+@TRADE_DATA.node("total_unrealized_pnl", ["frame"])
+def _total_unrealized_pnl(df: pd.DataFrame) -> float:
+    if "Unrealized P&L" not in df.columns:
+        return 0.0
+    open_rows = df.get("Open Quantity", pd.Series(0.0, index=df.index)).to_numpy() != 0
+    return float(np.nansum(df["Unrealized P&L"].to_numpy(dtype=float)[open_rows]))
+
+
+@TRADE_DATA.node("trade_date_range", ["realized_dates"])
+def _trade_date_range(dates: np.ndarray) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    dated = dates[~np.isnat(dates)]
+    if not len(dated):
+        return None, None
+    return pd.Timestamp(dated.min()), pd.Timestamp(dated.max())
+
+
+TRADE_DATA.node("first_trade_date", ["trade_date_range"])(lambda dates: dates[0])
+TRADE_DATA.node("last_trade_date", ["trade_date_range"])(lambda dates: dates[1])
+
+
+def trade_data(df: pd.DataFrame) -> Graph:
+    """
+    The TRADE_DATA intermediates of a cleaned trade table, computed on first
+    use and cached on the frame (frames are not modified after loading).
+    """
+    data = getattr(df, "_trade_data", None)
+    if data is None:
+        data = Graph(TRADE_DATA, {"frame": df})
+        setattr(df, "_trade_data", data)
+    return data
+
+
+# The Metrics fields (and the intermediates they share) from the
+# TRADE_DATA statistics plus initial_capital, risk_free_rate, start_date,
+# end_date, total_charges and other_credits_debits. Evaluated on top of
+# trade_data() by compute_metric_values, or seeded with a MetricsState's
+# fields (and "curve") by MetricsState.metric_values.
+METRICS = Registry()
+
+METRIC_FIELDS = [f.name for f in fields(Metrics)]
+
+
+@METRICS.node("net_pnl", ["total_realized_pnl", "total_unrealized_pnl", "total_charges", "other_credits_debits"])
+def _net_pnl(realized: float, unrealized: float, charges: float, other_credits_debits: float) -> float:
+    return realized + unrealized - charges + other_credits_debits
+
+
+METRICS.node("portfolio_value", ["initial_capital", "net_pnl"])(lambda capital, net_pnl: capital + net_pnl)
+
+
+@METRICS.node("win_rate", ["winning_trades", "total_trades"])
+def _win_rate(winning_trades: int, total_trades: int) -> float:
+    return winning_trades / total_trades * 100.0 if total_trades > 0 else 0.0
+
 
+@METRICS.node("avg_win", ["total_profit", "winning_trades"])
+def _avg_win(total_profit: float, winning_trades: int) -> float:
+    return total_profit / winning_trades if winning_trades else 0.0
+
+
+@METRICS.node("avg_loss", ["total_loss", "losing_trades"])
+def _avg_loss(total_loss: float, losing_trades: int) -> float:
+    return total_loss / losing_trades if losing_trades else 0.0  # negative
+
+
+@METRICS.node("win_loss_ratio", ["avg_win", "avg_loss"])
+def _win_loss_ratio(avg_win: float, avg_loss: float) -> float:
+    avg_loss_abs = abs(avg_loss) if avg_loss != 0 else 0.0
+    return avg_win / avg_loss_abs if avg_loss_abs > 0 else 0.0
+
+
+@METRICS.node("expectancy", ["avg_win", "avg_loss", "winning_trades", "losing_trades", "total_trades"])
+def _expectancy(avg_win: float, avg_loss: float, winning_trades: int, losing_trades: int, total_trades: int) -> float:
+    win_prob = winning_trades / total_trades if total_trades > 0 else 0.0
+    loss_prob = losing_trades / total_trades if total_trades > 0 else 0.0
+    return avg_win * win_prob + avg_loss * loss_prob
+
+
+@METRICS.node("profit_factor", ["total_profit", "total_loss"])
+def _profit_factor(total_profit: float, total_loss: float) -> float:
+    total_loss_abs = -total_loss
+    return total_profit / total_loss_abs if total_loss_abs > 0 else np.nan
+
+
+METRICS.node("period_days", ["start_date", "end_date", "first_trade_date", "last_trade_date"])(_period_days)
+METRICS.node("years", ["period_days"])(lambda days: days / 365.0)
+
+
+@METRICS.node("total_return_pct", ["net_pnl", "initial_capital"])
+def _total_return_pct(net_pnl: float, initial_capital: float) -> float:
+    return _as_value(np.where(np.asarray(initial_capital) > 0, net_pnl / _positive_or_nan(initial_capital) * 100.0, 0.0))
+
+
+# Sharpe and Sortino use trade-level returns, P&L / initial capital (constant
+# capital base), so their moments are the P&L moments scaled by 1 / capital.
+# This gives a more accurate measure than evenly distributed daily returns.
+#
+# The nodes that depend on initial_capital or risk_free_rate also accept
+# arrays of them (broadcast against each other), which sweep.py uses to
+# evaluate a whole capital x rate grid in one pass.
+
+
+@METRICS.node("trade_returns_defined", ["years", "initial_capital", "total_trades"])
+def _trade_returns_defined(years: float, initial_capital: float, total_trades: int) -> bool:
+    return (years > 0) & (np.asarray(initial_capital) > 0) & (total_trades > 1)  # Need at least 2 trades for std dev
+
+
+@METRICS.node("trades_per_year", ["total_trades", "years"])
+def _trades_per_year(total_trades: int, years: float) -> float:
+    return total_trades / years if years > 0 else total_trades
+
+
+@METRICS.node(
+    "annualized_excess_return",
+    ["trade_returns_defined", "total_realized_pnl", "initial_capital", "years", "risk_free_rate"],
+)
+def _annualized_excess_return(defined: bool, realized: float, initial_capital: float, years: float, risk_free_rate: float) -> float:
+    if not np.any(defined):
+        return np.nan
+    # Annualized return: total return / years
+    excess = (realized / _positive_or_nan(initial_capital)) / years - np.asarray(risk_free_rate, dtype=float)
+    return _as_value(np.where(defined, excess, np.nan))
+
+
+@METRICS.node("annualized_volatility", ["trade_returns_defined", "pnl_moments", "initial_capital", "trades_per_year"])
+def _annualized_volatility(defined: bool, moments: Tuple[int, float, float], initial_capital: float, trades_per_year: float) -> float:
+    if not np.any(defined):
+        return np.nan
+    # Std dev of trade returns, scaled by sqrt(trades per year): more frequent
+    # trading increases volatility (assumes i.i.d. returns)
+    n, _, m2 = moments
+    trade_returns_std = np.sqrt(m2 / (n - 1)) / _positive_or_nan(initial_capital)  # Sample std dev
+    volatility = trade_returns_std * np.sqrt(trades_per_year) if trades_per_year > 0 else 0.0
+    return _as_value(np.where(defined, volatility, np.nan))
+
+
+@METRICS.node(
+    "annualized_downside_volatility",
+    ["trade_returns_defined", "loss_moments", "initial_capital", "trades_per_year", "total_trades"],
+)
+def _annualized_downside_volatility(
+    defined: bool, moments: Tuple[int, float, float], initial_capital: float, trades_per_year: float, total_trades: int
+) -> float:
+    if not np.any(defined):
+        return np.nan
+    n_neg, _, m2_neg = moments
+    if n_neg <= 1:
+        return _as_value(np.where(defined, 0.0, np.nan))
+    downside_std = np.sqrt(m2_neg / (n_neg - 1)) / _positive_or_nan(initial_capital)
+    # Scale by sqrt of proportion of negative trades * trades per year
+    neg_trade_proportion = n_neg / total_trades
+    volatility = downside_std * np.sqrt(trades_per_year * neg_trade_proportion) if trades_per_year > 0 else 0.0
+    return _as_value(np.where(defined, volatility, np.nan))
+
+
+def _risk_ratio(excess_return: float, volatility: float) -> Optional[float]:
+    defined = ~np.isnan(excess_return) & (np.asarray(volatility) > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _as_optional(np.where(defined, excess_return / np.where(defined, volatility, 1.0), np.nan))
+
+
+# Sharpe Ratio = (Annualized Return - Risk-Free Rate) / Annualized Volatility
+METRICS.node("sharpe_ratio", ["annualized_excess_return", "annualized_volatility"])(_risk_ratio)
+# Sortino Ratio = (Annualized Return - Risk-Free Rate) / Annualized Downside Volatility
+METRICS.node("sortino_ratio", ["annualized_excess_return", "annualized_downside_volatility"])(_risk_ratio)
+
+
+@METRICS.node("max_drawdown_pct", ["curve", "initial_capital"])
+def _max_drawdown_pct(curve: Tuple[np.ndarray, np.ndarray], initial_capital: float) -> Optional[float]:
+    # Based on cumulative realized P&L (as % of portfolio value)
+    return _segments_max_drawdown_pct(curve[0], curve[1], initial_capital)
+
+
+@METRICS.node("cagr", ["years", "initial_capital", "total_realized_pnl"])
+def _cagr(years: float, initial_capital: float, realized: float) -> Optional[float]:
+    if not years > 0:
+        return None if np.ndim(initial_capital) == 0 else np.full(np.shape(initial_capital), np.nan)
+    capital = _positive_or_nan(initial_capital)
+    # A negative ending value has no real CAGR, and a very short period can overflow (both NaN)
+    with np.errstate(invalid="ignore", over="ignore"):
+        cagr = ((capital + realized) / capital) ** (1 / years) - 1
+    return _as_optional(np.where(np.isfinite(cagr), cagr, np.nan))
+
+
+@METRICS.node("avg_trade_duration_days", ["period_days", "total_trades"])
+def _avg_trade_duration_days(days: int, total_trades: int) -> float:
     # Approximate average trade duration (all trades spread over the full period)
-    avg_trade_duration_days = days / max(total_trades, 1)
-
-    return Metrics(
-        total_realized_pnl=total_realized_pnl,
-        total_unrealized_pnl=total_unrealized_pnl,
-        total_charges=total_charges,
-        other_credits_debits=other_credits_debits,
-        net_pnl=net_pnl,
-        portfolio_value=portfolio_value,
-        total_trades=total_trades,
-        winning_trades=winning_trades,
-        losing_trades=losing_trades,
-        breakeven_trades=breakeven_trades,
-        win_rate=win_rate,
-        avg_win=avg_win,
-        avg_loss=avg_loss,
-        win_loss_ratio=win_loss_ratio,
-        expectancy=expectancy,
-        profit_factor=profit_factor,
-        total_return_pct=total_return_pct,
-        sharpe_ratio=None if np.isnan(sharpe_ratio) else float(sharpe_ratio),
-        sortino_ratio=None if np.isnan(sortino_ratio) else float(sortino_ratio),
-        max_drawdown_pct=max_drawdown_pct,
-        cagr=None if np.isnan(cagr) else float(cagr),
-        avg_trade_duration_days=float(avg_trade_duration_days),
-    )
+    return float(days / max(total_trades, 1))
+
+
+@dataclass
+class MetricsState:
+    """
+    Mergeable sufficient statistics for `Metrics`.
+
+    Build one per chunk of trades with `from_frame`, combine with `merge`, and
+    call `finalize` for the Metrics. Everything except the drawdown and the
+    unrealized P&L is order independent. The cumulative P&L curve is kept as
+    its record-high segments (each new running peak and the lowest point
+    reached before the next one), which is enough to recover the exact max
+    drawdown for any capital. The unrealized P&L is a snapshot of the
+    positions still open at the end of a statement, so a merge keeps the
+    later one rather than adding them up. When merging, `other` is taken to
+    follow `self` in time, so chunks must be merged in chronological order
+    (e.g. statement by statement).
+    """
+
+    total_realized_pnl: float = 0.0
+    total_unrealized_pnl: float = 0.0
+    total_charges: float = 0.0
+    other_credits_debits: float = 0.0
+
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    breakeven_trades: int = 0
+    total_profit: float = 0.0
+    total_loss: float = 0.0  # negative
+
+    # Welford moments (count, mean, M2) of per-trade P&L and of the losing trades
+    pnl_moments: Tuple[int, float, float] = (0, 0.0, 0.0)
+    loss_moments: Tuple[int, float, float] = (0, 0.0, 0.0)
+
+    # Cumulative realized P&L curve: end value and record-high segments
+    curve_end: float = 0.0
+    curve_peaks: np.ndarray = field(default_factory=lambda: np.empty(0))
+    curve_troughs: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    start_date: Optional[pd.Timestamp] = None
+    end_date: Optional[pd.Timestamp] = None
+    first_trade_date: Optional[pd.Timestamp] = None
+    last_trade_date: Optional[pd.Timestamp] = None
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        total_charges: Optional[float] = None,
+        other_credits_debits: Optional[float] = None,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> "MetricsState":
+        """
+        Summarize a cleaned trade table (or a chunk of one).
+
+        Charges and other credits default to the values attached to df by main().
+        The statistics come from trade_data(df), so they are shared with the
+        charts and sections built from the same frame.
+        """
+        if total_charges is None:
+            total_charges = float(getattr(df, "_total_charges", 0.0))
+        if other_credits_debits is None:
+            other_credits_debits = float(getattr(df, "_other_credits_debits", 0.0))
+
+        data = trade_data(df)
+        cum = data["cumulative_pnl"]
+        peaks, troughs = data["curve"]
+        return cls(
+            total_realized_pnl=data["total_realized_pnl"],
+            total_unrealized_pnl=data["total_unrealized_pnl"],
+            total_charges=float(total_charges),
+            other_credits_debits=float(other_credits_debits),
+            total_trades=data["total_trades"],
+            winning_trades=data["winning_trades"],
+            losing_trades=data["losing_trades"],
+            breakeven_trades=data["breakeven_trades"],
+            total_profit=data["total_profit"],
+            total_loss=data["total_loss"],
+            pnl_moments=data["pnl_moments"],
+            loss_moments=data["loss_moments"],
+            curve_end=float(cum[-1]) if len(cum) else 0.0,
+            curve_peaks=peaks,
+            curve_troughs=troughs,
+            start_date=start_date,
+            end_date=end_date,
+            first_trade_date=data["first_trade_date"],
+            last_trade_date=data["last_trade_date"],
+        )
+
+    def _append_segments(self, peaks: np.ndarray, troughs: np.ndarray) -> None:
+        if len(self.curve_peaks):
+            # Segments that don't beat the current peak extend the last segment
+            last_peak = self.curve_peaks[-1]
+            folded = np.searchsorted(peaks, last_peak, side="right")
+            if folded:
+                self.curve_troughs = self.curve_troughs.copy()
+                self.curve_troughs[-1] = min(self.curve_troughs[-1], troughs[:folded].min())
+            peaks, troughs = peaks[folded:], troughs[folded:]
+        self.curve_peaks = np.concatenate([self.curve_peaks, peaks])
+        self.curve_troughs = np.concatenate([self.curve_troughs, troughs])
+
+    def merge(self, other: "MetricsState") -> "MetricsState":
+        """Return the state of self's trades followed by other's trades."""
+        merged = MetricsState(
+            total_realized_pnl=self.total_realized_pnl + other.total_realized_pnl,
+            # Open positions are marked at the end of each statement, so the later mark supersedes
+            total_unrealized_pnl=other.total_unrealized_pnl,
+            total_charges=self.total_charges + other.total_charges,
+            other_credits_debits=self.other_credits_debits + other.other_credits_debits,
+            total_trades=self.total_trades + other.total_trades,
+            winning_trades=self.winning_trades + other.winning_trades,
+            losing_trades=self.losing_trades + other.losing_trades,
+            breakeven_trades=self.breakeven_trades + other.breakeven_trades,
+            total_profit=self.total_profit + other.total_profit,
+            total_loss=self.total_loss + other.total_loss,
+            pnl_moments=_welford_merge(self.pnl_moments, other.pnl_moments),
+            loss_moments=_welford_merge(self.loss_moments, other.loss_moments),
+            curve_end=self.curve_end,
+            curve_peaks=self.curve_peaks,
+            curve_troughs=self.curve_troughs,
+            start_date=_min_date(self.start_date, other.start_date),
+            end_date=_max_date(self.end_date, other.end_date),
+            first_trade_date=_min_date(self.first_trade_date, other.first_trade_date),
+            last_trade_date=_max_date(self.last_trade_date, other.last_trade_date),
+        )
+        if len(other.curve_peaks):
+            merged._append_segments(other.curve_peaks + self.curve_end, other.curve_troughs + self.curve_end)
+            merged.curve_end = self.curve_end + other.curve_end
+        return merged
+
+    def max_drawdown_pct(self, initial_capital: float) -> Optional[float]:
+        """Max drawdown of the cumulative curve as % of portfolio value (see compute_drawdown)."""
+        return _segments_max_drawdown_pct(self.curve_peaks, self.curve_troughs, initial_capital)
+
+    def period_days(self) -> int:
+        """Length of the analysed period in days (at least 1)."""
+        return _period_days(self.start_date, self.end_date, self.first_trade_date, self.last_trade_date)
+
+    def metric_graph(self, initial_capital: float, risk_free_rate: float) -> Graph:
+        """The METRICS graph seeded with this state's statistics."""
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        values.update(
+            curve=(self.curve_peaks, self.curve_troughs),
+            initial_capital=initial_capital,
+            risk_free_rate=risk_free_rate,
+        )
+        return Graph(METRICS, values)
+
+    def metric_values(self, names: List[str], initial_capital: float, risk_free_rate: float) -> Dict[str, object]:
+        """name -> value of the requested METRICS nodes (e.g. Metrics fields), computing only what they need."""
+        return self.metric_graph(initial_capital, risk_free_rate).get(names)
+
+    def finalize(self, initial_capital: float, risk_free_rate: float) -> Metrics:
+        return Metrics(**self.metric_values(METRIC_FIELDS, initial_capital, risk_free_rate))
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form, so a state can be stored and updated later."""
+        data = asdict(self)
+        data["curve_peaks"] = self.curve_peaks.tolist()
+        data["curve_troughs"] = self.curve_troughs.tolist()
+        for key in ("start_date", "end_date", "first_trade_date", "last_trade_date"):
+            data[key] = None if data[key] is None else data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MetricsState":
+        data = dict(data)
+        data["pnl_moments"] = tuple(data["pnl_moments"])
+        data["loss_moments"] = tuple(data["loss_moments"])
+        data["curve_peaks"] = np.asarray(data["curve_peaks"], dtype=float)
+        data["curve_troughs"] = np.asarray(data["curve_troughs"], dtype=float)
+        for key in ("start_date", "end_date", "first_trade_date", "last_trade_date"):
+            data[key] = None if data[key] is None else pd.Timestamp(data[key])
+        return cls(**data)
+
+
+def update_state_file(path: str, state: MetricsState, statement_key: str) -> MetricsState:
+    """
+    Merge `state` into the MetricsState stored at `path` and save the result.
+
+    Statements already merged (by content key) are not counted twice. The
+    new statement is taken to follow the stored history in time.
+    """
+    stored = None
+    merged_keys: List[str] = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        stored = MetricsState.from_dict(saved["state"])
+        merged_keys = saved.get("statements", [])
+
+    if statement_key in merged_keys:
+        return stored
+    combined = state if stored is None else stored.merge(state)
+    merged_keys.append(statement_key)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"statements": merged_keys, "state": combined.to_dict()}, f)
+    os.replace(tmp_path, path)
+    return combined
+
+
+def metric_graph(
+    df: pd.DataFrame,
+    initial_capital: float,
+    risk_free_rate: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> Graph:
+    """
+    METRICS for one capital / risk-free rate on top of trade_data(df), so
+    the per-dataset intermediates are computed once across calls.
+    """
+    # Charges and other credits are not in df; they are computed at load time and passed via df attrs.
+    values = {
+        "initial_capital": initial_capital,
+        "risk_free_rate": risk_free_rate,
+        "start_date": start_date,
+        "end_date": end_date,
+        "total_charges": float(getattr(df, "_total_charges", 0.0)),
+        "other_credits_debits": float(getattr(df, "_other_credits_debits", 0.0)),
+    }
+    return Graph(METRICS, values, fallback=trade_data(df))
+
+
+def compute_metric_values(
+    df: pd.DataFrame,
+    names: List[str],
+    initial_capital: float,
+    risk_free_rate: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> Dict[str, object]:
+    """
+    name -> value for a subset of the metrics, e.g. ["net_pnl", "win_rate"].
+
+    Only the intermediates the requested metrics depend on are computed:
+    net P&L and win rate need neither trade dates nor the sorted curve.
+    """
+    return metric_graph(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date).get(names)
+
+
+def compute_metrics(
+    df: pd.DataFrame,
+    initial_capital: float,
+    risk_free_rate: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> Metrics:
+    values = compute_metric_values(df, METRIC_FIELDS, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+    return Metrics(**values)
+
+
+def metrics_to_dict(metrics: Union[Metrics, Dict[str, object]]) -> Dict[str, Optional[float]]:
+    """Metrics (or a name -> value dict of some of them) as a JSON-safe dict (NaN and infinities become None)."""
+    values = {}
+    for name, value in (metrics.items() if isinstance(metrics, dict) else asdict(metrics).items()):
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            value = None
+        values[name] = value
+    return values
 
 
 def _ensure_plots_dir(base_dir: str) -> str:
@@ -400,88 +1165,170 @@ def _ensure_plots_dir(base_dir: str) -> str:
     return plots_dir
 
 
-def _extract_option_type(symbol: str) -> str:
-    s = str(symbol).upper()
-    if s.endswith("CE"):
-        return "CE"
-    if s.endswith("PE"):
-        return "PE"
-    if "FUT" in s:
-        return "FUT"
-    return "OTHER"
+def realized_trades(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Realized trade P&L and trade dates in trade-date order (undated trades
+    last, with NaT dates). Read-only arrays shared through trade_data(df).
+    """
+    data = trade_data(df)
+    return data["sorted_pnl"], data["sorted_dates"]
 
 
-def generate_plots(df: pd.DataFrame, metrics: Metrics, output_dir: str) -> Dict[str, str]:
+def realized_pnl_series(df: pd.DataFrame) -> np.ndarray:
     """
-    Generate plots and save them to output_dir.
+    Realized trade P&L in trade-date order (undated trades last), as used for
+    the cumulative curve and drawdown.
+    """
+    return realized_trades(df)[0]
+
 
-    Returns a dict mapping plot name -> relative path.
+def compute_rolling(
+    df: pd.DataFrame,
+    metrics: Metrics,
+    initial_capital: float,
+    risk_free_rate: float,
+    window: int = DEFAULT_ROLLING_TRADES,
+    days: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Rolling win rate, expectancy, Sharpe and drawdown over the last `window`
+    trades (or the last `days` calendar days); see rolling.rolling_metrics.
     """
-    sns.set(style="whitegrid")
-    paths: Dict[str, str] = {}
+    pnl, dates = realized_trades(df)
+    # Same trade frequency as the full-period Sharpe (period / trades)
+    trades_per_year = 365.0 / metrics.avg_trade_duration_days if metrics.avg_trade_duration_days > 0 else 0.0
+    return rolling_metrics(pnl, initial_capital, risk_free_rate, trades_per_year, window=window, days=days, dates=dates)
 
+
+def compute_calendar_returns(
+    df: pd.DataFrame,
+    initial_capital: float,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+) -> CalendarReturns:
+    """Daily / weekly / monthly returns of the realized trades; see calendar_returns.calendar_returns."""
+    pnl, dates = realized_trades(df)
+    return calendar_returns(pnl, dates, initial_capital, start_date=start_date, end_date=end_date)
+
+
+def chart_payloads(
+    df: pd.DataFrame,
+    metrics: Metrics,
+    rolling: Optional[pd.DataFrame] = None,
+    rolling_days: Optional[int] = None,
+    underwater: Optional[np.ndarray] = None,
+    monthly_returns: Optional[pd.Series] = None,
+) -> Dict[str, ChartPayload]:
+    """
+    Prepare the (small) input data behind each chart.
+
+    Long cumulative curves are decimated and the histogram / KDE are binned
+    here, so rendering only has to draw and payloads are cheap to hash or
+    ship to worker processes. A `rolling` table (from compute_rolling) adds
+    the rolling metrics chart, an `underwater` curve (from
+    drawdown.analyze_drawdowns) the underwater chart and `monthly_returns`
+    (CalendarReturns.returns("monthly")) the monthly returns heatmap.
+    """
+    payloads: Dict[str, ChartPayload] = {}
     if df.empty:
-        return paths
+        return payloads
 
     # Cumulative P&L curve (realized)
-    realized_mask = df.get("Realized P&L", pd.Series([0.0] * len(df))) != 0
-    df_realized = df[realized_mask].copy()
-    if not df_realized.empty:
-        df_realized["__date__"] = df_realized["Symbol"].apply(infer_trade_date_from_symbol)
-        if df_realized["__date__"].notna().any():
-            df_realized = df_realized.sort_values("__date__")
-        else:
-            df_realized = df_realized.reset_index(drop=True)
-
-        df_realized["cum_pnl"] = df_realized["Realized P&L"].cumsum()
-        plt.figure(figsize=(10, 5))
-        plt.plot(df_realized["cum_pnl"], marker="o")
-        plt.title("Cumulative Realized P&L")
-        plt.xlabel("Trade Index")
-        plt.ylabel("Cumulative P&L")
-        cum_path = os.path.join(output_dir, "cumulative_pnl.png")
-        plt.tight_layout()
-        plt.savefig(cum_path)
-        plt.close()
-        paths["cumulative_pnl"] = cum_path
+    data = trade_data(df)
+    pnl = data["sorted_pnl"]
+    if len(pnl):
+        payloads["cumulative_pnl"] = cumulative_payload(data["cumulative_pnl"])
 
     # Pie chart of wins vs losses
     if metrics.total_trades > 0:
-        labels = ["Winning", "Losing", "Breakeven"]
-        sizes = [metrics.winning_trades, metrics.losing_trades, metrics.breakeven_trades]
-        plt.figure(figsize=(6, 6))
-        plt.pie(
-            sizes,
-            labels=labels,
-            autopct="%1.1f%%",
-            startangle=90,
-        )
-        plt.title("Win / Loss / Breakeven Distribution")
-        pie_path = os.path.join(output_dir, "wins_losses_pie.png")
-        plt.tight_layout()
-        plt.savefig(pie_path)
-        plt.close()
-        paths["wins_losses_pie"] = pie_path
+        payloads["wins_losses_pie"] = pie_payload(metrics.winning_trades, metrics.losing_trades, metrics.breakeven_trades)
 
     # Histogram of trade P&L
-    if "Realized P&L" in df.columns and not df_realized.empty:
-        plt.figure(figsize=(10, 5))
-        sns.histplot(df_realized["Realized P&L"], bins=30, kde=True)
-        plt.title("Distribution of Realized Trade P&L")
-        plt.xlabel("Realized P&L per Trade")
-        plt.ylabel("Count")
-        hist_path = os.path.join(output_dir, "pnl_histogram.png")
-        plt.tight_layout()
-        plt.savefig(hist_path)
-        plt.close()
-        paths["pnl_histogram"] = hist_path
+    if "Realized P&L" in df.columns and len(pnl):
+        payloads["pnl_histogram"] = histogram_payload(pnl)
+
+    if rolling is not None and rolling[ROLLING_METRICS].notna().any().any():
+        payloads["rolling_metrics"] = rolling_payload(
+            rolling["trade"].to_numpy(),
+            rolling["win_rate"].to_numpy(),
+            rolling["sharpe_ratio"].to_numpy(),
+            rolling["drawdown_pct"].to_numpy(),
+            window=int(rolling["trades_in_window"].max()) if rolling_days is None else None,
+            days=rolling_days,
+        )
 
-    return paths
+    if underwater is not None and len(underwater):
+        payloads["underwater"] = underwater_payload(underwater)
 
+    if monthly_returns is not None and monthly_returns.notna().any():
+        payloads["monthly_returns"] = monthly_heatmap_payload(*monthly_grid(monthly_returns))
 
-def generate_report(metrics: Metrics, df: pd.DataFrame, plots: Dict[str, str], output_path: str) -> None:
+    return payloads
+
+
+def generate_plots(
+    df: pd.DataFrame,
+    metrics: Metrics,
+    output_dir: str,
+    workers: Optional[int] = None,
+    force: bool = False,
+    rolling: Optional[pd.DataFrame] = None,
+    rolling_days: Optional[int] = None,
+    underwater: Optional[np.ndarray] = None,
+    monthly_returns: Optional[pd.Series] = None,
+) -> Dict[str, str]:
     """
-    Generate a Markdown report summarizing performance and save it to output_path.
+    Generate plots and save them to output_dir.
+
+    Charts whose input data hasn't changed since the last run are not
+    re-rendered (unless force=True); workers > 1 renders them in parallel.
+    Pass a compute_rolling table as `rolling`, an underwater curve as
+    `underwater` or monthly returns as `monthly_returns` to include those
+    charts. Returns a dict mapping plot name -> relative path.
+    """
+    with stage("plots.prepare"):
+        payloads = chart_payloads(
+            df, metrics, rolling=rolling, rolling_days=rolling_days, underwater=underwater, monthly_returns=monthly_returns
+        )
+    return write_charts(payloads, output_dir, workers=workers, force=force)
+
+
+def render_plots(
+    df: pd.DataFrame,
+    metrics: Metrics,
+    fmt: str = "png",
+    workers: Optional[int] = None,
+    rolling: Optional[pd.DataFrame] = None,
+    rolling_days: Optional[int] = None,
+    underwater: Optional[np.ndarray] = None,
+    monthly_returns: Optional[pd.Series] = None,
+) -> Dict[str, bytes]:
+    """
+    Render the same plots as generate_plots into memory.
+
+    Returns a dict mapping plot name -> encoded image bytes; nothing touches disk.
+    """
+    payloads = chart_payloads(
+        df, metrics, rolling=rolling, rolling_days=rolling_days, underwater=underwater, monthly_returns=monthly_returns
+    )
+    return render_charts(payloads, fmt=fmt, workers=workers)
+
+
+def render_report(
+    metrics: Metrics,
+    df: pd.DataFrame,
+    plots: Dict[str, str],
+    report_dir: Optional[str] = None,
+    sections: Optional[List[str]] = None,
+    visuals: bool = True,
+) -> str:
+    """
+    Render the Markdown report as a string.
+
+    Plot paths are shown relative to report_dir when given, as-is otherwise.
+    `sections` are extra Markdown blocks inserted before the visuals;
+    visuals=False leaves out the Visuals section (the HTML report embeds
+    the charts itself).
     """
     lines = []
 
@@ -519,24 +1366,92 @@ def generate_report(metrics: Metrics, df: pd.DataFrame, plots: Dict[str, str], o
     lines.append(f"| Avg Trade Duration (days) | {metrics.avg_trade_duration_days:.2f} | Approx. period / total trades |")
     lines.append("")
 
+    for section in sections or []:
+        lines.append(section)
+
+    if not visuals:
+        return "\n".join(lines)
+
     # Visuals section
     lines.append("## Visuals")
     lines.append("")
     if plots:
         for name, path in plots.items():
-            rel = os.path.relpath(path, os.path.dirname(output_path))
+            rel = os.path.relpath(path, report_dir) if report_dir is not None else path
             lines.append(f"- **{name.replace('_', ' ').title()}**: `{rel}`")
     else:
         lines.append("- No plots generated (no sufficient data).")
     lines.append("")
 
+    return "\n".join(lines)
+
+
+def generate_report(
+    metrics: Metrics,
+    df: pd.DataFrame,
+    plots: Dict[str, str],
+    output_path: str,
+    sections: Optional[List[str]] = None,
+) -> None:
+    """
+    Generate a Markdown report summarizing performance and save it to output_path.
+    """
+    report = render_report(metrics, df, plots, report_dir=os.path.dirname(output_path), sections=sections)
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        f.write(report)
+
+
+def render_html_report(
+    metrics: Metrics,
+    df: pd.DataFrame,
+    images: Dict[str, bytes],
+    sections: Optional[List[str]] = None,
+    fmt: str = DEFAULT_HTML_CHART_FORMAT,
+) -> bytes:
+    """
+    Render the report as one self-contained HTML document.
+
+    `images` are charts rendered in memory (render_plots with the same
+    `fmt`) and are embedded inline, so the document references no files.
+    """
+    markdown = render_report(metrics, df, {}, sections=sections, visuals=False)
+    return render_html(markdown, images, fmt=fmt)
+
+
+def generate_html_report(
+    metrics: Metrics,
+    df: pd.DataFrame,
+    output: Union[str, BinaryIO],
+    sections: Optional[List[str]] = None,
+    fmt: str = DEFAULT_HTML_CHART_FORMAT,
+    workers: Optional[int] = None,
+    rolling: Optional[pd.DataFrame] = None,
+    rolling_days: Optional[int] = None,
+    underwater: Optional[np.ndarray] = None,
+    monthly_returns: Optional[pd.Series] = None,
+) -> None:
+    """
+    Render charts and report in memory and write the HTML document to
+    `output`: a binary stream, or a path that is replaced atomically.
+    """
+    with stage("plots"):
+        images = render_plots(
+            df,
+            metrics,
+            fmt=fmt,
+            workers=workers,
+            rolling=rolling,
+            rolling_days=rolling_days,
+            underwater=underwater,
+            monthly_returns=monthly_returns,
+        )
+    with stage("report"):
+        write_html(render_html_report(metrics, df, images, sections=sections, fmt=fmt), output)
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Analyze Zerodha F&O P&L Excel file.")
-    parser.add_argument("--file", "-f", required=True, help="Path to Zerodha P&L Excel file (e.g., zerodha_pnl.xlsx).")
+    parser.add_argument("--file", "-f", help="Path to Zerodha P&L Excel file (e.g., zerodha_pnl.xlsx).")
     parser.add_argument(
         "--capital",
         "-c",
@@ -557,31 +1472,552 @@ def parse_args() -> argparse.Namespace:
         default="report.md",
         help="Output Markdown report path (default: report.md).",
     )
-    return parser.parse_args()
-
-
-def main():
-    args = parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the Excel file; do not read or write the statement cache.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove all cached statements before running (may be used without --file).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Statement cache directory (default: {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Maximum statement cache size in MB; least recently used entries are evicted (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--batch",
+        "-b",
+        help="Directory or glob of statements to analyze in parallel (e.g., 'exports/**/*.xlsx'). Replaces --file.",
+    )
+    parser.add_argument(
+        "--batch-output",
+        default="reports",
+        help="Directory for per-account and consolidated reports in batch mode (default: reports).",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Worker processes for batch mode (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Watch a directory: keep the batch reports (and --feed) up to date as statements are "
+        "added, changed or removed. Replaces --file.",
+    )
+    parser.add_argument(
+        "--watch-debounce",
+        type=float,
+        default=2.0,
+        help="Seconds a changed statement must stay unchanged before it is processed (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--watch-poll",
+        type=float,
+        default=1.0,
+        help="Poll interval in seconds when inotify is not used (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help="Poll instead of using inotify (needed on network shares written from other hosts).",
+    )
+    parser.add_argument(
+        "--sweep-capital",
+        help="Sweep mode: grid of initial capital values, 'start:stop:num' or comma-separated "
+        "(default: --capital). Writes a metrics table and heatmaps instead of the report.",
+    )
+    parser.add_argument(
+        "--sweep-rfr",
+        help="Sweep mode: grid of risk-free rates, 'start:stop:num' or comma-separated (default: --risk_free_rate).",
+    )
+    parser.add_argument(
+        "--sweep-output",
+        default="sweep.csv",
+        help="CSV path for the sweep table (default: sweep.csv).",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="PATHS",
+        help="Add bootstrap confidence intervals from this many resampled trade paths (e.g. 10000; default: off).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for --bootstrap (default: random).",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level for bootstrap intervals (default: 0.95).",
+    )
+    parser.add_argument(
+        "--bootstrap-output",
+        help="Optional CSV path for the full bootstrap distributions (one row per path).",
+    )
+    parser.add_argument(
+        "--breakdown",
+        action="store_true",
+        help="Add per-underlying, per-expiry and per-option-type (CE/PE/FUT) metrics tables to the report.",
+    )
+    parser.add_argument(
+        "--breakdown-output",
+        help="Optional CSV path for the full per-group metrics (implies --breakdown).",
+    )
+    parser.add_argument(
+        "--breakdown-rows",
+        type=int,
+        default=15,
+        help="Most traded groups shown per breakdown table (default: %(default)s); the CSV keeps every group.",
+    )
+    parser.add_argument(
+        "--drawdowns",
+        type=int,
+        nargs="?",
+        const=DEFAULT_TOP_EPISODES,
+        metavar="N",
+        help="Add the underwater curve, time under water and the N deepest drawdown episodes "
+        f"(peak, trough, recovery, depth, duration) to the plots and report (default N: {DEFAULT_TOP_EPISODES}).",
+    )
+    parser.add_argument(
+        "--drawdowns-output",
+        help="Optional CSV path for every drawdown episode (implies --drawdowns).",
+    )
+    parser.add_argument(
+        "--rolling-window",
+        type=int,
+        nargs="?",
+        const=DEFAULT_ROLLING_TRADES,
+        metavar="K",
+        help="Add rolling win rate, expectancy, Sharpe and drawdown over the last K trades "
+        f"to the plots and report (default K: {DEFAULT_ROLLING_TRADES}).",
+    )
+    parser.add_argument(
+        "--rolling-days",
+        type=int,
+        metavar="D",
+        help="Like --rolling-window, but over the last D calendar days of trades.",
+    )
+    parser.add_argument(
+        "--calendar-returns",
+        action="store_true",
+        help="Add daily / weekly / monthly returns with time-based Sharpe and Sortino and a monthly "
+        "returns heatmap to the report.",
+    )
+    parser.add_argument(
+        "--calendar-output",
+        help="Save the daily, weekly and monthly P&L and return series to this CSV (with --calendar-returns).",
+    )
+    parser.add_argument(
+        "--marks",
+        metavar="PRICES.csv",
+        help="Revalue the open positions at these marks (CSV of symbol,price) before computing "
+        "unrealized P&L, net P&L and portfolio value.",
+    )
+    parser.add_argument(
+        "--plot-workers",
+        type=int,
+        default=None,
+        help="Render charts in this many worker processes (default: render in-process).",
+    )
+    parser.add_argument(
+        "--html",
+        nargs="?",
+        const="report.html",
+        default=None,
+        metavar="PATH",
+        help="Write a single self-contained HTML report (charts inline) instead of the Markdown "
+        "report and plot files (default path: report.html; '-' for stdout).",
+    )
+    parser.add_argument(
+        "--html-charts",
+        choices=HTML_CHART_FORMATS,
+        default=DEFAULT_HTML_CHART_FORMAT,
+        help="How charts are embedded in the HTML report: inline SVG or base64 PNG (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--force-plots",
+        action="store_true",
+        help="Re-render every chart even if its input data is unchanged.",
+    )
+    parser.add_argument(
+        "--float-dtype",
+        choices=["float64", "float32"],
+        default="float64",
+        help="Storage width of the numeric trade columns (default: float64).",
+    )
+    parser.add_argument(
+        "--engine",
+        default=None,
+        help="Statement reader: calamine, openpyxl or xlrd for Excel, pyarrow or c for CSV "
+        "(default: the first one installed for the detected format).",
+    )
+    parser.add_argument(
+        "--state-file",
+        help="JSON file of accumulated metrics state. The statement is merged into it and the "
+        "report covers the whole stored history (statements must be added in date order).",
+    )
+    parser.add_argument(
+        "--feed",
+        help="Also write a JSON metrics feed for financial-dashboard to this path "
+        "(e.g. ../financial-dashboard/app/metrics.json).",
+    )
+    parser.add_argument(
+        "--feed-points",
+        type=int,
+        default=200,
+        help="Maximum points kept from the cumulative P&L curve in the feed (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--metrics-only",
+        "--json",
+        dest="metrics_only",
+        action="store_true",
+        help="Print the metrics as JSON to stdout and skip plots and the report (the plotting libraries are never loaded).",
+    )
+    parser.add_argument(
+        "--metrics",
+        dest="metric_names",
+        metavar="NAMES",
+        help="With --metrics-only: comma-separated metrics to output (e.g. net_pnl,win_rate); "
+        "only the intermediates they need are computed.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        metavar="TRACE",
+        help="Record wall time, CPU time and peak memory per stage and write a JSON trace "
+        "(default path: profile.json). A summary table is printed to stderr.",
+    )
+    parser.add_argument(
+        "--profile-no-memory",
+        action="store_true",
+        help="With --profile: skip tracemalloc (lower overhead, no peak memory figures).",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="Also dump cProfile stats for the whole run to PATH (e.g. run.prof; implies profiling).",
+    )
+    parser.add_argument(
+        "--ledger",
+        metavar="DIR",
+        help="Persistent trade ledger. --file (if given) is appended to it, skipping rows already stored "
+        "from overlapping statements, and the report covers the ledger selection (--accounts, --from, --to).",
+    )
+    parser.add_argument(
+        "--account",
+        help="Account ID of --file in the ledger (default: client ID from the file name).",
+    )
+    parser.add_argument(
+        "--accounts",
+        help="Ledger selection: comma-separated account IDs (default: all accounts).",
+    )
+    parser.add_argument("--from", dest="date_from", help="Ledger selection: first expiry date, YYYY-MM-DD.")
+    parser.add_argument("--to", dest="date_to", help="Ledger selection: last expiry date, YYYY-MM-DD.")
+    args = parser.parse_args()
+    if args.file is None and args.batch is None and args.ledger is None and args.watch is None and not args.clear_cache:
+        parser.error("--file, --batch, --watch or --ledger is required")
+    if args.watch is not None and (args.watch_debounce < 0 or args.watch_poll <= 0):
+        parser.error("--watch-debounce must be at least 0 and --watch-poll greater than 0")
+    if args.ledger is not None and args.state_file is not None:
+        parser.error("--ledger already keeps the full history; it cannot be combined with --state-file")
+    if args.breakdown_rows < 1:
+        parser.error("--breakdown-rows must be at least 1")
+    if args.drawdowns is not None and args.drawdowns < 1:
+        parser.error("--drawdowns must be at least 1")
+    if (args.rolling_window is not None and args.rolling_window < 1) or (args.rolling_days is not None and args.rolling_days < 1):
+        parser.error("--rolling-window and --rolling-days must be at least 1")
+    if args.metric_names is not None:
+        args.metric_names = [n.strip() for n in args.metric_names.split(",") if n.strip()]
+        unknown = [n for n in args.metric_names if n not in METRIC_FIELDS]
+        if unknown:
+            parser.error(f"unknown metric(s) {', '.join(unknown)}; choose from {', '.join(METRIC_FIELDS)}")
+        if not args.metrics_only:
+            parser.error("--metrics requires --metrics-only")
+        if args.feed or args.rolling_window is not None or args.rolling_days is not None:
+            parser.error("--feed and rolling metrics need every metric; they cannot be combined with --metrics")
+    return args
+
+
+def run(args: argparse.Namespace) -> None:
     file_path = args.file
     initial_capital = args.capital
     risk_free_rate = args.risk_free_rate
     output_path = args.output
 
-    if not os.path.exists(file_path):
+    cache = StatementCache(args.cache_dir, max_bytes=int(args.cache_size_mb * 1024 * 1024))
+    if args.clear_cache:
+        removed = cache.clear()
+        print(f"Cleared {removed} cached statement(s) from {cache.cache_dir}")
+        if file_path is None and args.batch is None and args.ledger is None and args.watch is None:
+            return
+
+    if args.watch is not None:
+        from watch import StatementWatcher
+
+        watcher = StatementWatcher(
+            args.watch,
+            args.batch_output,
+            initial_capital,
+            risk_free_rate,
+            cache=None if args.no_cache else cache,
+            workers=args.workers,
+            feed_path=args.feed,
+            feed_points=args.feed_points,
+            debounce=args.watch_debounce,
+            poll_interval=args.watch_poll,
+            use_inotify=not args.watch_polling,
+        )
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.batch is not None:
+        from batch import run_batch
+
+        reports = run_batch(
+            args.batch,
+            args.batch_output,
+            initial_capital,
+            risk_free_rate,
+            workers=args.workers,
+            cache=None if args.no_cache else cache,
+        )
+        for account, path in reports.items():
+            print(f"  - {account}: {path}")
+        return
+
+    if file_path is not None and not os.path.exists(file_path):
         raise FileNotFoundError(f"Input file not found: {file_path}")
 
     base_dir = os.path.dirname(os.path.abspath(output_path)) or os.getcwd()
-    plots_dir = _ensure_plots_dir(base_dir)
-
-    df, total_charges, other_credits_debits, start_date, end_date = load_data(file_path)
+    # Keep stdout clean for the JSON output
+    log = sys.stderr if args.metrics_only or args.html == "-" else sys.stdout
+
+    parsed = None
+    if file_path is not None:
+        with stage("load"):
+            if args.no_cache:
+                parsed = load_data(file_path, float_dtype=args.float_dtype, engine=args.engine)
+            else:
+                parsed = load_data_cached(file_path, cache, float_dtype=args.float_dtype, engine=args.engine)
+
+    if args.ledger is not None:
+        from ledger import TradeLedger
+
+        ledger = TradeLedger(args.ledger)
+        if parsed is not None:
+            if args.account is None:
+                from batch import account_id
+
+                args.account = account_id(file_path)
+            added = ledger.append(parsed, args.account, content_key(file_path, LOADER_VERSION), source=file_path)
+            print(f"Ledger: added {added} of {len(parsed[0])} rows for account {args.account}", file=log)
+        accounts = [a.strip() for a in args.accounts.split(",")] if args.accounts else None
+        with stage("ledger.select"):
+            parsed = ledger.select(accounts=accounts, start=args.date_from, end=args.date_to)
+        file_path = args.ledger
+
+    df, total_charges, other_credits_debits, start_date, end_date = parsed
+    print(f"Loaded {len(df)} rows ({frame_memory_bytes(df) / (1024 * 1024):.2f} MB in memory)", file=log)
 
     # Attach charges info to df so compute_metrics can access it
     setattr(df, "_total_charges", total_charges)
     setattr(df, "_other_credits_debits", other_credits_debits)
 
-    metrics = compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
-    plots = generate_plots(df, metrics, plots_dir)
-    generate_report(metrics, df, plots, output_path)
+    if args.sweep_capital or args.sweep_rfr:
+        from sweep import parse_grid, plot_sweep_heatmaps, sweep_metrics
+
+        capitals = parse_grid(args.sweep_capital) if args.sweep_capital else [initial_capital]
+        rates = parse_grid(args.sweep_rfr) if args.sweep_rfr else [risk_free_rate]
+        state = MetricsState.from_frame(df, start_date=start_date, end_date=end_date)
+        table = sweep_metrics(state, capitals, rates)
+        table.to_csv(args.sweep_output, index=False)
+        heatmaps = {}
+        if len(capitals) > 1 and len(rates) > 1 and not args.metrics_only:
+            heatmaps = plot_sweep_heatmaps(table, _ensure_plots_dir(base_dir))
+        print(table.to_string(index=False, float_format=lambda v: f"{v:,.4f}"), file=log)
+        print(f"Sweep of {len(table)} combinations saved to {args.sweep_output}", file=log)
+        for name, path in heatmaps.items():
+            print(f"  - {name}: {path}", file=log)
+        return
+
+    state = None
+    if args.state_file:
+        with stage("metrics.state"):
+            state = MetricsState.from_frame(df, start_date=start_date, end_date=end_date)
+            state = update_state_file(args.state_file, state, content_key(file_path, LOADER_VERSION))
+    sections: List[str] = []
+    revaluation = None
+    if args.marks:
+        from revalue import OpenPositions, load_marks, revaluation_section, revalued_state
+
+        with stage("revalue"):
+            revaluation = OpenPositions(df).revalue(load_marks(args.marks))
+            if state is None:
+                state = MetricsState.from_frame(df, start_date=start_date, end_date=end_date)
+            # Only the statement's open positions move; the stored state keeps the statement's marks
+            state = revalued_state(state, revaluation)
+            sections.append(revaluation_section(revaluation))
+        print(
+            f"Revalued {revaluation.marked_positions} of {len(revaluation.open_positions)} open position(s) "
+            f"from {args.marks}: unrealized P&L {revaluation.statement_unrealized_pnl:,.2f} -> "
+            f"{revaluation.unrealized_pnl:,.2f}",
+            file=log,
+        )
+    with stage("metrics"):
+        if args.metric_names is not None:
+            # Only what the requested metrics depend on
+            metrics = None
+            if state is not None:
+                metric_values = state.metric_values(args.metric_names, initial_capital, risk_free_rate)
+            else:
+                metric_values = compute_metric_values(
+                    df, args.metric_names, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date
+                )
+        elif state is not None:
+            metrics = state.finalize(initial_capital, risk_free_rate)
+        else:
+            metrics = compute_metrics(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+    result = None
+    if args.bootstrap > 0:
+        from bootstrap import bootstrap_metrics, bootstrap_section
+
+        with stage("bootstrap"):
+            years = metric_graph(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)["years"]
+            result = bootstrap_metrics(
+                realized_pnl_series(df),
+                initial_capital,
+                risk_free_rate,
+                years,
+                n_paths=args.bootstrap,
+                seed=args.seed,
+            )
+            sections.append(bootstrap_section(result, args.confidence))
+        if args.bootstrap_output:
+            pd.DataFrame(result.distributions).to_csv(args.bootstrap_output, index_label="path")
+
+    if args.breakdown or args.breakdown_output:
+        from breakdown import breakdown_section, compute_breakdown
+
+        with stage("breakdown"):
+            tables = compute_breakdown(df, initial_capital, risk_free_rate, start_date=start_date, end_date=end_date)
+            sections.append(breakdown_section(tables, max_rows=args.breakdown_rows))
+        if args.breakdown_output:
+            pd.concat(
+                {by: table.rename_axis("group") for by, table in tables.items()},
+                names=["dimension"],
+            ).to_csv(args.breakdown_output)
+
+    underwater = None
+    if args.drawdowns is not None or args.drawdowns_output:
+        with stage("drawdowns"):
+            pnl, dates = realized_trades(df)
+            analysis = analyze_drawdowns(pnl, initial_capital, dates=dates)
+            underwater = analysis.underwater_pct
+            sections.append(drawdown_section(analysis, top=args.drawdowns or DEFAULT_TOP_EPISODES))
+        if args.drawdowns_output:
+            analysis.episodes.to_csv(args.drawdowns_output, index_label="rank")
+
+    rolling = None
+    if args.rolling_window is not None or args.rolling_days is not None:
+        with stage("rolling"):
+            window = args.rolling_window or DEFAULT_ROLLING_TRADES
+            rolling = compute_rolling(df, metrics, initial_capital, risk_free_rate, window=window, days=args.rolling_days)
+            sections.append(rolling_section(rolling, window=window, days=args.rolling_days))
+
+    monthly_returns = None
+    if args.calendar_returns:
+        with stage("calendar"):
+            calendar = compute_calendar_returns(df, initial_capital, start_date=start_date, end_date=end_date)
+            sections.append(calendar_section(calendar, risk_free_rate))
+            monthly_returns = calendar.returns("monthly")
+            if args.calendar_output:
+                frames = {f: b.rename_axis("period") for f, b in calendar.buckets.items()}
+                pd.concat(frames, names=["frequency"]).to_csv(args.calendar_output)
+        if args.calendar_output:
+            print(f"Calendar returns saved to {args.calendar_output}", file=log)
+
+    if args.feed:
+        from feed import build_feed, write_feed
+
+        with stage("feed"):
+            feed = build_feed(metrics, realized_pnl_series(df), args.feed_points, start_date=start_date, end_date=end_date)
+            write_feed(feed, args.feed)
+        print(f"Dashboard feed saved to {args.feed}", file=log)
+
+    if args.metrics_only:
+        payload = {
+            "file": file_path,
+            "start_date": start_date.strftime("%Y-%m-%d") if start_date is not None else None,
+            "end_date": end_date.strftime("%Y-%m-%d") if end_date is not None else None,
+            "metrics": metrics_to_dict(metrics if metrics is not None else metric_values),
+        }
+        if revaluation is not None:
+            payload["revaluation"] = {
+                "marks": args.marks,
+                "statement_unrealized_pnl": revaluation.statement_unrealized_pnl,
+                "unrealized_pnl": revaluation.unrealized_pnl,
+                "marked_positions": revaluation.marked_positions,
+                "unmarked_positions": revaluation.unmarked_positions,
+            }
+        if result is not None:
+            summary = result.summary(args.confidence).astype(object)
+            payload["bootstrap"] = summary.where(summary.notna(), None).to_dict(orient="records")
+        print(json.dumps(payload, indent=2))
+        return
+
+    if args.html is not None:
+        generate_html_report(
+            metrics,
+            df,
+            sys.stdout.buffer if args.html == "-" else args.html,
+            sections=sections,
+            fmt=args.html_charts,
+            workers=args.plot_workers,
+            rolling=rolling,
+            rolling_days=args.rolling_days,
+            underwater=underwater,
+            monthly_returns=monthly_returns,
+        )
+        if args.html != "-":
+            print(f"HTML report saved to {args.html}")
+        return
+
+    plots_dir = _ensure_plots_dir(base_dir)
+    with stage("plots"):
+        plots = generate_plots(
+            df,
+            metrics,
+            plots_dir,
+            workers=args.plot_workers,
+            force=args.force_plots,
+            rolling=rolling,
+            rolling_days=args.rolling_days,
+            underwater=underwater,
+            monthly_returns=monthly_returns,
+        )
+    with stage("report"):
+        generate_report(metrics, df, plots, output_path, sections=sections)
 
     print(f"Report saved to {output_path}")
     if plots:
@@ -590,6 +2026,22 @@ def main():
             print(f"  - {name}: {path}")
 
 
+def main():
+    args = parse_args()
+    enabled = args.profile is not None or args.cprofile is not None
+    with profiling(enabled, trace_memory=not args.profile_no_memory, cprofile=args.cprofile is not None) as profiler:
+        with stage("total"):
+            run(args)
+    if profiler is not None:
+        profiler.print_summary()
+        if args.profile is not None:
+            profiler.write_trace(args.profile)
+            print(f"Profile trace saved to {args.profile}", file=sys.stderr)
+        if args.cprofile is not None:
+            profiler.dump_cprofile(args.cprofile)
+            print(f"cProfile stats saved to {args.cprofile}", file=sys.stderr)
+
+
 if __name__ == "__main__":
     main()
 
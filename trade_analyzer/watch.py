@@ -0,0 +1,336 @@
+"""
+Watch a directory of statements and keep the batch reports up to date.
+
+New or modified statements are detected with inotify on Linux (through
+libc, no extra dependency) and by polling the directory listing elsewhere
+or with polling forced (network shares do not deliver inotify events for
+writes made on other hosts). Either way the directory is then diffed by
+(size, mtime), and a changed file is processed only after its signature
+has stayed the same for the debounce interval, so exports that are still
+being copied are not parsed half-written.
+
+Only the affected statements are re-parsed and re-analyzed. Their
+accounts' reports are rewritten, and the consolidated report and the
+dashboard feed are rebuilt from the results kept in memory. Each update
+logs how long parsing, reports and feed took.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from batch import (
+    StatementResult,
+    find_statements,
+    group_by_account,
+    process_statements,
+    write_account_report,
+    write_consolidated_report,
+)
+from feed import DEFAULT_FEED_POINTS, build_feed, write_feed
+from statement_cache import StatementCache
+from trade_analyzer import Metrics, realized_pnl_series
+
+
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+DEFAULT_POLL_SECONDS = 1.0
+
+# inotify events that can mean a statement appeared, changed or went away
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.calcsize("iIII")
+
+# (size, mtime_ns) of a file
+Signature = Tuple[int, int]
+
+
+class InotifyWaiter:
+    """Blocks until something changes in a directory (Linux inotify via libc)."""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Wait up to `timeout` seconds (None: forever); True if events arrived."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queue; the directory is rescanned anyway, so the events
+        # themselves (and their file names) are not needed
+        while True:
+            try:
+                if len(os.read(self.fd, 64 * _EVENT_HEADER + 4096)) == 0:
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWaiter:
+    """Stand-in for InotifyWaiter that just sleeps for the poll interval."""
+
+    def __init__(self, interval: float = DEFAULT_POLL_SECONDS):
+        self.interval = interval
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class WatchUpdate:
+    changed: List[str]
+    removed: List[str]
+    failed: Dict[str, str]
+    accounts: List[str]
+    parse_seconds: float
+    report_seconds: float
+    feed_seconds: float
+    elapsed_seconds: float
+
+
+@dataclass
+class WatchState:
+    # Signature of every statement as last processed
+    processed: Dict[str, Signature] = field(default_factory=dict)
+    # Changed files waiting to settle: path -> (signature, time it was first seen)
+    pending: Dict[str, Tuple[Signature, float]] = field(default_factory=dict)
+    results: Dict[str, StatementResult] = field(default_factory=dict)
+    account_metrics: Dict[str, Metrics] = field(default_factory=dict)
+
+
+def _signature(path: str) -> Optional[Signature]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def scan_statements(directory: str) -> Dict[str, Signature]:
+    """Statement path -> (size, mtime_ns) for the statements in a directory."""
+    signatures = {path: _signature(path) for path in find_statements(directory)}
+    return {path: sig for path, sig in signatures.items() if sig is not None}
+
+
+class StatementWatcher:
+    """
+    Keeps per-account and consolidated reports (and optionally the
+    dashboard feed) for a directory of statements current.
+
+    `check()` does one scan and processes whatever has settled; `run()`
+    loops on it, waking on inotify events or the poll interval.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        output_dir: str,
+        initial_capital: float,
+        risk_free_rate: float,
+        cache: Optional[StatementCache] = None,
+        workers: Optional[int] = None,
+        feed_path: Optional[str] = None,
+        feed_points: int = DEFAULT_FEED_POINTS,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_SECONDS,
+        use_inotify: bool = True,
+        log: Callable[[str], None] = print,
+    ):
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"Not a directory: {directory}")
+        self.directory = directory
+        self.output_dir = output_dir
+        self.initial_capital = initial_capital
+        self.risk_free_rate = risk_free_rate
+        self.cache = cache
+        self.workers = workers
+        self.feed_path = feed_path
+        self.feed_points = feed_points
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.log = log
+        self.state = WatchState()
+
+    def _settled(self, now: float) -> Tuple[List[str], List[str]]:
+        """Scan once; returns (changed files that have settled, removed files)."""
+        state = self.state
+        current = scan_statements(self.directory)
+        removed = sorted(p for p in state.processed if p not in current)
+        for path in list(state.pending):
+            if path not in current:
+                del state.pending[path]
+
+        ready = []
+        for path, signature in current.items():
+            if state.processed.get(path) == signature:
+                state.pending.pop(path, None)
+                continue
+            seen = state.pending.get(path)
+            if seen is None or seen[0] != signature:
+                # New or still being written: (re)start its quiet period
+                state.pending[path] = (signature, now)
+            elif now - seen[1] >= self.debounce:
+                ready.append(path)
+        return sorted(ready), removed
+
+    def next_deadline(self, now: float) -> Optional[float]:
+        """Seconds until the next pending file may settle (None: nothing pending)."""
+        if not self.state.pending:
+            return None
+        first = min(seen for _, seen in self.state.pending.values())
+        return max(first + self.debounce - now, 0.0)
+
+    def check(self, now: Optional[float] = None) -> Optional[WatchUpdate]:
+        """One scan; processes settled changes and removals. None if nothing to do."""
+        now = time.monotonic() if now is None else now
+        changed, removed = self._settled(now)
+        if not changed and not removed:
+            return None
+        return self.update(changed, removed)
+
+    def update(self, changed: List[str], removed: List[str]) -> WatchUpdate:
+        """Re-analyze `changed`, drop `removed`, and refresh the affected outputs."""
+        state = self.state
+        started = time.perf_counter()
+
+        signatures = {p: state.pending.pop(p)[0] if p in state.pending else _signature(p) for p in changed}
+        results, failed = process_statements(
+            changed, self.initial_capital, self.risk_free_rate, workers=self.workers, cache=self.cache
+        )
+        parse_seconds = time.perf_counter() - started
+
+        affected = set()
+        for path in removed:
+            state.processed.pop(path, None)
+            result = state.results.pop(path, None)
+            if result is not None:
+                affected.add(result.account)
+        for path in changed:
+            # Failed files are retried once they change again
+            state.processed[path] = signatures[path]
+            old = state.results.pop(path, None)
+            if old is not None:
+                affected.add(old.account)
+        for result in results:
+            state.results[result.path] = result
+            affected.add(result.account)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        by_account = group_by_account(list(state.results.values()))
+        for account in sorted(affected):
+            if account in by_account:
+                _, state.account_metrics[account] = write_account_report(
+                    by_account[account], self.output_dir, self.initial_capital, self.risk_free_rate
+                )
+            else:
+                # Its last statement was removed
+                state.account_metrics.pop(account, None)
+                report_path = os.path.join(self.output_dir, f"{account}.md")
+                if os.path.exists(report_path):
+                    os.remove(report_path)
+        state.account_metrics = {a: state.account_metrics[a] for a in sorted(state.account_metrics)}
+
+        combined = None
+        if state.results:
+            _, combined, combined_metrics = write_consolidated_report(
+                list(state.results.values()),
+                state.account_metrics,
+                self.output_dir,
+                self.initial_capital,
+                self.risk_free_rate,
+            )
+        report_done = time.perf_counter()
+
+        if self.feed_path and combined is not None:
+            df, _, _, start_date, end_date = combined
+            feed = build_feed(
+                combined_metrics, realized_pnl_series(df), self.feed_points, start_date=start_date, end_date=end_date
+            )
+            write_feed(feed, self.feed_path)
+        finished = time.perf_counter()
+
+        return WatchUpdate(
+            changed=changed,
+            removed=removed,
+            failed=failed,
+            accounts=sorted(affected),
+            parse_seconds=parse_seconds,
+            report_seconds=report_done - started - parse_seconds,
+            feed_seconds=finished - report_done,
+            elapsed_seconds=finished - started,
+        )
+
+    def _log_update(self, update: WatchUpdate) -> None:
+        stamp = time.strftime("%H:%M:%S")
+        parts = []
+        if update.changed:
+            parts.append(f"{len(update.changed)} changed")
+        if update.removed:
+            parts.append(f"{len(update.removed)} removed")
+        self.log(
+            f"[{stamp}] Updated {', '.join(parts)} statement(s), account(s) {', '.join(update.accounts) or '-'} "
+            f"in {update.elapsed_seconds:.2f}s (parse + metrics: {update.parse_seconds:.2f}s, "
+            f"reports: {update.report_seconds:.2f}s, feed: {update.feed_seconds:.2f}s)"
+        )
+        for path in update.changed:
+            if path not in update.failed:
+                self.log(f"  - {path}")
+        for path in update.removed:
+            self.log(f"  - {path} (removed)")
+        for path, error in update.failed.items():
+            self.log(f"  ! Failed to process {path}: {error}")
+
+    def _waiter(self):
+        if self.use_inotify:
+            try:
+                return InotifyWaiter(self.directory)
+            except (OSError, AttributeError):
+                # Not Linux, or no inotify in this libc
+                pass
+        return PollingWaiter(self.poll_interval)
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Watch until `stop` is set (or forever); statements already present are processed first."""
+        waiter = self._waiter()
+        mode = "inotify" if isinstance(waiter, InotifyWaiter) else f"polling every {self.poll_interval:g}s"
+        self.log(f"Watching {self.directory} ({mode}, debounce {self.debounce:g}s); reports in {self.output_dir}")
+        try:
+            # Existing files get the same quiet period as new ones
+            self.check()
+            while stop is None or not stop.is_set():
+                timeout = self.next_deadline(time.monotonic())
+                if stop is not None:
+                    # Wake up now and then to notice the stop request
+                    timeout = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+                waiter.wait(timeout)
+                update = self.check()
+                if update is not None:
+                    self._log_update(update)
+        finally:
+            waiter.close()